@@ -0,0 +1,105 @@
+import os
+import sys
+import glob
+import time
+import wave
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from kim.speech_backends import create_backend
+
+
+def word_errors(reference: str, hypothesis: str):
+    """Word-level Levenshtein distance and reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def decode_streaming(backend, path: str, chunk_frames: int):
+    """Feed the file chunk by chunk; return transcript and time to first partial"""
+    with wave.open(path, 'rb') as wav:
+        stream = backend.open_stream(wav.getframerate())
+        width = wav.getsampwidth()
+        parts = []
+        first_partial = None
+        start = time.perf_counter()
+        while True:
+            chunk = wav.readframes(chunk_frames)
+            if not chunk:
+                break
+            if width != 2:
+                chunk = sr.AudioData(chunk, wav.getframerate(), width).get_raw_data(convert_width=2)
+            text = stream.accept(chunk)
+            if text:
+                parts.append(text)
+            if first_partial is None and (text or stream.partial()):
+                first_partial = time.perf_counter() - start
+        tail = stream.finish()
+        if tail:
+            parts.append(tail)
+    return " ".join(parts), first_partial
+
+
+def decode_whole(backend, path: str):
+    with sr.AudioFile(path) as source:
+        audio = sr.Recognizer().record(source)
+    return backend.transcribe(audio) or "", None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speech backend real-time factor and WER over WAV fixtures")
+    parser.add_argument('fixtures', help="directory of <name>.wav files with <name>.txt reference transcripts")
+    parser.add_argument('--backend', default=os.getenv("KIM_ASR_BACKEND", "vosk"))
+    parser.add_argument('--chunk-ms', type=int, default=250)
+    args = parser.parse_args()
+
+    backend = create_backend(args.backend)
+    total_audio = total_decode = 0.0
+    total_errors = total_words = 0
+    for path in sorted(glob.glob(os.path.join(args.fixtures, '*.wav'))):
+        ref_path = os.path.splitext(path)[0] + '.txt'
+        if not os.path.exists(ref_path):
+            continue
+        with open(ref_path, 'r', encoding='utf-8') as f:
+            reference = f.read().strip()
+        with wave.open(path, 'rb') as wav:
+            duration = wav.getnframes() / wav.getframerate()
+            chunk_frames = int(wav.getframerate() * args.chunk_ms / 1000)
+
+        start = time.perf_counter()
+        if backend.streaming:
+            hypothesis, first_partial = decode_streaming(backend, path, chunk_frames)
+        else:
+            hypothesis, first_partial = decode_whole(backend, path)
+        elapsed = time.perf_counter() - start
+
+        errors, words = word_errors(reference, hypothesis)
+        total_audio += duration
+        total_decode += elapsed
+        total_errors += errors
+        total_words += words
+        partial = f"{first_partial * 1000:.0f} ms" if first_partial is not None else "n/a"
+        print(
+            f"{os.path.basename(path):<24} {duration:5.1f}s audio  RTF {elapsed / duration:.3f}  "
+            f"WER {errors / max(words, 1):.1%}  first partial {partial}"
+        )
+        print(f"    ref: {reference}\n    hyp: {hypothesis}")
+
+    if not total_words:
+        print("No fixtures found (need name.wav + name.txt pairs)")
+        return 1
+    print(f"\n{args.backend}: RTF {total_decode / total_audio:.3f}  WER {total_errors / total_words:.1%}  "
+          f"over {total_audio:.1f}s of audio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
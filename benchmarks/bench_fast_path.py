@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.fast_path import FastPathParser
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'fast_path_corpus.jsonl')
+# Fixed "now" so relative dates in the corpus stay valid: Saturday 26 April 2025
+REFERENCE_NOW = datetime(2025, 4, 26, 12, 0, tzinfo=ZoneInfo("Europe/Berlin"))
+
+
+def load_corpus(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_correct(expected, parsed, accepted: bool) -> bool:
+    if expected is None:
+        return not accepted
+    if not accepted or parsed["intent"] != expected["intent"]:
+        return False
+    return all(parsed["data"].get(k) == v for k, v in expected.get("data", {}).items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast-path parser accuracy and latency benchmark")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    fast_path = FastPathParser()
+    fast_path.parse("tomorrow at 3pm", {}, REFERENCE_NOW)  # warm up dateparser
+
+    correct = accepted_count = 0
+    for case in corpus:
+        parsed, confidence = fast_path.parse(case["text"], case["context"], REFERENCE_NOW)
+        accepted = parsed is not None and confidence >= fast_path.confidence_threshold
+        accepted_count += accepted
+        ok = is_correct(case["expected"], parsed, accepted)
+        correct += ok
+        if args.verbose or not ok:
+            mark = "ok  " if ok else "FAIL"
+            print(f"{mark} {case['text']!r} -> {parsed if accepted else 'LLM'} ({confidence:.2f})")
+
+    latencies = []
+    for _ in range(args.repeat):
+        for case in corpus:
+            start = time.perf_counter()
+            fast_path.parse(case["text"], case["context"], REFERENCE_NOW)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"cases:     {len(corpus)}")
+    print(f"accuracy:  {correct / len(corpus):.1%}")
+    print(f"coverage:  {accepted_count / len(corpus):.1%} of turns answered without the LLM")
+    print(f"latency:   p50 {pct(0.50):.3f} ms  p99 {pct(0.99):.3f} ms  max {latencies[-1] * 1000:.3f} ms")
+    return 0 if correct == len(corpus) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
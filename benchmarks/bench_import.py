@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim import calendar_client
+from kim.calendar_io import ImportCheckpoint, import_events
+from benchmarks.fakes import FakeCalendarService
+
+
+class CountingCalendarService(FakeCalendarService):
+    """Accepts inserts without keeping them, so only the importer's memory is measured"""
+
+    def _insert(self, calendar_id: str, body: Dict) -> Dict:
+        self._count('insert')
+        return {**body, "id": f"evt{next(self._ids)}", "status": "confirmed"}
+
+
+def write_ics(path: str, count: int):
+    """`count` one-hour events, every tenth a weekly series"""
+    first = datetime(2027, 1, 4, 8, 0)
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Kim//bench//EN\r\n")
+        for i in range(count):
+            start = first + timedelta(minutes=90 * i)
+            out.write("BEGIN:VEVENT\r\n")
+            out.write(f"UID:bench-{i}@example.com\r\n")
+            out.write(f"SUMMARY:Imported meeting {i}\r\n")
+            out.write(f"DTSTART;TZID=W. Europe Standard Time:{start:%Y%m%dT%H%M%S}\r\n")
+            out.write(f"DTEND;TZID=W. Europe Standard Time:{start + timedelta(hours=1):%Y%m%dT%H%M%S}\r\n")
+            out.write(f"DESCRIPTION:Agenda item {i}\\, with an escaped comma and a line long enough to be\r\n")
+            out.write(" folded by the exporting client\r\n")
+            if i % 10 == 0:
+                out.write("RRULE:FREQ=WEEKLY;COUNT=12\r\n")
+            out.write("END:VEVENT\r\n")
+        out.write("END:VCALENDAR\r\n")
+
+
+def run(path: str, checkpoint_path: str, batch_size: int):
+    service = CountingCalendarService()
+    checkpoint = ImportCheckpoint(checkpoint_path)
+    started = time.perf_counter()
+    try:
+        report = import_events(service, path, checkpoint=checkpoint, batch_size=batch_size)
+    finally:
+        checkpoint.close()
+    return report, time.perf_counter() - started, service.calls.get('insert', 0)
+
+
+def peak_memory(path: str, checkpoint_path: str, batch_size: int) -> int:
+    """Peak traced allocation of a fresh import; tracemalloc slows everything down, so it is not timed"""
+    tracemalloc.start()
+    try:
+        run(path, checkpoint_path, batch_size)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming .ics import: throughput and peak memory by file size")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    # The fake calendar has no quota; pacing would only measure the limiter
+    calendar_client.calendar_rate_limiter.rate = 1e6
+    calendar_client.calendar_rate_limiter.capacity = 1e6
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"bench-{size}.ics")
+            write_ics(path, size)
+            checkpoint_path = os.path.join(tmp, f"bench-{size}.db")
+            report, elapsed, inserts = run(path, checkpoint_path, args.batch_size)
+            peak = peak_memory(path, os.path.join(tmp, f"bench-{size}-traced.db"), args.batch_size)
+            print(f"{size:7d} events  {os.path.getsize(path) / 2**20:6.1f} MiB  {elapsed:6.2f} s  "
+                  f"{report['read'] / elapsed:8.0f} events/s  peak {peak / 1024:7.0f} KiB  "
+                  f"({inserts} inserts, {report['invalid'] + report['failed']} errors)")
+            # A second run against the same checkpoint has nothing left to send
+            report, elapsed, inserts = run(path, checkpoint_path, args.batch_size)
+            print(f"{'':7} resumed {elapsed:6.2f} s  {report['duplicates']} already imported, {inserts} inserts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim import calendar_client
+from kim.calendar_api import LISTING_FIELDS, iter_events
+from kim.event_store import event_start_ts
+from benchmarks.fakes import FakeCalendarService
+
+TIMEZONE = "Europe/Berlin"
+
+
+def populate(service: FakeCalendarService, calendars, per_calendar: int):
+    """Hour-long events every few hours, with the bulky fields real events carry"""
+    first = datetime(2027, 1, 4, 8, 0, tzinfo=ZoneInfo(TIMEZONE))
+    for c, calendar_id in enumerate(calendars):
+        for i in range(per_calendar):
+            start = first + timedelta(hours=5 * i + c)
+            service._insert(calendar_id, {
+                "summary": f"{calendar_id} meeting {i}",
+                "description": "Agenda, notes and dial-in details. " * 12,
+                "start": {"dateTime": start.isoformat(), "timeZone": TIMEZONE},
+                "end": {"dateTime": (start + timedelta(hours=1)).isoformat(), "timeZone": TIMEZONE},
+                "attendees": [{"email": f"person{k}@example.com", "responseStatus": "accepted"} for k in range(8)],
+                "conferenceData": {"entryPoints": [{"uri": f"https://meet.example.com/{calendar_id}-{i}"}]},
+                "reminders": {"useDefault": True},
+            })
+
+
+def one_by_one(service, calendars, **kwargs):
+    """The old shape: each calendar read in turn, then sorted"""
+    events = [e for calendar_id in calendars for e in iter_events(service, calendars=calendar_id, **kwargs)]
+    return sorted(events, key=lambda e: event_start_ts(e, TIMEZONE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event listing: partial responses and concurrent calendars")
+    parser.add_argument('--calendars', type=int, default=4)
+    parser.add_argument('--events', type=int, default=2000, help="events per calendar")
+    parser.add_argument('--page-size', type=int, default=250)
+    parser.add_argument('--latency-ms', type=float, default=60.0, help="simulated round-trip of one page")
+    args = parser.parse_args()
+
+    # The fake calendar has no quota; pacing would only measure the limiter
+    calendar_client.calendar_rate_limiter.rate = 1e6
+    calendar_client.calendar_rate_limiter.capacity = 1e6
+    calendars = ["primary"] + [f"team{i}@group.calendar.google.com" for i in range(1, args.calendars)]
+    service = FakeCalendarService(list_latency=args.latency_ms / 1000)
+    populate(service, calendars, args.events)
+
+    # Expanded everywhere: a merge of several calendars always is, so the sequential runs match it
+    common = dict(page_size=args.page_size, single_events=True)
+    runs = (
+        ("sequential, all fields", lambda: one_by_one(service, calendars, **common)),
+        ("sequential, fields", lambda: one_by_one(service, calendars, fields=LISTING_FIELDS, **common)),
+        ("concurrent, fields", lambda: list(iter_events(service, fields=LISTING_FIELDS, calendars=calendars, **common))),
+    )
+    for label, run in runs:
+        started = time.perf_counter()
+        events = run()
+        elapsed = time.perf_counter() - started
+        payload = sum(len(json.dumps(e)) for e in events)
+        print(f"{label:<24} {len(events):7d} events  {elapsed * 1000:8.0f} ms  payload {payload / 2**20:6.2f} MiB")
+
+    # A range query stops after the pages it needs
+    service.calls.clear()
+    started = time.perf_counter()
+    window = list(iter_events(service, time_min="2027-01-04T00:00:00Z", time_max="2027-01-11T00:00:00Z",
+                              fields=LISTING_FIELDS, calendars=calendars, page_size=args.page_size, single_events=True))
+    elapsed = time.perf_counter() - started
+    print(f"{'one week, concurrent':<24} {len(window):7d} events  {elapsed * 1000:8.0f} ms  "
+          f"({service.calls.get('list', 0)} list calls)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.memory_store import SQLiteMemoryStore
+
+WORDS = (
+    "meeting standup lunch dentist report budget review project kickoff gym call "
+    "client invoice travel flight hotel doctor birthday dinner workshop sprint demo "
+    "planning retro interview presentation deadline contract payroll team sync "
+    "tomorrow monday tuesday wednesday thursday friday morning afternoon evening"
+).split()
+QUERIES = ["dentist", "budget review", "flight hotel", "client invoice", "birthday dinner", "sprint demo friday"]
+
+
+def populate(store: SQLiteMemoryStore, turns: int, batch: int = 50_000):
+    rng = random.Random(42)
+    written = 0
+    while written < turns:
+        n = min(batch, turns - written)
+        store.append_turns(
+            {
+                "role": "user" if (written + i) % 2 == 0 else "assistant",
+                "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))),
+                "timestamp": None
+            }
+            for i in range(n)
+        )
+        written += n
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite/FTS5 history search benchmark")
+    parser.add_argument('--turns', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--db', default=None, help="reuse an existing database file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'memory.db')
+    store = SQLiteMemoryStore(db_path)
+    existing = store.count_turns()
+    if existing < args.turns:
+        start = time.perf_counter()
+        populate(store, args.turns - existing)
+        print(f"populate: {args.turns - existing} turns in {time.perf_counter() - start:.1f}s")
+    print(f"turns:    {store.count_turns()}")
+
+    latencies = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        store.search(QUERIES[i % len(QUERIES)], limit=5)
+        latencies.append(time.perf_counter() - start)
+    print(f"search:   p50 {percentile(latencies, 0.5):.2f} ms  p99 {percentile(latencies, 0.99):.2f} ms")
+
+    start = time.perf_counter()
+    store.load_conversation(limit=50)
+    print(f"recent:   {(time.perf_counter() - start) * 1000:.2f} ms for the last 50 turns")
+
+    # Concurrent readers while one writer keeps appending
+    reader_latencies = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(args.queries // args.readers):
+            start = time.perf_counter()
+            store.search(rng.choice(QUERIES), limit=5)
+            local.append(time.perf_counter() - start)
+        with lock:
+            reader_latencies.extend(local)
+
+    def writer():
+        while not stop.is_set():
+            store.append_turns([{"role": "user", "content": "concurrent write dentist", "timestamp": None}])
+
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    writer_thread.start()
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    writer_thread.join()
+    print(
+        f"readers:  {args.readers} threads + 1 writer  "
+        f"p50 {percentile(reader_latencies, 0.5):.2f} ms  p99 {percentile(reader_latencies, 0.99):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.memory import MemoryManager
+from kim.memory_writer import orjson
+
+
+def run(memory_dir: str, turns: int, backend: str, synchronous: bool):
+    """Per-turn cost of what a turn persists: two log entries and the profile"""
+    memory = MemoryManager(memory_dir=memory_dir, backend=backend)
+    profile = memory.load_profile()
+    costs = []
+    for i in range(turns):
+        started = time.perf_counter()
+        for role in ("user", "assistant"):
+            memory.append_conversation({"role": role, "content": f"turn {i}: move the standup to ten",
+                                        "timestamp": datetime.now().isoformat()})
+        profile["responsibilities"].append(f"Task {i}")
+        memory.save_profile(profile)
+        if synchronous:
+            # What every turn paid before writes moved to the background
+            memory.flush()
+        costs.append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    memory.close()
+    return costs, (time.perf_counter() - started) * 1000, memory._writer.flushes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory writes on the turn's critical path: synchronous vs debounced")
+    parser.add_argument('--turns', type=int, default=300)
+    parser.add_argument('--backend', choices=("json", "sqlite"), default="json")
+    args = parser.parse_args()
+
+    print(f"serializer: {'orjson' if orjson is not None else 'json'}")
+    for label, synchronous in (("synchronous", True), ("debounced", False)):
+        with tempfile.TemporaryDirectory() as tmp:
+            costs, close_ms, flushes = run(tmp, args.turns, args.backend, synchronous)
+        costs.sort()
+        print(f"{label:<12} p50 {statistics.median(costs):6.3f} ms  p95 {costs[int(len(costs) * 0.95)]:6.3f} ms  "
+              f"per turn  {flushes:4d} flushes  close {close_ms:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.profile_extractor import extract_facts, rebuild_profile
+
+BASE_PROFILE = {"personal": {"name": None}, "schedule": {"work_hours": {}}, "responsibilities": []}
+
+UTTERANCES = [
+    "Schedule a meeting with Anna tomorrow at 3pm",
+    "What do I have on Friday?",
+    "Move my dentist appointment to next week",
+    "My name is Eduardo and I need to renew my passport",
+    "I work monday to friday from 9 to 5",
+    "I have to finish the quarterly report before the board meeting",
+    "Can you find me a free slot next week for two hours",
+    "Call me back later about the offsite",
+    "I'll send the invoice to the client on friday",
+    "Cancel the standup, I should prepare the demo instead",
+    "My hours are 8:30am-4:30pm these days",
+    "Yes please",
+]
+
+
+def legacy_scan(text: str):
+    """The substring scans update_profile_from_conversation used to run"""
+    lowered = text.lower()
+    name = hours = duty = None
+    for phrase in ["my name is", "i'm called", "call me"]:
+        if phrase in lowered:
+            name = text.split(phrase)[-1].strip(" .")
+            break
+    if any(p in lowered for p in ["i work", "my hours", "available from"]) and "from" in lowered and "to" in lowered:
+        start_end = lowered.split("from")[-1].split("to")
+        if len(start_end) == 2:
+            hours = (start_end[0].strip(), start_end[1].split()[0].strip())
+    if any(p in lowered for p in ["need to", "have to", "must", "should", "i'll", "i will"]):
+        for phrase, words in [("need to", 2), ("have to", 2), ("must", 1), ("should", 1), ("i'll", 1), ("i will", 2)]:
+            if phrase in lowered:
+                duty = " ".join(lowered.split(phrase)[-1].strip().split()[:words]).capitalize()
+                break
+    return name, hours, duty
+
+
+def legacy_rebuild(turns, profile):
+    """Replaying a log the old way: scan per turn, dedupe by searching the list"""
+    responsibilities = list(profile["responsibilities"])
+    for turn in turns:
+        if turn["role"] != "user":
+            continue
+        duty = legacy_scan(turn["content"])[2]
+        if duty and duty not in responsibilities:
+            responsibilities.append(duty)
+    return responsibilities
+
+
+def corpus(size: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [f"{rng.choice(UTTERANCES)} {i}" if i % 7 == 0 else rng.choice(UTTERANCES) for i in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile fact extraction throughput")
+    parser.add_argument('--turns', type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = corpus(args.turns)
+    for label, fn in (("substring scans", legacy_scan), ("compiled extractor", extract_facts)):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<20} {args.turns / elapsed:10.0f} utterances/s  {elapsed / args.turns * 1e6:6.2f} us each")
+
+    # Rebuilding a profile from a whole log: extraction plus dedupe
+    turns = [{"role": "user" if i % 2 == 0 else "assistant", "content": text} for i, text in enumerate(texts)]
+    started = time.perf_counter()
+    responsibilities = legacy_rebuild(turns, BASE_PROFILE)
+    elapsed = time.perf_counter() - started
+    print(f"{'legacy rebuild':<20} {len(turns) / elapsed:10.0f} turns/s  ({len(responsibilities)} responsibilities)")
+    started = time.perf_counter()
+    profile, _ = rebuild_profile(turns, BASE_PROFILE)
+    elapsed = time.perf_counter() - started
+    print(f"{'rebuild from log':<20} {len(turns) / elapsed:10.0f} turns/s  "
+          f"({len(profile['responsibilities'])} responsibilities, name {profile['personal']['name']!r}, "
+          f"hours {profile['schedule']['work_hours']})")
+
+
+if __name__ == '__main__':
+    main()
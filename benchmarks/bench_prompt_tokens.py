@@ -0,0 +1,62 @@
+import os
+import sys
+import argparse
+import tempfile
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.memory import MemoryManager
+from kim.prompt_builder import PromptBuilder, TokenCounter
+
+SYSTEM_PROMPT_CHARS = 1800
+REQUESTS = [
+    "schedule a dentist appointment next friday at 3pm",
+    "book lunch with Maria on tuesday at noon",
+    "move my standup with the platform team to 9:30 tomorrow",
+    "what does my thursday look like",
+    "set up a one hour design review with Alex and Priya next week",
+]
+
+
+def synthetic_turns(count: int):
+    for i in range(count):
+        request = REQUESTS[i % len(REQUESTS)]
+        yield {"role": "user", "content": f"{request} (request {i})"}
+        yield {"role": "assistant", "content": f"✅ Scheduled: {request.split(' ')[2].title()} {i} on 2026-11-{1 + i % 28:02d}T15:00:00"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input tokens per turn: full history resend vs the budgeted prompt builder")
+    parser.add_argument('--turns', type=int, default=50, help="user turns of prior conversation")
+    parser.add_argument('--budget', type=int, default=1200)
+    args = parser.parse_args()
+
+    counter = TokenCounter()
+    counter.load()
+    system_prompt = ("You are Kim, an AI calendar assistant. " * 60)[:SYSTEM_PROMPT_CHARS]
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryManager(memory_dir=tmp, backend="sqlite")
+        turns = list(synthetic_turns(args.turns))
+        for turn in turns:
+            memory.append_conversation(turn)
+        memory.sync_conversation()
+        history = deque(turns, maxlen=50)
+        builder = PromptBuilder(system_prompt, budget=args.budget, counter=counter)
+
+        query = "move the dentist appointment to monday morning"
+        naive = [{"role": "system", "content": system_prompt}, *turns, {"role": "user", "content": query}]
+        budgeted = builder.build(query, ["Current title: Dentist"], memory.load_profile(), history, memory)
+        memory.close()
+
+    naive_tokens = counter.count_messages(naive)
+    usage = builder.last_usage
+    print(f"token counts: {'tiktoken' if counter.exact else 'estimated (tiktoken unavailable)'}")
+    print(f"full history resend  {naive_tokens:6d} tokens/turn")
+    print(f"budgeted builder     {usage['total']:6d} tokens/turn ({usage['total'] / naive_tokens:.0%})")
+    print(f"  cacheable prefix   {usage['static']:6d} tokens ({usage['static'] / usage['total']:.0%} of the prompt)")
+    print(f"  dynamic context    {usage['dynamic']:6d} / {args.budget} budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.busy_index import BusyIndex
+from kim.recurrence import expand_events
+
+TIMEZONE = "Europe/Berlin"
+
+
+def standups(years: int, series: int):
+    """Weekday standups that started `years` ago and never end"""
+    tz = ZoneInfo(TIMEZONE)
+    first = datetime.now(tz).replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=365 * years)
+    for i in range(series):
+        start = first + timedelta(minutes=15 * i)
+        yield {
+            "id": f"standup{i}",
+            "summary": f"Standup {i}",
+            "start": {"dateTime": start.isoformat(), "timeZone": TIMEZONE},
+            "end": {"dateTime": (start + timedelta(minutes=15)).isoformat(), "timeZone": TIMEZONE},
+            "recurrence": ["RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"],
+        }
+
+
+def build(events, materialize: bool, horizon: float):
+    index = BusyIndex(TIMEZONE)
+    if materialize:
+        # What singleEvents=True hands over: every instance up to the horizon
+        start = min(datetime.fromisoformat(e["start"]["dateTime"]).timestamp() for e in events)
+        events = list(expand_events(events, start, horizon, TIMEZONE))
+    index.load(events)
+    return index, len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conflict checks against recurring series: lazy expansion vs materialized instances")
+    parser.add_argument('--years', type=int, default=5, help="how long ago the series started")
+    parser.add_argument('--series', type=int, default=8)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    events = list(standups(args.years, args.series))
+    now = datetime.now(ZoneInfo(TIMEZONE)).replace(hour=9, minute=0, second=0, microsecond=0).timestamp()
+    horizon = now + 365 * 24 * 3600
+    for label, materialize in (("materialized", True), ("lazy", False)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        index, loaded = build(events, materialize, horizon)
+        build_s = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        found = 0
+        for i in range(args.queries):
+            # An hour at 9:00 on one of the next 90 days
+            day = now + (i % 90) * 24 * 3600
+            found += len(index.conflicts(day, day + 3600))
+        per_query = (time.perf_counter() - started) / args.queries
+        print(f"{label:<13} {loaded:7d} rows  build {build_s * 1000:8.1f} ms  "
+              f"index {memory / 1024:8.0f} KiB  conflicts {per_query * 1e6:7.1f} us/query  ({found} hits)")
+
+
+if __name__ == '__main__':
+    main()
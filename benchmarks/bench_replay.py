@@ -0,0 +1,220 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim import calendar_client
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.memory import MemoryManager
+from kim.response_cache import ResponseCache
+from kim.tracing import StageMetrics, tracer
+from main import KimAssistant
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'replay_corpus.jsonl')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'replay_baseline.json')
+FALLBACK_REPLY = {
+    "intent": "general",
+    "message": "I'm happy to help with your schedule. What would you like to do?",
+    "missing_fields": [],
+    "data": {}
+}
+# Metric -> (direction, default tolerance). Timings vary between machines; call counts do not.
+TRACKED = {
+    "turns_per_s": ("higher", 0.25),
+    "p50_turn_ms": ("lower", 0.25),
+    "p95_turn_ms": ("lower", 0.50),
+    "alloc_kib_per_turn": ("lower", 0.25),
+    "peak_kib": ("lower", 0.25),
+    "llm_calls_per_event": ("lower", 0.0),
+}
+
+
+def load_corpus(path: str):
+    """Conversations of {"text", optional recorded "llm" reply} turns, one JSON object per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_recorded(path: str, max_gap_minutes: int = 30):
+    """
+    Turn a saved conversation log (conversation.json or conversation.jsonl)
+    into replay conversations, splitting where the user paused longer than
+    max_gap_minutes. Only user turns are kept; their LLM replies were never
+    recorded, so such turns get the fallback reply.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    conversations, turns, last = [], [], None
+    for entry in entries:
+        if entry.get("role") != "user" or not entry.get("content"):
+            continue
+        try:
+            at = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            at = None
+        if turns and at and last and at - last > timedelta(minutes=max_gap_minutes):
+            conversations.append({"id": f"recorded-{len(conversations)}", "turns": turns})
+            turns = []
+        turns.append({"text": entry["content"]})
+        last = at or last
+    if turns:
+        conversations.append({"id": f"recorded-{len(conversations)}", "turns": turns})
+    return conversations
+
+
+class RecordedLLM(FakeOpenAI):
+    """Answers each user message with the reply recorded for it in the corpus"""
+
+    def __init__(self, corpus):
+        self.recorded = {
+            turn["text"].strip().lower(): json.dumps(turn["llm"])
+            for conversation in corpus for turn in conversation["turns"] if "llm" in turn
+        }
+        self.unrecorded = 0
+        super().__init__(self._reply)
+
+    def _reply(self, messages):
+        text = messages[-1]["content"].strip().lower()
+        if text not in self.recorded:
+            self.unrecorded += 1
+            return json.dumps(FALLBACK_REPLY)
+        return self.recorded[text]
+
+
+def replay(corpus, repeat: int, tmp: str):
+    """Run every conversation `repeat` times, each in a fresh session; returns counters"""
+    llm = RecordedLLM(corpus)
+    calendar = FakeCalendarService()
+    event_store = EventStore(os.path.join(tmp, 'events.db'))
+    turns = 0
+    for round_index in range(repeat):
+        for conversation in corpus:
+            # A fresh cache per session: a replay must not be answered by its own earlier rounds
+            brain = CalendarBrain(
+                client=llm,
+                calendar_service=calendar,
+                event_store=event_store,
+                response_cache=ResponseCache(':memory:')
+            )
+            memory = MemoryManager(memory_dir=os.path.join(tmp, 'sessions', f"{round_index}-{conversation['id']}"))
+            assistant = KimAssistant(memory=memory, brain=brain)
+            for turn in conversation["turns"]:
+                assistant.process_input(turn["text"])
+                turns += 1
+            assistant.save_state()
+    event_store.close()
+    return {
+        "turns": turns,
+        "llm_calls": llm.calls,
+        "unrecorded": llm.unrecorded,
+        "events": calendar.calls.get('insert', 0)
+    }
+
+
+def measure(corpus, repeat: int):
+    sink = io.StringIO()
+    # The fake calendar has no quota; pacing would only measure the limiter
+    calendar_client.calendar_rate_limiter.rate = 1e6
+    calendar_client.calendar_rate_limiter.capacity = 1e6
+    # Timing pass
+    tracer.metrics = StageMetrics(max_samples=100000)
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(sink):
+        started = time.perf_counter()
+        counts = replay(corpus, repeat, tmp)
+        elapsed = time.perf_counter() - started
+    stages = tracer.metrics.summary()
+
+    # Allocation pass: tracemalloc slows everything down, so it is not timed
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(sink):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        replay(corpus, 1, tmp)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics('filename'))
+    one_round_turns = sum(len(c["turns"]) for c in corpus)
+
+    turn_stats = stages.get("process_input", {})
+    results = {
+        "turns_per_s": counts["turns"] / elapsed,
+        "p50_turn_ms": turn_stats.get("p50_ms", 0.0),
+        "p95_turn_ms": turn_stats.get("p95_ms", 0.0),
+        "alloc_kib_per_turn": max(0, allocated - before) / 1024 / one_round_turns,
+        "peak_kib": peak / 1024,
+        "llm_calls_per_event": counts["llm_calls"] / counts["events"] if counts["events"] else 0.0,
+    }
+    return results, counts, stages
+
+
+def compare(results, baseline, tolerance_scale: float):
+    """Regressions past the baseline, as human-readable strings"""
+    failures = []
+    for metric, (direction, tolerance) in TRACKED.items():
+        if metric not in baseline:
+            continue
+        allowed = tolerance * tolerance_scale
+        expected, actual = baseline[metric], results[metric]
+        if direction == "higher" and actual < expected * (1 - allowed):
+            failures.append(f"{metric}: {actual:.2f} < baseline {expected:.2f} (-{allowed:.0%} allowed)")
+        elif direction == "lower" and actual > expected * (1 + allowed) + 1e-9:
+            failures.append(f"{metric}: {actual:.2f} > baseline {expected:.2f} (+{allowed:.0%} allowed)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay conversations through KimAssistant against fake LLM and calendar")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--recorded', help="also replay a saved conversation.json / conversation.jsonl")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance-scale', type=float, default=1.0, help="multiply every metric's allowed regression")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if args.recorded:
+        corpus += load_recorded(args.recorded)
+    results, counts, stages = measure(corpus, args.repeat)
+
+    print(f"{len(corpus)} conversations x {args.repeat} rounds: {counts['turns']} turns, "
+          f"{counts['events']} events, {counts['llm_calls']} LLM calls ({counts['unrecorded']} unrecorded)")
+    for metric, value in results.items():
+        print(f"  {metric:<20} {value:10.2f}")
+    print("Per-stage latency:")
+    for stage, stats in sorted(stages.items()):
+        print(f"  {stage:<24} n={stats['count']:<6} p50 {stats['p50_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({k: round(v, 3) for k, v in results.items()}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --update-baseline to create one")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, args.tolerance_scale)
+    if failures:
+        print("REGRESSION:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
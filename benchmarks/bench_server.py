@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from aiohttp import web
+from kim import calendar_client
+from kim.event_store import EventStore
+from kim.async_llm import AsyncLLMGateway
+from benchmarks.fakes import FakeAsyncOpenAI, FakeCalendarService, FakeOpenAI
+from server import SessionManager, SharedBackends, create_app
+
+# One scheduling conversation per session: LLM turn, fast-path follow-ups, confirmation
+SCRIPT = [
+    "I need to plan the quarterly review with {name}",
+    "{day} at 10am",
+    "yes",
+    "hello",
+]
+DAYS = ["tomorrow", "on monday", "on tuesday", "on wednesday", "on thursday", "on friday"]
+
+
+def llm_reply(messages):
+    text = messages[-1]["content"].lower()
+    return json.dumps({
+        "intent": "create",
+        "message": "What time should the review start?",
+        "missing_fields": ["start_time"],
+        "data": {"title": "Quarterly Review", "date": None, "start": None, "end": None},
+    }) if "review" in text else json.dumps({
+        "intent": "general",
+        "message": "I'm here to help with your calendar.",
+        "missing_fields": [],
+        "data": {},
+    })
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def run_session(http: aiohttp.ClientSession, base: str, index: int, use_ws: bool, latencies):
+    session_id = f"load-{index}"
+    turns = [t.format(name=f"team {index}", day=DAYS[index % len(DAYS)]) for t in SCRIPT]
+    if use_ws:
+        async with http.ws_connect(f"{base}/sessions/{session_id}/ws") as ws:
+            for text in turns:
+                started = time.perf_counter()
+                await ws.send_str(text)
+                while True:
+                    frame = await ws.receive_json()
+                    if frame["type"] == "reply":
+                        break
+                latencies.append(time.perf_counter() - started)
+    else:
+        for text in turns:
+            started = time.perf_counter()
+            async with http.post(f"{base}/sessions/{session_id}/turns", json={"text": text}) as resp:
+                resp.raise_for_status()
+                await resp.json()
+            latencies.append(time.perf_counter() - started)
+
+
+async def main_async(args):
+    # The stub calendar has no quota; only throttle when asked to
+    calendar_client.calendar_rate_limiter.rate = args.calendar_rate
+    calendar_client.calendar_rate_limiter.capacity = args.calendar_rate
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = SharedBackends(
+            client=FakeOpenAI(llm_reply, delay=args.llm_delay),
+            calendar_service=FakeCalendarService(),
+            event_store=EventStore(os.path.join(tmp, 'events.db')),
+            llm_gateway=AsyncLLMGateway(
+                FakeAsyncOpenAI(llm_reply, delay=args.llm_delay),
+                max_concurrency=args.llm_concurrency,
+                requests_per_minute=args.rpm,
+                tokens_per_minute=args.tpm
+            )
+        )
+        manager = SessionManager(backends, sessions_dir=os.path.join(tmp, 'sessions'), max_workers=args.workers)
+        runner = web.AppRunner(create_app(manager))
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base = f"http://127.0.0.1:{port}"
+
+        latencies = []
+        connector = aiohttp.TCPConnector(limit=0)
+        started = time.perf_counter()
+        async with aiohttp.ClientSession(connector=connector) as http:
+            await asyncio.gather(*(
+                run_session(http, base, i, args.websocket, latencies) for i in range(args.sessions)
+            ))
+        elapsed = time.perf_counter() - started
+        await runner.cleanup()
+
+    ms = [l * 1000 for l in latencies]
+    print(f"{args.sessions} sessions x {len(SCRIPT)} turns over {'WebSocket' if args.websocket else 'HTTP'}, "
+          f"{args.workers} workers, {args.llm_delay * 1000:.0f} ms stub LLM")
+    print(f"  turns/s  {len(ms) / elapsed:.1f}")
+    print(f"  p50      {statistics.median(ms):.1f} ms")
+    print(f"  p99      {percentile(ms, 99):.1f} ms")
+    print(f"  max      {max(ms):.1f} ms")
+    llm = backends.llm_gateway.stats()
+    print(f"  LLM calls {llm['requests']} (+{llm['coalesced']} coalesced), "
+          f"events created {backends.calendar_service.calls.get('insert', 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session turn latency of server.py against stub backends")
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=32, help="server threads for calendar and disk work")
+    parser.add_argument('--llm-delay', type=float, default=0.05, help="seconds per stub completion (per chunk when streaming)")
+    parser.add_argument('--llm-concurrency', type=int, default=64)
+    parser.add_argument('--rpm', type=int, default=1000000, help="LLM requests/min quota")
+    parser.add_argument('--tpm', type=int, default=100000000, help="LLM tokens/min quota")
+    parser.add_argument('--calendar-rate', type=float, default=1e6, help="calendar requests/s allowed by the shared rate limiter")
+    parser.add_argument('--websocket', action='store_true', help="drive turns over WebSocket instead of HTTP POST")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
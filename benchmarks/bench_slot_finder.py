@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim.memory import MemoryManager
+from kim.busy_index import WEEKDAY_NAMES, parse_hhmm, parse_time_range
+from kim.slot_finder import SlotFinder, MINUTES_PER_DAY, SHORT_BREAK_MINUTES
+
+TZ = ZoneInfo("Europe/Berlin")
+
+
+def synthetic_busy(first: date, days: int, per_day: int, seed: int = 7):
+    rng = random.Random(seed)
+    busy = []
+    for d in range(days):
+        day = datetime.combine(first + timedelta(days=d), datetime.min.time(), TZ)
+        for _ in range(per_day):
+            start = day + timedelta(minutes=rng.randrange(7 * 60, 19 * 60, 5))
+            busy.append((start.timestamp(), (start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))).timestamp()))
+    return busy
+
+
+def naive_feasible_starts(profile, busy, first: date, last: date, duration: int, not_before: datetime, step: int):
+    """Reference implementation: check every minute of every candidate in Python loops"""
+    schedule = profile["schedule"]
+    work = schedule["work_hours"]
+    work_start, work_end = parse_hhmm(work["start"]), parse_hhmm(work["end"])
+    work_days = work["days"]
+    lunch = parse_time_range(schedule["break_preferences"]["lunch_time"])
+    short_breaks = [parse_hhmm(b) for b in schedule["break_preferences"]["short_breaks"]]
+    buffer = profile["preferences"]["buffer_time"] * 60
+
+    def minute_free(day: date, minute: int) -> bool:
+        if WEEKDAY_NAMES[day.weekday()] not in work_days:
+            return False
+        if minute < work_start or minute >= work_end:
+            return False
+        if lunch[0] <= minute < lunch[1]:
+            return False
+        if any(b <= minute < b + SHORT_BREAK_MINUTES for b in short_breaks):
+            return False
+        moment = datetime.combine(day, datetime.min.time(), TZ) + timedelta(minutes=minute)
+        if moment < not_before:
+            return False
+        ts = moment.timestamp()
+        return not any(s - buffer <= ts < e + buffer for s, e in busy)
+
+    result = []
+    total = ((last - first).days + 1) * MINUTES_PER_DAY
+    for offset in range(0, total - duration + 1, step):
+        ok = True
+        for m in range(offset, offset + duration):
+            day = first + timedelta(days=m // MINUTES_PER_DAY)
+            if not minute_free(day, m % MINUTES_PER_DAY):
+                ok = False
+                break
+        if ok:
+            result.append(offset)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized vs naive free-slot search")
+    parser.add_argument('--days', type=int, default=92)
+    parser.add_argument('--events-per-day', type=int, default=6)
+    parser.add_argument('--duration', type=int, default=90)
+    parser.add_argument('--naive-days', type=int, default=14, help="range used for the (slow) naive comparison")
+    args = parser.parse_args()
+
+    profile = MemoryManager().default_profile
+    first = date(2030, 1, 7)
+    not_before = datetime.combine(first, datetime.min.time(), TZ)
+    finder = SlotFinder(profile, "Europe/Berlin")
+
+    last = first + timedelta(days=args.days - 1)
+    busy = synthetic_busy(first, args.days, args.events_per_day)
+    runs = []
+    for _ in range(20):
+        start = time.perf_counter()
+        slots = finder.find_slots(busy, first, last, args.duration, now=not_before)
+        runs.append(time.perf_counter() - start)
+    runs.sort()
+    print(f"vectorized: {args.days} days, {len(busy)} events -> {len(slots)} slots, "
+          f"median {runs[len(runs) // 2] * 1000:.2f} ms")
+    for s, e in slots:
+        print(f"    {s:%a %d %b %H:%M}-{e:%H:%M}")
+
+    small_last = first + timedelta(days=args.naive_days - 1)
+    small_busy = synthetic_busy(first, args.naive_days, args.events_per_day)
+    start = time.perf_counter()
+    free = finder.availability(small_busy, first, small_last, not_before=not_before)
+    fast = finder.feasible_starts(free, args.duration).tolist()
+    fast_time = time.perf_counter() - start
+    start = time.perf_counter()
+    slow = naive_feasible_starts(profile, small_busy, first, small_last, args.duration, not_before, finder.step)
+    slow_time = time.perf_counter() - start
+    print(f"naive:      {args.naive_days} days -> {slow_time * 1000:.1f} ms vs vectorized {fast_time * 1000:.2f} ms "
+          f"({slow_time / fast_time:.0f}x), same result: {fast == slow}")
+    return 0 if fast == slow else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim import calendar_client
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.response_cache import ResponseCache
+
+TIMEZONE = "Europe/Berlin"
+REQUESTS = [
+    "schedule a dentist appointment tomorrow from 3pm to 4pm",
+    "set up a meeting tomorrow from 10 to 11 about the offsite budget",
+    "book lunch with anna tomorrow from 12pm to 1pm",
+    "schedule the quarterly review tomorrow from 4pm to 5pm",
+]
+
+
+def populate(service: FakeCalendarService, events: int):
+    first = datetime.now(ZoneInfo(TIMEZONE)).replace(hour=8, minute=0, second=0, microsecond=0)
+    for i in range(events):
+        start = first + timedelta(hours=3 * i)
+        service._insert('primary', {
+            "summary": f"Meeting {i}",
+            "start": {"dateTime": start.isoformat(), "timeZone": TIMEZONE},
+            "end": {"dateTime": (start + timedelta(hours=1)).isoformat(), "timeZone": TIMEZONE},
+        })
+
+
+def partials(text: str):
+    """What a streaming recognizer reports while the sentence is spoken, a word at a time"""
+    words = text.split()
+    return [" ".join(words[:i]) for i in range(1, len(words) + 1)]
+
+
+def llm_reply(brain: CalendarBrain):
+    """The create reply the LLM would give: what the fast path parses, at full confidence"""
+    def reply(messages):
+        parsed, _ = brain.fast_path.parse(messages[-1]["content"], {})
+        return json.dumps(parsed)
+    return reply
+
+
+def run(tmp: str, args, speculative: bool, via_llm: bool):
+    """Latency from the end of speech to the confirmation prompt, per request"""
+    service = FakeCalendarService(list_latency=args.latency_ms / 1000)
+    populate(service, args.events)
+    store = EventStore(os.path.join(tmp, f"events-{speculative}-{via_llm}.db"), max_staleness=30.0)
+    # Not streamed: the delay is the whole completion
+    llm = FakeOpenAI([], delay=args.llm_ms / 1000)
+    brain = CalendarBrain(client=llm, calendar_service=service, event_store=store,
+                          response_cache=ResponseCache(':memory:'))
+    llm.responses = llm_reply(brain)
+    brain.speculation.enabled = speculative
+    if via_llm:
+        # Requests the fast path is unsure about: the LLM answers, speculation overlaps with it
+        brain.fast_path.confidence_threshold = 1.01
+    brain.check_schedule({"date": "2000-01-01", "start": "09:00", "end": "10:00"})
+    word_gap = args.word_ms / 1000
+    latencies = []
+    for i in range(args.turns):
+        text = REQUESTS[i % len(REQUESTS)]
+        # The user was quiet for a while: the local copy of the calendar needs a sync
+        store._last_sync = 0.0
+        # Every request is new to the LLM
+        brain.response_cache = ResponseCache(':memory:')
+        for partial in partials(text):
+            if not via_llm:
+                brain.speculation.on_partial(partial)
+            time.sleep(word_gap)
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            brain.process_conversation(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if brain.awaiting_confirmation:
+            # "Yes": the body built during the prefetch is sent as it is
+            with redirect_stdout(io.StringIO()):
+                brain.create_event_from_context()
+        brain.conversation_context = {}
+        brain.awaiting_confirmation = False
+    return latencies, brain.speculation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-of-speech latency with and without speculative prefetch")
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=120.0, help="simulated round-trip of one calendar sync")
+    parser.add_argument('--word-ms', type=float, default=60.0, help="time between partial transcripts")
+    parser.add_argument('--llm-ms', type=float, default=300.0, help="simulated LLM completion time")
+    args = parser.parse_args()
+
+    # The fake calendar has no quota; pacing would only measure the limiter
+    calendar_client.calendar_rate_limiter.rate = 1e6
+    calendar_client.calendar_rate_limiter.capacity = 1e6
+    with tempfile.TemporaryDirectory() as tmp:
+        for via_llm in (False, True):
+            for speculative in (False, True):
+                label = f"{'llm' if via_llm else 'fast path'}, {'speculative' if speculative else 'on demand'}"
+                latencies, speculation = run(tmp, args, speculative, via_llm)
+                latencies.sort()
+                print(f"{label:<24} p50 {statistics.median(latencies):7.1f} ms  "
+                      f"p95 {latencies[int(len(latencies) * 0.95)]:7.1f} ms")
+                if speculative:
+                    print(f"{'':<24} {speculation.report()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must not be loaded before the first turn needs them
+DEFERRED_MODULES = [
+    "openai",
+    "googleapiclient.discovery",
+    "google_auth_httplib2",
+    "google.oauth2.service_account",
+    "dateparser",
+    "numpy",
+]
+# Import main and build the assistant the way main() does, minus the microphone
+STARTUP_SNIPPET = """
+import tempfile
+from main import KimAssistant
+from kim.memory import MemoryManager
+with tempfile.TemporaryDirectory() as tmp:
+    KimAssistant(memory=MemoryManager(memory_dir=tmp))
+"""
+
+
+def parse_importtime(stderr: str):
+    """{module: cumulative microseconds} for every import in -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SNIPPET],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start: import time of main.py and the modules it pulls in")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument('--budget-ms', type=float, default=400.0, help="fail when `import main` takes longer")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    main_ms = statistics.median(r.get("main", 0) for r in runs) / 1000
+    last = runs[-1]
+    print(f"import main: {main_ms:.0f} ms (median of {args.runs})")
+    print("Slowest imports (cumulative):")
+    for name, us in sorted(last.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40} {us / 1000:7.1f} ms")
+
+    failures = [f"{name} is imported at startup" for name in DEFERRED_MODULES if name in last]
+    if main_ms > args.budget_ms:
+        failures.append(f"import main took {main_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if failures:
+        print("FAIL:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("Cold start within budget; heavy modules stay deferred")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+import asyncio
+import copy
+import itertools
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Union
+from googleapiclient.errors import HttpError
+from kim.recurrence import UNBOUNDED, expand_events
+
+
+class _Response(dict):
+    def __init__(self, status: int):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = ''
+
+
+def _selected_fields(fields: Optional[str]) -> Optional[set]:
+    """Event fields named by a partial-response selector such as nextPageToken,items(id,start)"""
+    if not fields or 'items(' not in fields:
+        return None
+    inner = fields.split('items(', 1)[1].rsplit(')', 1)[0]
+    return {name.split('(', 1)[0].split('/', 1)[0].strip() for name in inner.split(',')}
+
+
+class FakeRequest:
+    def __init__(self, fn, method_id: str = 'calendar.request', body: Optional[Dict] = None):
+        self._fn = fn
+        # Same attributes as googleapiclient's HttpRequest: span names and the retry policy read them
+        self.methodId = method_id
+        self.body = body
+
+    def execute(self, num_retries: int = 0):
+        return self._fn()
+
+
+class FakeBatch:
+    """Mimics BatchHttpRequest: one round-trip, per-request callbacks"""
+
+    def __init__(self, service: 'FakeCalendarService', callback=None):
+        self._service = service
+        self._callback = callback
+        # Laid out like BatchHttpRequest's, which the retry policy inspects
+        self._requests: Dict[str, FakeRequest] = {}
+        self._callbacks: Dict[str, Callable] = {}
+        self._order: List[str] = []
+
+    def add(self, request: FakeRequest, callback=None, request_id: Optional[str] = None):
+        if request_id is None:
+            request_id = str(len(self._order))
+        self._requests[request_id] = request
+        self._callbacks[request_id] = callback or self._callback
+        self._order.append(request_id)
+
+    def execute(self):
+        self._service._count('batch')
+        for request_id in self._order:
+            request, callback = self._requests[request_id], self._callbacks[request_id]
+            try:
+                response, exception = request.execute(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+def _rfc3339_ts(value: Optional[str], default: float) -> float:
+    if not value:
+        return default
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+class FakeEventsResource:
+    def __init__(self, service: 'FakeCalendarService'):
+        self._service = service
+
+    def insert(self, calendarId: str, body: Dict, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._insert(calendarId, body), 'calendar.events.insert', body)
+
+    def get(self, calendarId: str, eventId: str, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._get(calendarId, eventId), 'calendar.events.get')
+
+    def update(self, calendarId: str, eventId: str, body: Dict, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._update(calendarId, eventId, body), 'calendar.events.update', body)
+
+    def patch(self, calendarId: str, eventId: str, body: Dict, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._patch(calendarId, eventId, body), 'calendar.events.patch', body)
+
+    def delete(self, calendarId: str, eventId: str, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._delete(calendarId, eventId), 'calendar.events.delete')
+
+    def list(self, calendarId: str, **kwargs) -> FakeRequest:
+        return FakeRequest(lambda: self._service._list(calendarId, **kwargs), 'calendar.events.list')
+
+
+class FakeCalendarService:
+    """Google Calendar ``service`` double that keeps events in a dict and emits sync tokens"""
+
+    def __init__(self, page_size: int = 250, list_latency: float = 0.0):
+        self.page_size = page_size
+        # Seconds each events.list call takes, to stand in for the network
+        self.list_latency = list_latency
+        self.calendars: Dict[str, Dict[str, Dict]] = {}
+        self.calls: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        # Change log used to answer incremental syncs: (sequence, calendar_id, event)
+        self._changes: List[tuple] = []
+        self._seq = 0
+        self.expired_tokens = set()
+
+    def events(self) -> FakeEventsResource:
+        return FakeEventsResource(self)
+
+    def new_batch_http_request(self, callback=None) -> FakeBatch:
+        return FakeBatch(self, callback)
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _record(self, calendar_id: str, event: Dict):
+        self._seq += 1
+        self._changes.append((self._seq, calendar_id, copy.deepcopy(event)))
+
+    def _not_found(self):
+        raise HttpError(_Response(404), b'{"error": {"message": "Not Found"}}')
+
+    def _insert(self, calendar_id: str, body: Dict) -> Dict:
+        self._count('insert')
+        if body.get('id') in self.calendars.get(calendar_id, {}):
+            # Client-supplied ids are unique per calendar
+            raise HttpError(_Response(409), b'{"error": {"message": "The requested identifier already exists."}}')
+        event = copy.deepcopy(body)
+        event.setdefault('id', f"evt{next(self._ids)}")
+        event.setdefault('status', 'confirmed')
+        self.calendars.setdefault(calendar_id, {})[event['id']] = event
+        self._record(calendar_id, event)
+        return copy.deepcopy(event)
+
+    def _get(self, calendar_id: str, event_id: str) -> Dict:
+        self._count('get')
+        event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            self._not_found()
+        return copy.deepcopy(event)
+
+    def _update(self, calendar_id: str, event_id: str, body: Dict) -> Dict:
+        self._count('update')
+        if event_id not in self.calendars.get(calendar_id, {}):
+            self._not_found()
+        event = copy.deepcopy(body)
+        event['id'] = event_id
+        self.calendars[calendar_id][event_id] = event
+        self._record(calendar_id, event)
+        return copy.deepcopy(event)
+
+    def _patch(self, calendar_id: str, event_id: str, body: Dict) -> Dict:
+        self._count('patch')
+        event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            self._not_found()
+        event.update(copy.deepcopy(body))
+        self._record(calendar_id, event)
+        return copy.deepcopy(event)
+
+    def _delete(self, calendar_id: str, event_id: str):
+        self._count('delete')
+        event = self.calendars.get(calendar_id, {}).pop(event_id, None)
+        if event is None:
+            self._not_found()
+        self._record(calendar_id, {'id': event_id, 'status': 'cancelled'})
+        return ''
+
+    def _list(
+        self,
+        calendar_id: str,
+        syncToken: Optional[str] = None,
+        pageToken: Optional[str] = None,
+        maxResults: Optional[int] = None,
+        **kwargs
+    ) -> Dict:
+        self._count('list')
+        if self.list_latency:
+            time.sleep(self.list_latency)
+        if syncToken is not None:
+            if syncToken in self.expired_tokens:
+                raise HttpError(_Response(410), b'{"error": {"message": "Gone"}}')
+            since = int(syncToken.split(':')[1])
+            latest = {}
+            for seq, cal, event in self._changes:
+                if seq > since and cal == calendar_id:
+                    latest[event['id']] = event
+            items = list(latest.values())
+        else:
+            # Insertion order, as unordered as the API's unless orderBy=startTime
+            items = list(self.calendars.get(calendar_id, {}).values())
+            if kwargs.get('orderBy') == 'startTime':
+                items.sort(key=lambda e: _rfc3339_ts(
+                    (e.get('start') or {}).get('dateTime') or (e.get('start') or {}).get('date'), 0.0
+                ))
+
+        page_size = maxResults or self.page_size
+        offset = int(pageToken) if pageToken else 0
+        if syncToken is None and kwargs.get('singleEvents'):
+            # Like the API: one item per occurrence; open-ended series are cut at the page end
+            time_min = _rfc3339_ts(kwargs.get('timeMin'), 0.0)
+            time_max = _rfc3339_ts(kwargs.get('timeMax'), UNBOUNDED)
+            items = list(itertools.islice(expand_events(items, time_min, time_max), offset + page_size + 1))
+        page = items[offset:offset + page_size]
+        selected = _selected_fields(kwargs.get('fields'))
+        if selected is not None:
+            page = [{k: v for k, v in e.items() if k in selected} for e in page]
+        result = {'items': copy.deepcopy(page)}
+        if offset + page_size < len(items):
+            result['nextPageToken'] = str(offset + page_size)
+        else:
+            result['nextSyncToken'] = f"sync:{self._seq}"
+        return result
+
+    def expire_token(self, token: str):
+        """Make the next incremental sync with this token fail with 410 Gone"""
+        self.expired_tokens.add(token)
+
+
+class _FakeCompletions:
+    def __init__(self, client: 'FakeOpenAI'):
+        self._client = client
+
+    def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        client = self._client
+        client.calls += 1
+        client.requests.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        content = client._next_content(messages)
+        if not stream:
+            if client.delay:
+                time.sleep(client.delay)
+            message = SimpleNamespace(role="assistant", content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+        return client._stream(content)
+
+
+class FakeOpenAI:
+    """OpenAI client double serving canned JSON replies, optionally as a token stream"""
+
+    def __init__(
+        self,
+        responses: Union[List[str], Callable[[List[Dict]], str]],
+        chunk_size: int = 4,
+        delay: float = 0.0
+    ):
+        self.responses = responses
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.calls = 0
+        self.requests: List[Dict] = []
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    def _next_content(self, messages: List[Dict]) -> str:
+        if callable(self.responses):
+            return self.responses(messages)
+        return self.responses[(self.calls - 1) % len(self.responses)]
+
+    def _stream(self, content: str):
+        for i in range(0, len(content), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            delta = SimpleNamespace(content=content[i:i + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason="stop")])
+
+
+class _FakeAsyncCompletions:
+    def __init__(self, client: 'FakeAsyncOpenAI'):
+        self._client = client
+
+    async def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        client = self._client
+        client.calls += 1
+        client.requests.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        content = client._next_content(messages)
+        if not stream:
+            if client.delay:
+                await asyncio.sleep(client.delay)
+            message = SimpleNamespace(role="assistant", content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+        return client._stream_async(content)
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """AsyncOpenAI double: same canned replies, awaited and async-streamed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chat = SimpleNamespace(completions=_FakeAsyncCompletions(self))
+
+    async def _stream_async(self, content: str):
+        for i in range(0, len(content), self.chunk_size):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            delta = SimpleNamespace(content=content[i:i + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason="stop")])
@@ -0,0 +1,66 @@
+import argparse
+from typing import List, Optional
+from kim.calendar_api import authenticate_google_calendar
+from kim.calendar_io import DEFAULT_TIMEZONE, ImportCheckpoint, export_events, import_events
+from kim.event_store import EventStore
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk import or export Kim's calendar as .ics/.csv")
+    parser.add_argument("--calendar", default="primary", help="calendar id (default: primary)")
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE,
+                        help="zone for floating times and entries without one")
+    parser.add_argument("--format", choices=("ics", "csv"), help="file format (default: from the extension)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("import", help="add the events of a file, skipping ones already there")
+    imports.add_argument("path")
+    imports.add_argument("--checkpoint", metavar="PATH",
+                         help="progress database to resume from (default: one per file under kim/memory/imports)")
+    imports.add_argument("--dry-run", action="store_true", help="validate and dedupe without inserting anything")
+
+    exports = commands.add_parser("export", help="write the calendar to a file")
+    exports.add_argument("path")
+    exports.add_argument("--from", dest="time_min", metavar="RFC3339", help="only events ending after this")
+    exports.add_argument("--to", dest="time_max", metavar="RFC3339", help="only events starting before this")
+    return parser.parse_args(argv)
+
+
+def show_progress(report: dict):
+    print(f"\r📥 {report['read']} read, {report['imported']} imported, "
+          f"{report['duplicates']} duplicates, {report['invalid'] + report['failed']} errors", end="", flush=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    service = authenticate_google_calendar()
+
+    if args.command == "export":
+        count = export_events(service, args.path, args.format, args.time_min, args.time_max,
+                              calendar_id=args.calendar, default_tz=args.timezone)
+        print(f"📤 Exported {count} events to {args.path}")
+        return
+
+    store = EventStore(calendar_id=args.calendar, default_timezone=args.timezone)
+    checkpoint = ImportCheckpoint(args.checkpoint) if args.checkpoint else ImportCheckpoint.for_source(args.path, args.calendar)
+    try:
+        # The local copy seeds the duplicate check and learns about every inserted event
+        store.ensure_fresh(service)
+        report = import_events(service, args.path, args.format, store, checkpoint, calendar_id=args.calendar,
+                               default_tz=args.timezone, dry_run=args.dry_run, on_progress=show_progress)
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted, run the same command again to resume")
+        return
+    finally:
+        checkpoint.close()
+        store.close()
+
+    verb = "Would import" if args.dry_run else "Imported"
+    print(f"\n✅ {verb} {report['imported']} of {report['read']} entries "
+          f"({report['duplicates']} duplicates, {report['invalid']} invalid, {report['failed']} failed)")
+    for error in report["errors"]:
+        print(f"  ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import json
+import asyncio
+import hashlib
+from typing import Callable, Dict, List, Optional
+from .rate_limit import TokenBucket
+from .tracing import span
+
+# Rough prompt size when no tokenizer is at hand: ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages: List[Dict], max_completion_tokens: int = 512) -> int:
+    """Upper-bound token cost of a request for TPM accounting"""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // CHARS_PER_TOKEN + max_completion_tokens
+
+
+class AsyncLLMGateway:
+    """
+    Shared AsyncOpenAI access for every brain in the process.
+
+    One AsyncOpenAI client (and so one pooled HTTP client) is used by all
+    callers. A semaphore caps concurrent completions and two token buckets
+    keep requests/min and tokens/min under the account quotas. Identical
+    requests already in flight are coalesced: later callers await the first
+    caller's completion instead of sending their own.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_concurrency: int = 16,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 30000,
+        max_completion_tokens: int = 512
+    ):
+        self._client = client
+        self.max_concurrency = max_concurrency
+        self.max_completion_tokens = max_completion_tokens
+        self.request_limiter = TokenBucket(requests_per_minute / 60.0, requests_per_minute)
+        self.token_limiter = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Coalesced callers per in-flight key, besides the one that started it
+        self._waiters: Dict[str, int] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            self._client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=DefaultAsyncHttpxClient()
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the serving event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def request_key(model: str, messages: List[Dict], params: Dict) -> str:
+        payload = json.dumps({"model": model, "messages": messages, **params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def complete(
+        self,
+        model: str,
+        messages: List[Dict],
+        on_content: Optional[Callable[[str], None]] = None,
+        coalesce_key: Optional[str] = None,
+        **params
+    ) -> str:
+        """
+        Completion text for the request.
+
+        With on_content the completion is streamed and each content chunk is
+        passed to it. A coalesced caller receives no chunks, only the result.
+        coalesce_key names requests that must get the same answer even when
+        their messages differ (e.g. by session history); by default only
+        identical requests are coalesced. max_completion_tokens is sent
+        unless the caller sets it, so the TPM estimate bounds real usage.
+        """
+        params.setdefault("max_completion_tokens", self.max_completion_tokens)
+        key = coalesce_key or self.request_key(model, messages, params)
+        task = self._inflight.get(key)
+        errors: List[BaseException] = []
+        if task is not None and not task.done():
+            self.coalesced += 1
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+        else:
+            deliver = self._isolated(key, on_content, errors) if on_content is not None else None
+            task = asyncio.ensure_future(self._run(model, messages, deliver, params))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+
+            def done(_):
+                self._inflight.pop(key, None)
+                self._waiters.pop(key, None)
+            task.add_done_callback(done)
+        # Shielded so one caller going away does not cancel the others' completion
+        content = await asyncio.shield(task)
+        if errors:
+            raise errors[0]
+        return content
+
+    def _isolated(self, key: str, on_content: Callable[[str], None], errors: List[BaseException]):
+        """
+        on_content whose errors stay with its caller: once others wait on the
+        same completion, a failing callback stops receiving chunks instead of
+        failing the shared stream.
+        """
+        def deliver(content: str):
+            if errors:
+                return
+            try:
+                on_content(content)
+            except Exception as e:
+                if not self._waiters.get(key):
+                    # Nobody else needs the rest of the completion (e.g. barge-in): abandon it
+                    raise
+                errors.append(e)
+        return deliver
+
+    async def _run(self, model: str, messages: List[Dict], on_content, params: Dict) -> str:
+        await self.request_limiter.acquire_async()
+        await self.token_limiter.acquire_async(estimate_tokens(messages, params["max_completion_tokens"]))
+        async with self.semaphore:
+            self.requests += 1
+            with span("llm.completion", model=model, stream=on_content is not None):
+                if on_content is None:
+                    response = await self.client.chat.completions.create(model=model, messages=messages, **params)
+                    return response.choices[0].message.content
+
+                stream = await self.client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+                parts = []
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        parts.append(content)
+                        on_content(content)
+                return "".join(parts)
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -1,27 +1,71 @@
 import os
 import json
+import asyncio
+import hashlib
+import threading
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from openai import OpenAI
-from typing import Dict, Optional, Union, List
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union, List
 from zoneinfo import ZoneInfo
 from .calendar_api import (
+    _event_body,
     authenticate_google_calendar,
     list_events,
-    create_event,
+    insert_event,
     update_event,
     delete_event,
     get_event
 )
+from .async_llm import AsyncLLMGateway
+from .event_store import EventStore
+from .fast_path import FastPathParser
+from .prompt_builder import PromptBuilder
+from .streaming import StreamingJSONParser, TurnCancelled
+from .recurrence import normalize_recurrence, recurrence_summary
+from .response_cache import ResponseCache
+from .busy_index import BusyIndex, check_schedule
+from .speculation import SpeculativePrefetcher
+from .tracing import span
 
 load_dotenv()
 
+def _openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
 class CalendarBrain:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.calendar_service = authenticate_google_calendar()
+    def __init__(
+        self,
+        client=None,
+        calendar_service=None,
+        event_store: Optional[EventStore] = None,
+        busy_index: Optional[BusyIndex] = None,
+        response_cache: Optional[ResponseCache] = None,
+        llm_gateway: Optional[AsyncLLMGateway] = None,
+        client_factory: Optional[Callable[[], object]] = None,
+        calendar_factory: Optional[Callable[[], object]] = None
+    ):
+        # Everything but the conversation state can be shared between brains (see server.py)
+        # The OpenAI client and the calendar login are created on first use (see warm_up),
+        # by the factories when given so that brains can share one lazily created client
+        self._client = client
+        self._llm_gateway = llm_gateway
+        self._calendar_service = calendar_service
+        self._client_factory = client_factory or _openai_client
+        self._calendar_factory = calendar_factory or authenticate_google_calendar
+        self._init_lock = threading.Lock()
+        self.event_store = event_store or EventStore()
         self.model = "gpt-4o"
         self.default_timezone = "Europe/Berlin"
+        self.fast_path = FastPathParser(self.default_timezone)
+        self.busy_index = busy_index or BusyIndex(self.default_timezone)
+        self._busy_lock = threading.Lock()
+        # Warms the calendar for the slot being discussed while the user talks or the LLM thinks
+        self.speculation = SpeculativePrefetcher(self)
+        self.profile: Dict = {}
+        # Set by KimAssistant: its MemoryManager and in-memory turn history
+        self.memory = None
+        self.history: Sequence[Dict] = ()
         self.conversation_context = {}
         self.awaiting_confirmation = False
         self.system_prompt = f"""
@@ -34,66 +78,363 @@ class CalendarBrain:
            - Maintain context between messages
            - Default duration is 1 hour if end_time not specified
            - Timezone: {self.default_timezone}
+           - Repeating events ("every Monday", "daily until June"): recurrence is an
+             RFC 5545 rule such as "RRULE:FREQ=WEEKLY;BYDAY=MO", otherwise null
 
         2. Title extraction examples:
            - "Meeting about project tomorrow 2pm" → title: "Project Meeting"
            - "Lunch with John Friday" → title: "Lunch with John"
            - "Team sync next week" → title: "Team Sync"
 
-        3. Always return JSON with:
+        3. For availability questions ("when am I free for 90 minutes next week"):
+           - Use intent "find_slot"
+           - data: duration (minutes, null if not said), range_start and range_end (YYYY-MM-DD)
+
+        4. Always return JSON with:
            {{
-             "intent": "create|confirm|clarify|general",
+             "intent": "create|confirm|clarify|general|find_slot",
              "message": "response text",
              "missing_fields": ["field1", "field2"],
              "data": {{
                "title": "extracted title",
                "date": "YYYY-MM-DD",
                "start": "HH:MM",
-               "end": "HH:MM"
+               "end": "HH:MM",
+               "recurrence": "RRULE:... or null"
              }}
            }}
         """
+        # Cached replies are only valid for the prompt and model that produced them
+        self.prompt_version = hashlib.sha256(
+            f"{self.model}\n{self.system_prompt}".encode("utf-8")
+        ).hexdigest()[:16]
+        self.response_cache = response_cache or ResponseCache(timezone=self.default_timezone)
+        self.prompt_builder = PromptBuilder(self.system_prompt, self.model)
 
-    def process_conversation(self, user_input: str) -> Dict:
+    def process_conversation(
+        self,
+        user_input: str,
+        on_message_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """Answer one turn; on_message_delta receives the reply text as it streams in"""
         try:
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                *self._get_conversation_context(),
-                {"role": "user", "content": user_input}
-            ]
+            parsed, confidence = self.fast_path.parse(user_input, self.conversation_context)
+            if parsed is None or confidence < self.fast_path.confidence_threshold:
+                self._speculate(parsed)
+                parsed = self._ask_llm_cached(user_input, on_message_delta)
+                return self._finalize_response(parsed, user_input)
+            return self._answer_fast_path(parsed, user_input)
             
+        except TurnCancelled:
+            raise
+        except Exception as e:
+            print(f"Processing error: {str(e)}")
+            return {
+                "intent": "error",
+                "message": "Sorry, I encountered an error. Please try again."
+            }
+
+    async def process_conversation_async(
+        self,
+        user_input: str,
+        on_message_delta: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """process_conversation for event loops: the LLM call is awaited, calendar and disk work run in threads"""
+        try:
+            parsed, confidence = self.fast_path.parse(user_input, self.conversation_context)
+            if parsed is None or confidence < self.fast_path.confidence_threshold:
+                self._speculate(parsed)
+                parsed = await self._ask_llm_cached_async(user_input, on_message_delta)
+                return await asyncio.to_thread(self._finalize_response, parsed, user_input)
+            return await asyncio.to_thread(self._answer_fast_path, parsed, user_input)
+
+        except (TurnCancelled, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            print(f"Processing error: {str(e)}")
+            return {
+                "intent": "error",
+                "message": "Sorry, I encountered an error. Please try again."
+            }
+
+    def _answer_fast_path(self, parsed: Dict, user_input: str) -> Dict:
+        if parsed["intent"] == "general":
+            parsed["message"] = self.handle_general_conversation(user_input)
+        elif parsed["intent"] == "confirm":
+            # "yes" with a complete event but no pending question: ask again
+            parsed["message"] = self._confirmation_message(parsed["data"])
+            self.awaiting_confirmation = True
+            return parsed
+        elif parsed["intent"] == "cancel":
+            self.conversation_context = {}
+            self.awaiting_confirmation = False
+            self.speculation.discard()
+            return parsed
+        return self._finalize_response(parsed, user_input)
+
+    def _speculate(self, parsed: Optional[Dict]):
+        # The fast path could not answer, but a date it found is worth prefetching during the LLM call
+        if parsed is not None and parsed.get("intent") == "create":
+            self.speculation.speculate({**self.conversation_context, **(parsed.get("data") or {})})
+
+    def _cache_key(self, user_input: str) -> str:
+        # The reply depends on the user's profile facts and the slot being discussed (the context),
+        # not on the rolling history, which changes every turn and would make every key unique
+        profile = hashlib.sha256(
+            json.dumps(self.profile, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return self.response_cache.make_key(
+            user_input,
+            self.conversation_context,
+            self.prompt_version,
+            datetime.now(ZoneInfo(self.default_timezone)).date(),
+            prompt_context=profile
+        )
+
+    def _ask_llm_cached(self, user_input: str, on_message_delta: Optional[Callable[[str], None]]) -> Dict:
+        key = self._cache_key(user_input)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            if on_message_delta is not None and cached.get("message"):
+                on_message_delta(cached["message"])
+            return cached
+        messages = self._build_messages(user_input)
+
+        if on_message_delta is not None:
+            parsed = self._ask_llm_streaming(user_input, on_message_delta, messages)
+        else:
+            parsed = self._ask_llm(user_input, messages)
+        if parsed.get("intent") != "error":
+            self.response_cache.put(key, parsed)
+        return parsed
+
+    async def _ask_llm_cached_async(
+        self,
+        user_input: str,
+        on_message_delta: Optional[Callable[[str], None]]
+    ) -> Dict:
+        # The cache and the history search are SQLite work: keep them off the event loop
+        key = self._cache_key(user_input)
+        cached = await asyncio.to_thread(self.response_cache.get, key)
+        if cached is not None:
+            if on_message_delta is not None and cached.get("message"):
+                on_message_delta(cached["message"])
+            return cached
+        messages = await asyncio.to_thread(self._build_messages, user_input)
+
+        parser = StreamingJSONParser("message") if on_message_delta is not None else None
+        streamed = False
+
+        def on_content(content: str):
+            nonlocal streamed
+            streamed = True
+            text = parser.feed(content)
+            if text:
+                on_message_delta(text)
+
+        content = await self.llm_gateway.complete(
+            self.model,
+            messages,
+            on_content=on_content if parser is not None else None,
+            # Same utterance, slot and profile: the same answer, whatever the history says
+            coalesce_key=key,
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            extra_body={"prompt_cache_key": self.prompt_version}
+        )
+        if parser is None:
+            parsed = json.loads(content)
+        else:
+            if not streamed:
+                # Coalesced onto another caller's completion: nothing was streamed here
+                on_content(content)
+            parsed = parser.finish()
+        if parsed.get("intent") != "error":
+            await asyncio.to_thread(self.response_cache.put, key, parsed)
+        return parsed
+
+    @property
+    def client(self):
+        with self._init_lock:
+            if self._client is None:
+                self._client = self._client_factory()
+            return self._client
+
+    @property
+    def calendar_service(self):
+        # Authentication waits for the first turn that needs the calendar
+        with self._init_lock:
+            if self._calendar_service is None:
+                self._calendar_service = self._calendar_factory()
+            return self._calendar_service
+
+    def warm_up(self, calendar: bool = False):
+        """
+        Pay the lazy start-up costs ahead of the first turn: the OpenAI client,
+        the tokenizer, the date parser and the slot finder, plus the calendar
+        login when calendar=True. Meant for a background thread once the
+        microphone is up.
+        """
+        with span("startup.warm_up"):
+            self.client
+            # Token counts are estimated until the encoding is loaded here
+            self.prompt_builder.counter.load()
+            self.fast_path.resolve_date("first of next month", datetime.now(ZoneInfo(self.default_timezone)).date())
+            from . import slot_finder  # noqa: F401  (imports numpy)
+            if calendar:
+                self.calendar_service
+
+    @property
+    def llm_gateway(self) -> AsyncLLMGateway:
+        # Only the async path needs it; sync-only callers never create an AsyncOpenAI client
+        if self._llm_gateway is None:
+            self._llm_gateway = AsyncLLMGateway()
+        return self._llm_gateway
+
+    def _build_messages(self, user_input: str) -> List[Dict]:
+        return self.prompt_builder.build(
+            user_input,
+            slot_context=self._get_conversation_context(),
+            profile=self.profile,
+            history=self.history,
+            memory=self.memory
+        )
+
+    def _ask_llm(self, user_input: str, messages: Optional[List[Dict]] = None) -> Dict:
+        if messages is None:
+            messages = self._build_messages(user_input)
+        with span("llm.completion", model=self.model, stream=False):
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 response_format={"type": "json_object"},
-                temperature=0.3
+                temperature=0.3,
+                extra_body={"prompt_cache_key": self.prompt_version}
+            )
+        
+        return json.loads(response.choices[0].message.content)
+
+    def _ask_llm_streaming(
+        self,
+        user_input: str,
+        on_message_delta: Callable[[str], None],
+        messages: Optional[List[Dict]] = None
+    ) -> Dict:
+        if messages is None:
+            messages = self._build_messages(user_input)
+        with span("llm.completion", model=self.model, stream=True):
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=0.3,
+                extra_body={"prompt_cache_key": self.prompt_version},
+                stream=True
             )
             
-            parsed = json.loads(response.choices[0].message.content)
-            self._update_context(parsed, user_input)
-            
-            if parsed.get("intent") == "create":
-                if parsed.get("missing_fields"):
-                    missing = ", ".join(parsed["missing_fields"])
-                    parsed["message"] = f"Could you please provide: {missing}?"
-                else:
-                    parsed["message"] = (
-                        f"Confirm: Schedule '{parsed['data']['title']}' on "
-                        f"{parsed['data']['date']} from {parsed['data']['start']} "
-                        f"to {parsed['data']['end']}?"
-                    )
-                    self.awaiting_confirmation = True
-            
+            parser = StreamingJSONParser("message")
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    text = parser.feed(content)
+                    if text:
+                        on_message_delta(text)
+        return parser.finish()
+
+    def _finalize_response(self, parsed: Dict, user_input: str) -> Dict:
+        self._update_context(parsed, user_input)
+        
+        if parsed.get("intent") == "find_slot":
+            parsed["message"] = self.find_free_slots(parsed.get("data") or {})
             return parsed
-            
+        
+        if parsed.get("intent") == "create":
+            if parsed.get("missing_fields"):
+                missing = ", ".join(parsed["missing_fields"])
+                parsed["message"] = f"Could you please provide: {missing}?"
+            else:
+                parsed["message"] = self._confirmation_message(parsed["data"])
+                problems = self.check_schedule(parsed["data"])
+                if problems:
+                    parsed["message"] += f" Note: it {'; it '.join(problems)}."
+                self.awaiting_confirmation = True
+        
+        return parsed
+
+    def _ensure_busy_index(self):
+        # Also called from speculative prefetches: load and subscribe only once
+        with self._busy_lock:
+            if not self.busy_index.loaded:
+                self.busy_index.load(self.event_store.all_events())
+                # Keep the index current on every create/update/delete and sync change
+                self.event_store.subscribe(self.busy_index)
+        self.event_store.ensure_fresh(self.calendar_service)
+
+    def _day_start(self, date_str: str) -> datetime:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        return datetime.combine(day, datetime.min.time(), ZoneInfo(self.default_timezone))
+
+    def _proposed_window(self, data: Dict) -> Optional[Tuple[datetime, datetime]]:
+        """(start, end) of a proposed event, or None until date, start and end are all known"""
+        if not (data.get("date") and data.get("start") and data.get("end")):
+            return None
+        day_start = self._day_start(data["date"])
+        start = datetime.strptime(self._convert_time_format(data["start"]), "%H:%M").time()
+        end = datetime.strptime(self._convert_time_format(data["end"]), "%H:%M").time()
+        start_dt = datetime.combine(day_start.date(), start, day_start.tzinfo)
+        end_dt = datetime.combine(day_start.date(), end, day_start.tzinfo)
+        if end_dt <= start_dt:
+            end_dt += timedelta(days=1)
+        return start_dt, end_dt
+
+    def _schedule_problems(self, start_dt: datetime, end_dt: datetime) -> List[str]:
+        return check_schedule(self.busy_index, self.profile, start_dt, end_dt)
+
+    def check_schedule(self, data: Dict) -> List[str]:
+        """Conflicts and profile-preference problems for a proposed event"""
+        try:
+            # Usually already worked out while the user was talking or the LLM was answering
+            problems = self.speculation.take_check(data)
+            if problems is not None:
+                return problems
+            window = self._proposed_window(data)
+            if window is None:
+                raise ValueError("date, start and end are required")
+            self._ensure_busy_index()
+            return self._schedule_problems(*window)
         except Exception as e:
-            print(f"Processing error: {str(e)}")
-            return {
-                "intent": "error",
-                "message": "Sorry, I encountered an error. Please try again."
-            }
+            print(f"⚠️ Conflict check skipped: {str(e)}")
+            return []
 
-    def _get_conversation_context(self) -> List[Dict]:
+    def _event_payload(self, data: Dict) -> Dict:
+        """The create_event body for data (see calendar_api._event_body)"""
+        window = self._proposed_window(data)
+        if window is None:
+            raise ValueError("date, start and end are required")
+        # Same window the schedule check saw: an end before the start is on the next day
+        start_dt, end_dt = window
+        return _event_body(
+            summary=data["title"],
+            start_datetime=start_dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            end_datetime=end_dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            timezone=self.default_timezone,
+            recurrence=data.get("recurrence")
+        )
+
+    def _confirmation_message(self, data: Dict) -> str:
+        try:
+            repeats = recurrence_summary(normalize_recurrence(data.get("recurrence")))
+        except ValueError:
+            repeats = ""
+        return (
+            f"Confirm: Schedule '{data['title']}' on "
+            f"{data['date']} from {data['start']} "
+            f"to {data['end']}{f', repeating {repeats}' if repeats else ''}?"
+        )
+
+    def _get_conversation_context(self) -> List[str]:
         context = []
         if self.conversation_context.get("title"):
             context.append(f"Current title: {self.conversation_context['title']}")
@@ -103,15 +444,15 @@ class CalendarBrain:
             context.append(f"Current start time: {self.conversation_context['start']}")
         if self.conversation_context.get("end"):
             context.append(f"Current end time: {self.conversation_context['end']}")
+        if self.conversation_context.get("recurrence"):
+            context.append(f"Current recurrence: {self.conversation_context['recurrence']}")
         
-        if context:
-            return [{"role": "system", "content": "Current context:\n" + "\n".join(context)}]
-        return []
+        return context
 
     def _update_context(self, parsed: Dict, user_input: str):
         if parsed.get("intent") in ["create", "confirm"]:
             if "data" in parsed:
-                for field in ["title", "date", "start", "end"]:
+                for field in ["title", "date", "start", "end", "recurrence"]:
                     if field in parsed["data"]:
                         self.conversation_context[field] = parsed["data"][field]
                 
@@ -123,27 +464,54 @@ class CalendarBrain:
                     except ValueError:
                         pass
 
+    def find_free_slots(self, data: Dict, limit: int = 3) -> str:
+        """Answer "when am I free" from the busy index and profile preferences"""
+        try:
+            tz = ZoneInfo(self.default_timezone)
+            today = datetime.now(tz).date()
+            first = datetime.strptime(data.get("range_start") or today.isoformat(), "%Y-%m-%d").date()
+            last = datetime.strptime(data.get("range_end") or first.isoformat(), "%Y-%m-%d").date()
+            first = max(first, today)
+            if last < first:
+                return "That date range is already over. Which days should I check?"
+            duration = int(
+                data.get("duration")
+                or self.profile.get("preferences", {}).get("meeting_duration")
+                or 60
+            )
+
+            self._ensure_busy_index()
+            window_start = datetime.combine(first, datetime.min.time(), tz).timestamp()
+            window_end = datetime.combine(last + timedelta(days=1), datetime.min.time(), tz).timestamp()
+            busy = self.busy_index.intervals_between(window_start, window_end)
+            from .slot_finder import SlotFinder
+            slots = SlotFinder(self.profile, self.default_timezone).find_slots(
+                busy, first, last, duration, limit=limit
+            )
+            if not slots:
+                return f"I couldn't find a free {duration}-minute slot between {first} and {last}."
+            options = ", ".join(
+                f"{start.strftime('%a %d %b %H:%M')}-{end.strftime('%H:%M')}" for start, end in slots
+            )
+            return f"You're free for {duration} minutes on: {options}."
+        except Exception as e:
+            print(f"⚠️ Slot search failed: {str(e)}")
+            return "Sorry, I couldn't check your availability right now."
+
     def create_event_from_context(self) -> str:
         try:
             if not all(k in self.conversation_context for k in ["title", "date", "start", "end"]):
                 return "❌ Missing information to schedule the event"
                 
-            start_time = self._convert_time_format(self.conversation_context["start"])
-            end_time = self._convert_time_format(self.conversation_context["end"])
-            
-            start_dt = f"{self.conversation_context['date']}T{start_time}:00"
-            end_dt = f"{self.conversation_context['date']}T{end_time}:00"
-            
-            event = create_event(
-                service=self.calendar_service,
-                summary=self.conversation_context["title"],
-                start_datetime=start_dt,
-                end_datetime=end_dt,
-                timezone=self.default_timezone
-            )
+            # Built and validated ahead of time when the prediction was right
+            body = self.speculation.take_payload(self.conversation_context)
+            if body is None:
+                body = self._event_payload(self.conversation_context)
+            event = insert_event(self.calendar_service, body, store=self.event_store)
             
             self.conversation_context = {}
             self.awaiting_confirmation = False
+            self.speculation.discard()
             return f"✅ Scheduled: {event['summary']} on {event['start']['dateTime']}"
             
         except Exception as e:
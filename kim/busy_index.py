@@ -0,0 +1,268 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from .event_store import event_start_ts, event_end_ts
+from .recurrence import is_recurring, iter_occurrences, original_start_ts, series_bounds
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class BusyIndex:
+    """
+    Sorted-array index of busy intervals for O(log n) overlap checks.
+
+    Intervals are kept sorted by start. Any event overlapping [start, end)
+    must start after ``start - longest_duration``, so a check only bisects
+    and scans that window instead of the whole calendar.
+
+    Recurring series are not materialized: each master is kept once and its
+    occurrences are generated for the queried window only, skipping the
+    ones its exceptions moved or cancelled. Series are kept sorted by their
+    last end, so a check skips the ones that finished before the window.
+
+    Listener puts append and the arrays are sorted once before the next
+    query, so a full sync (on_reset followed by every event) costs one
+    sort instead of one insert per event.
+    """
+
+    def __init__(self, default_timezone: str = "Europe/Berlin"):
+        self.default_timezone = default_timezone
+        self._intervals: List[Tuple[float, float, str]] = []
+        self._starts: List[float] = []
+        self._by_id: Dict[str, Tuple[float, float]] = {}
+        self._summaries: Dict[str, str] = {}
+        # Series id -> (master, first start, last end)
+        self._series: Dict[str, Tuple[Dict, float, float]] = {}
+        # (last end, first start, series id), sorted like _intervals
+        self._series_spans: List[Tuple[float, float, str]] = []
+        self._series_ends: List[float] = []
+        # Appended to since the last sort
+        self._unsorted = False
+        # Series id -> original starts replaced by exceptions; exception id -> (series id, original start)
+        self._overrides: Dict[str, set] = {}
+        self._override_of: Dict[str, Tuple[str, float]] = {}
+        self._max_duration = 0.0
+        self._max_dirty = False
+        self._lock = threading.RLock()
+        self.loaded = False
+        # Bumped on every change, so results computed earlier can tell they are stale
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._intervals) + len(self._series)
+
+    def load(self, events: Iterable[Dict]):
+        """Bulk (re)build from a list of events"""
+        with self._lock:
+            rows = []
+            self._by_id.clear()
+            self._summaries.clear()
+            self._series.clear()
+            self._overrides.clear()
+            self._override_of.clear()
+            self._series_spans = []
+            for event in events:
+                self._track_recurrence(event)
+                interval = self._interval(event)
+                if interval is None:
+                    continue
+                rows.append((interval[0], interval[1], event['id']))
+                self._by_id[event['id']] = interval
+                self._summaries[event['id']] = event.get('summary', '(no title)')
+            self._intervals = rows
+            self._unsorted = self._max_dirty = True
+            self._settle()
+            self.loaded = True
+            self.version += 1
+
+    def _settle(self):
+        """Sort whatever was appended since the last query"""
+        if self._unsorted:
+            self._intervals.sort()
+            self._starts = [r[0] for r in self._intervals]
+            self._series_spans.sort()
+            self._series_ends = [r[0] for r in self._series_spans]
+            self._unsorted = False
+        if self._max_dirty:
+            self._max_duration = max((e - s for s, e, _ in self._intervals), default=0.0)
+            self._max_dirty = False
+
+    def _track_recurrence(self, event: Dict):
+        """Remember series masters and the occurrences their exceptions replace"""
+        if is_recurring(event) and event.get('status') != 'cancelled':
+            first, last = series_bounds(event, self.default_timezone)
+            if first is not None:
+                self._series[event['id']] = (event, first, last)
+                self._series_spans.append((last, first, event['id']))
+                self._unsorted = True
+        master_id = event.get('recurringEventId')
+        original = original_start_ts(event, self.default_timezone) if master_id else None
+        if original is not None:
+            self._overrides.setdefault(master_id, set()).add(original)
+            self._override_of[event['id']] = (master_id, original)
+
+    def _interval(self, event: Dict) -> Optional[Tuple[float, float]]:
+        if event.get('status') == 'cancelled' or event.get('transparency') == 'transparent':
+            return None
+        if is_recurring(event):
+            return None
+        start = event_start_ts(event, self.default_timezone)
+        end = event_end_ts(event, self.default_timezone)
+        if start is None or end is None or end <= start:
+            return None
+        return start, end
+
+    # EventStore listener interface -------------------------------------
+
+    def on_event_put(self, event: Dict):
+        with self._lock:
+            self.on_event_removed(event['id'])
+            self.version += 1
+            self._track_recurrence(event)
+            interval = self._interval(event)
+            if interval is None:
+                return
+            start, end = interval
+            self._intervals.append((start, end, event['id']))
+            self._unsorted = True
+            self._by_id[event['id']] = interval
+            self._summaries[event['id']] = event.get('summary', '(no title)')
+            self._max_duration = max(self._max_duration, end - start)
+
+    def on_event_removed(self, event_id: str):
+        with self._lock:
+            self.version += 1
+            # A series' overrides stay: its exceptions are removed (and reported) on their own
+            series = self._series.pop(event_id, None)
+            override = self._override_of.pop(event_id, None)
+            if override is not None:
+                self._overrides.get(override[0], set()).discard(override[1])
+            interval = self._by_id.pop(event_id, None)
+            self._summaries.pop(event_id, None)
+            if series is None and interval is None:
+                return
+            # Only an event that was already indexed gets here, which a full sync never hits
+            self._settle()
+            if series is not None:
+                _, first, last = series
+                i = bisect_left(self._series_spans, (last, first, event_id))
+                if i < len(self._series_spans) and self._series_spans[i][2] == event_id:
+                    del self._series_spans[i]
+                    del self._series_ends[i]
+            if interval is None:
+                return
+            start, end = interval
+            i = bisect_left(self._intervals, (start, end, event_id))
+            if i < len(self._intervals) and self._intervals[i][2] == event_id:
+                del self._intervals[i]
+                del self._starts[i]
+            if end - start >= self._max_duration:
+                self._max_dirty = True
+
+    def on_reset(self):
+        self.load([])
+
+    # Queries -----------------------------------------------------------
+
+    def conflicts(self, start: float, end: float, exclude_id: Optional[str] = None) -> List[Dict]:
+        """Events overlapping [start, end), ordered by start"""
+        with self._lock:
+            self._settle()
+            lo = bisect_left(self._starts, start - self._max_duration)
+            hi = bisect_left(self._starts, end)
+            found = []
+            for s, e, event_id in self._intervals[lo:hi]:
+                if e > start and event_id != exclude_id:
+                    found.append({
+                        "id": event_id,
+                        "summary": self._summaries.get(event_id, "(no title)"),
+                        "start": s,
+                        "end": e
+                    })
+            # Series that ended by ``start`` sort before it
+            for _, first, series_id in self._series_spans[bisect_right(self._series_ends, start):]:
+                if series_id == exclude_id or first >= end:
+                    continue
+                master = self._series[series_id][0]
+                if master.get('transparency') == 'transparent':
+                    continue
+                exclude = self._overrides.get(series_id, ())
+                for occurrence in iter_occurrences(master, start, end, self.default_timezone, exclude):
+                    found.append({
+                        "id": occurrence['id'],
+                        "summary": master.get('summary', '(no title)'),
+                        "start": event_start_ts(occurrence, self.default_timezone),
+                        "end": event_end_ts(occurrence, self.default_timezone)
+                    })
+            if self._series:
+                found.sort(key=lambda c: c["start"])
+            return found
+
+    def is_free(self, start: float, end: float) -> bool:
+        return not self.conflicts(start, end)
+
+    def intervals_between(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """Busy (start, end) pairs overlapping [start, end)"""
+        return [(c["start"], c["end"]) for c in self.conflicts(start, end)]
+
+
+def parse_hhmm(hhmm: str) -> Optional[int]:
+    """Minutes since midnight for "HH:MM", or None"""
+    try:
+        t = datetime.strptime(hhmm.strip(), "%H:%M")
+        return t.hour * 60 + t.minute
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_time_range(window: str) -> Optional[Tuple[int, int]]:
+    """(start, end) minutes since midnight for "HH:MM-HH:MM", or None"""
+    if not isinstance(window, str) or "-" not in window:
+        return None
+    start, end = (parse_hhmm(part) for part in window.split("-", 1))
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+def check_schedule(
+    index: BusyIndex,
+    profile: Dict,
+    start_dt: datetime,
+    end_dt: datetime,
+    exclude_id: Optional[str] = None
+) -> List[str]:
+    """Human-readable problems with [start_dt, end_dt) against the calendar and profile"""
+    problems = []
+    tz = start_dt.tzinfo
+    for c in index.conflicts(start_dt.timestamp(), end_dt.timestamp(), exclude_id):
+        s = datetime.fromtimestamp(c["start"], tz).strftime("%H:%M")
+        e = datetime.fromtimestamp(c["end"], tz).strftime("%H:%M")
+        problems.append(f"overlaps '{c['summary']}' ({s}-{e})")
+
+    preferences = profile.get("preferences", {}) if profile else {}
+    schedule = profile.get("schedule", {}) if profile else {}
+
+    buffer = preferences.get("buffer_time") or 0
+    if buffer and not problems:
+        pad = timedelta(minutes=buffer)
+        near = index.conflicts((start_dt - pad).timestamp(), (end_dt + pad).timestamp(), exclude_id)
+        for c in near:
+            problems.append(f"leaves less than {buffer} min buffer around '{c['summary']}'")
+
+    work_hours = schedule.get("work_hours", {})
+    days = work_hours.get("days")
+    if days and WEEKDAY_NAMES[start_dt.weekday()] not in days:
+        problems.append(f"is on a {WEEKDAY_NAMES[start_dt.weekday()]}, outside your work days")
+    work_start, work_end = parse_hhmm(work_hours.get("start", "")), parse_hhmm(work_hours.get("end", ""))
+    start_min = start_dt.hour * 60 + start_dt.minute
+    end_min = end_dt.hour * 60 + end_dt.minute if end_dt.date() == start_dt.date() else 24 * 60
+    if work_start is not None and work_end is not None and (start_min < work_start or end_min > work_end):
+        problems.append(f"is outside your work hours ({work_hours['start']}-{work_hours['end']})")
+
+    lunch = parse_time_range(schedule.get("break_preferences", {}).get("lunch_time", ""))
+    if lunch and start_min < lunch[1] and end_min > lunch[0]:
+        problems.append("overlaps your lunch break")
+    return problems
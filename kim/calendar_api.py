@@ -1,57 +1,140 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+import heapq
+import threading
+import time
+import uuid
 import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from .calendar_client import execute_with_retry, get_calendar_service, should_retry
+from .event_store import EventStore, event_start_ts
+from .rate_limit import backoff_delay
+from .recurrence import normalize_recurrence
 
 DEFAULT_TIMEZONE = 'Europe/Berlin'
+# Event fields Kim reads when listing; everything else stays on the server
+LISTING_FIELDS = (
+    'id', 'status', 'summary', 'description', 'location', 'start', 'end', 'transparency',
+    'recurrence', 'recurringEventId', 'originalStartTime'
+)
+MAX_LISTING_WORKERS = 8
+
+_listing_pool: Optional[ThreadPoolExecutor] = None
+_listing_pool_lock = threading.Lock()
 
 def authenticate_google_calendar():
     """Authenticate with Google Calendar API with better error handling"""
-    SCOPES = ['https://www.googleapis.com/auth/calendar']
-    SERVICE_ACCOUNT_FILE = 'credentials.json'
-
     try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE, scopes=SCOPES
-        )
-        return build('calendar', 'v3', credentials=credentials)
+        service = get_calendar_service()
+        # Load credentials and fetch the first token now so failures surface on this first use
+        service.factory.ensure_token()
+        return service
     except Exception as e:
         print(f"⚠️ Calendar authentication failed: {str(e)}")
         raise
 
+def new_event_id() -> str:
+    """Client-supplied event id (base32hex, as the API requires): makes inserts safe to retry"""
+    return uuid.uuid4().hex
+
+def _event_body(
+    summary: str,
+    start_datetime: str,
+    end_datetime: str,
+    description: str = "",
+    timezone: str = DEFAULT_TIMEZONE,
+    recurrence: Union[str, Iterable[str], None] = None
+) -> Dict:
+    # Validate time format
+    if 'T' not in start_datetime or 'T' not in end_datetime:
+        raise ValueError("Invalid time format - must include date and time")
+        
+    body = {
+        'id': new_event_id(),
+        'summary': summary,
+        'description': description,
+        'start': {
+            'dateTime': start_datetime,
+            'timeZone': timezone
+        },
+        'end': {
+            'dateTime': end_datetime,
+            'timeZone': timezone
+        },
+    }
+    # RRULE/EXDATE/RDATE lines; the start above is the first occurrence
+    rules = normalize_recurrence(recurrence)
+    if rules:
+        body['recurrence'] = rules
+    return body
+
+def _patch_body(
+    summary: Optional[str] = None,
+    start_datetime: Optional[str] = None,
+    end_datetime: Optional[str] = None,
+    description: Optional[str] = None,
+    timezone: str = DEFAULT_TIMEZONE,
+    recurrence: Union[str, Iterable[str], None] = None
+) -> Dict:
+    # Only the fields that were provided, so PATCH leaves the rest untouched
+    body = {}
+    if recurrence is not None:
+        # An empty list turns a series back into a single event
+        body['recurrence'] = normalize_recurrence(recurrence) or []
+    if summary is not None:
+        body['summary'] = summary
+    if description is not None:
+        body['description'] = description
+    if start_datetime is not None:
+        body['start'] = {
+            'dateTime': start_datetime,
+            'timeZone': timezone
+        }
+    if end_datetime is not None:
+        body['end'] = {
+            'dateTime': end_datetime,
+            'timeZone': timezone
+        }
+    return body
+
 def create_event(
     service,
     summary: str,
     start_datetime: str,
     end_datetime: str,
     description: str = "",
-    timezone: str = DEFAULT_TIMEZONE
+    timezone: str = DEFAULT_TIMEZONE,
+    store: Optional[EventStore] = None,
+    recurrence: Union[str, Iterable[str], None] = None
 ) -> Dict:
-    """Create event with robust error handling"""
+    """Create event with robust error handling; recurrence makes it a series (e.g. "FREQ=WEEKLY;BYDAY=MO")"""
     try:
-        # Validate time format
-        if 'T' not in start_datetime or 'T' not in end_datetime:
-            raise ValueError("Invalid time format - must include date and time")
-            
-        event = {
-            'summary': summary,
-            'description': description,
-            'start': {
-                'dateTime': start_datetime,
-                'timeZone': timezone
-            },
-            'end': {
-                'dateTime': end_datetime,
-                'timeZone': timezone
-            },
-        }
-        
-        created_event = service.events().insert(
-            calendarId='primary',
-            body=event
-        ).execute()
+        event = _event_body(summary, start_datetime, end_datetime, description, timezone, recurrence)
+    except Exception as e:
+        print(f"⚠️ Event creation error: {str(e)}")
+        raise
+    return insert_event(service, event, store)
+
+def insert_event(service, body: Dict, store: Optional[EventStore] = None) -> Dict:
+    """Insert an already built and validated event body (see _event_body)"""
+    try:
+        try:
+            created_event = execute_with_retry(service.events().insert(
+                calendarId='primary',
+                body=body
+            ))
+        except HttpError as e:
+            if getattr(e.resp, 'status', None) != 409 or not body.get('id'):
+                raise
+            # A retried insert whose first attempt landed before its response was lost
+            created_event = execute_with_retry(service.events().get(
+                calendarId='primary',
+                eventId=body['id']
+            ))
         
+        if store is not None:
+            store.put(created_event)
         return created_event
         
     except HttpError as e:
@@ -61,18 +144,119 @@ def create_event(
         print(f"⚠️ Event creation error: {str(e)}")
         raise
 
-def list_events(service, max_results: int = 10) -> List[Dict]:
-    """List events with error handling"""
+def _fields_param(fields: Optional[Iterable[str]], ordered: bool) -> Optional[str]:
+    """Partial-response selector for events.list: the page token plus the requested event fields"""
+    if fields is None:
+        return None
+    selected = list(dict.fromkeys(fields))
+    if ordered and 'start' not in selected:
+        # The merge orders by start
+        selected.append('start')
+    return f"nextPageToken,items({','.join(selected)})"
+
+def _listing_executor() -> ThreadPoolExecutor:
+    """Pool shared by every multi-calendar listing: page fetches and their read-ahead"""
+    global _listing_pool
+    with _listing_pool_lock:
+        if _listing_pool is None:
+            _listing_pool = ThreadPoolExecutor(max_workers=MAX_LISTING_WORKERS, thread_name_prefix="kim-list")
+        return _listing_pool
+
+def _fetch_page(service, params: Dict) -> Dict:
+    return execute_with_retry(service.events().list(**params))
+
+def _pages(service, params: Dict, first: Optional[Future] = None, executor: Optional[ThreadPoolExecutor] = None) -> Iterator[Dict]:
+    """
+    Events of one calendar, page by page.
+
+    With an executor the next page is fetched while the current one is
+    consumed; first is the already submitted request for the first page.
+    """
+    params = dict(params)
+    pending = first
     try:
-        now = datetime.datetime.utcnow().isoformat() + 'Z'
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        return events_result.get('items', [])
+        while True:
+            result = pending.result() if pending is not None else _fetch_page(service, params)
+            pending = None
+            page_token = result.get('nextPageToken')
+            if page_token:
+                params['pageToken'] = page_token
+                pending = executor.submit(_fetch_page, service, dict(params)) if executor is not None else None
+            yield from result.get('items', [])
+            if not page_token:
+                return
+    finally:
+        # A consumer that stops early leaves no read-ahead queued on the shared pool
+        if pending is not None:
+            pending.cancel()
+
+def iter_events(
+    service,
+    time_min: Optional[str] = None,
+    time_max: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    calendars: Union[str, Sequence[str]] = 'primary',
+    page_size: int = 250,
+    single_events: bool = False,
+    default_timezone: str = DEFAULT_TIMEZONE
+) -> Iterator[Dict]:
+    """
+    Lazily yield the events of one or more calendars, following nextPageToken.
+
+    time_min/time_max are RFC 3339 timestamps. fields names the event
+    fields to fetch (e.g. LISTING_FIELDS) so the API sends nothing else.
+    Series come back once, as their master, unless single_events expands
+    them server-side and the calendar is read in start order. Several
+    calendars are always expanded, fetched concurrently and merged by
+    start: only start-ordered streams can be merged. Only about one page
+    per calendar is held in memory. API errors are raised, not swallowed.
+    """
+    calendar_ids = [calendars] if isinstance(calendars, str) else list(dict.fromkeys(calendars))
+    # Without orderBy the API returns events in no particular order, and a master sorts by its first occurrence
+    single_events = single_events or len(calendar_ids) > 1
+    params = {'maxResults': page_size, 'singleEvents': single_events}
+    if single_events:
+        params['orderBy'] = 'startTime'
+    if time_min:
+        params['timeMin'] = time_min
+    if time_max:
+        params['timeMax'] = time_max
+    selector = _fields_param(fields, ordered=len(calendar_ids) > 1)
+    if selector:
+        params['fields'] = selector
+
+    if len(calendar_ids) == 1:
+        yield from _pages(service, {**params, 'calendarId': calendar_ids[0]})
+        return
+
+    # Each calendar keeps a page of read-ahead on the shared pool
+    executor = _listing_executor()
+    firsts, streams = [], []
+    try:
+        for calendar_id in calendar_ids:
+            page = {**params, 'calendarId': calendar_id}
+            firsts.append(executor.submit(_fetch_page, service, page))
+            streams.append(_pages(service, page, firsts[-1], executor))
+        yield from heapq.merge(*streams, key=lambda event: event_start_ts(event, default_timezone) or 0.0)
+    finally:
+        for stream in streams:
+            stream.close()
+        # Streams the merge never started still own their first request
+        for first in firsts:
+            first.cancel()
+
+def list_events(service, max_results: int = 10, store: Optional[EventStore] = None) -> List[Dict]:
+    """Upcoming events with error handling; recurring series are expanded"""
+    try:
+        if store is not None:
+            store.ensure_fresh(service)
+            return store.upcoming(max_results)
+
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+        # Server-side expansion in start order: only the first page is ever fetched
+        items = iter_events(service, time_min=now, fields=LISTING_FIELDS,
+                            page_size=min(max_results, 250), single_events=True)
+        return list(islice(items, max_results))
     except Exception as e:
         print(f"⚠️ Event listing error: {str(e)}")
         return []
@@ -84,38 +268,21 @@ def update_event(
     start_datetime: Optional[str] = None,
     end_datetime: Optional[str] = None,
     description: Optional[str] = None,
-    timezone: str = DEFAULT_TIMEZONE
+    timezone: str = DEFAULT_TIMEZONE,
+    store: Optional[EventStore] = None,
+    recurrence: Union[str, Iterable[str], None] = None
 ) -> Dict:
-    """Update an existing event"""
+    """Update an existing event; pass the series id to change every occurrence, an instance id for one"""
     try:
-        # First get the existing event
-        event = service.events().get(
-            calendarId='primary',
-            eventId=event_id
-        ).execute()
-
-        # Update only the fields that were provided
-        if summary is not None:
-            event['summary'] = summary
-        if description is not None:
-            event['description'] = description
-        if start_datetime is not None:
-            event['start'] = {
-                'dateTime': start_datetime,
-                'timeZone': timezone
-            }
-        if end_datetime is not None:
-            event['end'] = {
-                'dateTime': end_datetime,
-                'timeZone': timezone
-            }
-
-        updated_event = service.events().update(
+        # PATCH sends only the changed fields: one round-trip, no GET first
+        updated_event = execute_with_retry(service.events().patch(
             calendarId='primary',
             eventId=event_id,
-            body=event
-        ).execute()
+            body=_patch_body(summary, start_datetime, end_datetime, description, timezone, recurrence)
+        ))
 
+        if store is not None:
+            store.put(updated_event)
         return updated_event
 
     except HttpError as e:
@@ -125,13 +292,15 @@ def update_event(
         print(f"⚠️ Event update error: {str(e)}")
         raise
 
-def delete_event(service, event_id: str) -> bool:
+def delete_event(service, event_id: str, store: Optional[EventStore] = None) -> bool:
     """Delete an event"""
     try:
-        service.events().delete(
+        execute_with_retry(service.events().delete(
             calendarId='primary',
             eventId=event_id
-        ).execute()
+        ))
+        if store is not None:
+            store.remove(event_id)
         return True
     except HttpError as e:
         print(f"⚠️ Google API error: {str(e)}")
@@ -140,17 +309,156 @@ def delete_event(service, event_id: str) -> bool:
         print(f"⚠️ Event deletion error: {str(e)}")
         raise
 
-def get_event(service, event_id: str) -> Dict:
+def get_event(service, event_id: str, store: Optional[EventStore] = None) -> Dict:
     """Get a specific event"""
     try:
-        event = service.events().get(
+        if store is not None:
+            store.ensure_fresh(service)
+            event = store.get(event_id)
+            if event is not None:
+                return event
+
+        event = execute_with_retry(service.events().get(
             calendarId='primary',
             eventId=event_id
-        ).execute()
+        ))
+        if store is not None:
+            store.put(event)
         return event
     except HttpError as e:
         print(f"⚠️ Google API error: {str(e)}")
         raise
     except Exception as e:
         print(f"⚠️ Event retrieval error: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+# Calendar API batch requests accept at most 50 calls each
+BATCH_LIMIT = 50
+
+def _execute_batch(service, requests: List, on_success=None, max_retries: int = 5) -> List[Dict]:
+    """
+    Run requests through HTTP batches; one {"ok", "event"/"error"} result per request, in order.
+
+    Calls that fail inside a batch with a retryable error (429, 5xx, see
+    should_retry) go into a new batch after a backoff instead of failing.
+    """
+    results: List[Dict] = [None] * len(requests)
+    errors: Dict[int, Exception] = {}
+
+    def callback(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            errors[index] = exception
+            results[index] = {"ok": False, "error": str(exception),
+                              "status": getattr(getattr(exception, 'resp', None), 'status', None)}
+        else:
+            results[index] = {"ok": True, "event": response}
+            if on_success is not None:
+                on_success(index, response)
+
+    pending = list(range(len(requests)))
+    attempt = 0
+    while True:
+        for offset in range(0, len(pending), BATCH_LIMIT):
+            chunk = pending[offset:offset + BATCH_LIMIT]
+            batch = service.new_batch_http_request(callback=callback)
+            for index in chunk:
+                results[index] = None
+                errors.pop(index, None)
+                batch.add(requests[index], request_id=str(index))
+            try:
+                # A batch of n calls costs n requests of quota
+                execute_with_retry(batch, tokens=len(chunk))
+            except HttpError as e:
+                print(f"⚠️ Google API batch error: {str(e)}")
+                for index in chunk:
+                    if results[index] is None:
+                        results[index] = {"ok": False, "error": str(e)}
+        pending = [index for index in pending if index in errors and should_retry(requests[index], errors[index])]
+        if not pending or attempt >= max_retries:
+            return results
+        delay = backoff_delay(attempt)
+        print(f"⚠️ {len(pending)} batched calendar calls failed, retrying in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
+
+def create_events(service, events: List[Dict], store: Optional[EventStore] = None) -> List[Dict]:
+    """Create many events in batched requests; each item takes create_event's keyword arguments"""
+    requests = []
+    bodies = {}
+    invalid = {}
+    for index, item in enumerate(events):
+        try:
+            bodies[index] = _event_body(
+                item['summary'],
+                item['start_datetime'],
+                item['end_datetime'],
+                item.get('description', ""),
+                item.get('timezone', DEFAULT_TIMEZONE),
+                item.get('recurrence')
+            )
+            requests.append(service.events().insert(calendarId='primary', body=bodies[index]))
+        except (KeyError, ValueError) as e:
+            invalid[index] = {"ok": False, "error": f"Invalid event: {str(e)}"}
+            requests.append(None)
+    results = _run_batched(service, requests, invalid, store)
+    # 409 on our own fresh id: a retried batch found the event its first attempt created
+    landed = [index for index, result in enumerate(results) if result.get("status") == 409 and index in bodies]
+    if landed:
+        gets = [service.events().get(calendarId='primary', eventId=bodies[index]['id']) for index in landed]
+        for index, result in zip(landed, _run_batched(service, gets, {}, store)):
+            results[index] = result
+    return results
+
+def update_events(service, updates: List[Dict], store: Optional[EventStore] = None) -> List[Dict]:
+    """PATCH many events in batched requests; each item has event_id plus update_event's fields"""
+    requests = []
+    invalid = {}
+    for index, item in enumerate(updates):
+        fields = {
+            k: item[k]
+            for k in ('summary', 'start_datetime', 'end_datetime', 'description', 'timezone', 'recurrence')
+            if k in item
+        }
+        if 'event_id' not in item:
+            invalid[index] = {"ok": False, "error": "Invalid update: missing event_id"}
+            requests.append(None)
+            continue
+        try:
+            body = _patch_body(**fields)
+        except ValueError as e:
+            invalid[index] = {"ok": False, "error": f"Invalid update: {str(e)}"}
+            requests.append(None)
+            continue
+        requests.append(service.events().patch(
+            calendarId='primary',
+            eventId=item['event_id'],
+            body=body
+        ))
+    return _run_batched(service, requests, invalid, store)
+
+def delete_events(service, event_ids: List[str], store: Optional[EventStore] = None) -> List[Dict]:
+    """Delete many events in batched requests"""
+    requests = [service.events().delete(calendarId='primary', eventId=event_id) for event_id in event_ids]
+    results = _run_batched(service, requests, {})
+    for event_id, result in zip(event_ids, results):
+        result["id"] = event_id
+        if result["ok"] and store is not None:
+            store.remove(event_id)
+    return results
+
+def _run_batched(service, requests: List, invalid: Dict[int, Dict], store: Optional[EventStore] = None) -> List[Dict]:
+    """Batch the valid requests and merge their results with the per-item validation errors"""
+    valid = [(index, request) for index, request in enumerate(requests) if index not in invalid]
+
+    def on_success(position, response):
+        if store is not None and isinstance(response, dict) and response.get('id'):
+            store.put(response)
+
+    batch_results = _execute_batch(service, [request for _, request in valid], on_success)
+    results = [None] * len(requests)
+    for (index, _), result in zip(valid, batch_results):
+        results[index] = result
+    for index, result in invalid.items():
+        results[index] = result
+    return results
@@ -0,0 +1,213 @@
+import datetime
+import json
+import socket
+import sys
+import threading
+import time
+from typing import Optional
+from googleapiclient.errors import HttpError
+from .rate_limit import TokenBucket, backoff_delay
+from .tracing import span
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+SERVICE_ACCOUNT_FILE = 'credentials.json'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded'}
+
+# Process-wide limiter shared by every calendar call (Calendar allows a few hundred calls/min per user)
+calendar_rate_limiter = TokenBucket(rate=5.0, capacity=10.0)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """429 or a 403 rate-limit reason: the server turned the call away without applying it"""
+    if not isinstance(error, HttpError):
+        return False
+    status = getattr(error.resp, 'status', None)
+    if status == 429:
+        return True
+    if status == 403:
+        try:
+            errors = json.loads(error.content.decode('utf-8'))['error'].get('errors', [])
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return False
+        return any(e.get('reason') in RATE_LIMIT_REASONS for e in errors)
+    return False
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (socket.timeout, ConnectionError)):
+        return True
+    # httplib2 is imported with the first real service; before that none of its errors can occur
+    httplib2 = sys.modules.get('httplib2')
+    if httplib2 is not None and isinstance(error, httplib2.HttpLib2Error):
+        return True
+    if not isinstance(error, HttpError):
+        return False
+    return getattr(error.resp, 'status', None) in RETRY_STATUSES or _is_rate_limited(error)
+
+
+def _request_body(request) -> Optional[dict]:
+    body = getattr(request, 'body', None)
+    if isinstance(body, (str, bytes)):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return None
+    return body if isinstance(body, dict) else None
+
+
+def is_idempotent(request) -> bool:
+    """
+    Whether sending request a second time is harmless.
+
+    An insert is only when its body names the event (id, or iCalUID for
+    imports): a repeat then fails with 409 instead of creating a duplicate.
+    A batch is when all of its calls are.
+    """
+    batched = getattr(request, '_requests', None)
+    if isinstance(batched, dict):
+        return all(is_idempotent(r) for r in batched.values())
+    method_id = getattr(request, 'methodId', None) or ''
+    if method_id.endswith('.quickAdd'):
+        return False
+    if method_id.endswith('.insert') or method_id.endswith('.import'):
+        body = _request_body(request)
+        return bool(body and (body.get('id') or body.get('iCalUID')))
+    return True
+
+
+def should_retry(request, error: Exception) -> bool:
+    """Whether a failed request may be sent again: transient, and either turned away or idempotent"""
+    return _is_retryable(error) and (_is_rate_limited(error) or is_idempotent(request))
+
+
+def execute_with_retry(
+    request,
+    tokens: float = 1.0,
+    max_retries: int = 5,
+    limiter: Optional[TokenBucket] = calendar_rate_limiter
+):
+    """
+    Execute a googleapiclient request (or batch) with rate limiting and jittered exponential backoff.
+
+    A 5xx or a timeout may come after the server applied the call, so
+    requests that are not idempotent (see is_idempotent) are only retried
+    when they were rate limited.
+    """
+    # HttpRequest.methodId is e.g. "calendar.events.insert"
+    name = getattr(request, 'methodId', None) or ('calendar.batch' if tokens > 1 else 'calendar.request')
+    with span(name, calls=tokens) as current:
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(tokens)
+            try:
+                return request.execute()
+            except Exception as e:
+                if attempt >= max_retries or not should_retry(request, e):
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"⚠️ Calendar request failed ({str(e)[:80]}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                current.set_attribute("retries", attempt)
+
+
+class CalendarClientFactory:
+    """
+    Shares one set of credentials and the bundled discovery document across the process.
+
+    httplib2 transports are not thread-safe, so every thread gets its own
+    authorized Http (kept alive for connection reuse) and its own service
+    built from the cached document - no discovery fetch at startup.
+    Tokens are refreshed shortly before they expire rather than on a 401.
+    The auth and discovery libraries are imported on first use, so creating
+    the factory costs nothing at startup.
+    """
+
+    def __init__(
+        self,
+        credentials_file: str = SERVICE_ACCOUNT_FILE,
+        refresh_margin: float = 300.0,
+        timeout: float = 30.0
+    ):
+        self.credentials_file = credentials_file
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self._credentials = None
+        self._discovery_doc = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def credentials(self):
+        with self._lock:
+            if self._credentials is None:
+                from google.oauth2 import service_account
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self.credentials_file, scopes=SCOPES
+                )
+            return self._credentials
+
+    @property
+    def discovery_doc(self) -> str:
+        with self._lock:
+            if self._discovery_doc is None:
+                from googleapiclient.discovery_cache import get_static_doc
+                self._discovery_doc = get_static_doc('calendar', 'v3')
+            return self._discovery_doc
+
+    def ensure_token(self):
+        """Refresh the access token if it is missing or expires within refresh_margin"""
+        credentials = self.credentials
+        with self._lock:
+            expiry = credentials.expiry
+            # google-auth keeps expiry as naive UTC
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            soon = now + datetime.timedelta(seconds=self.refresh_margin)
+            if not credentials.token or expiry is None or expiry <= soon:
+                import httplib2
+                import google_auth_httplib2
+                credentials.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=self.timeout)))
+
+    def service(self):
+        """The calling thread's Calendar service"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            import httplib2
+            import google_auth_httplib2
+            from googleapiclient.discovery import build_from_document
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            service = build_from_document(self.discovery_doc, http=http)
+            self._local.service = service
+        self.ensure_token()
+        return service
+
+
+class SharedCalendarService:
+    """Service-shaped proxy that routes each call to the current thread's service"""
+
+    def __init__(self, factory: CalendarClientFactory):
+        self.factory = factory
+
+    def events(self):
+        return self.factory.service().events()
+
+    def calendarList(self):
+        return self.factory.service().calendarList()
+
+    def new_batch_http_request(self, callback=None):
+        return self.factory.service().new_batch_http_request(callback=callback)
+
+
+_factory: Optional[CalendarClientFactory] = None
+_factory_lock = threading.Lock()
+
+
+def get_calendar_service() -> SharedCalendarService:
+    """Process-wide calendar client shared by every CalendarBrain"""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = CalendarClientFactory()
+    return SharedCalendarService(_factory)
@@ -0,0 +1,659 @@
+import os
+import re
+import csv
+import json
+import sqlite3
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from .calendar_api import BATCH_LIMIT, _run_batched, iter_events
+from .event_store import EventStore, event_end_ts, event_start_ts
+from .recurrence import field_datetime, normalize_recurrence
+
+DEFAULT_TIMEZONE = 'Europe/Berlin'
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), 'memory', 'imports')
+# Outlook/Exchange exports name zones the Windows way
+WINDOWS_TIMEZONES = {
+    'W. Europe Standard Time': 'Europe/Berlin',
+    'Central Europe Standard Time': 'Europe/Budapest',
+    'Romance Standard Time': 'Europe/Paris',
+    'GMT Standard Time': 'Europe/London',
+    'UTC': 'UTC',
+    'Eastern Standard Time': 'America/New_York',
+    'Central Standard Time': 'America/Chicago',
+    'Mountain Standard Time': 'America/Denver',
+    'Pacific Standard Time': 'America/Los_Angeles',
+    'E. South America Standard Time': 'America/Sao_Paulo',
+    'Tokyo Standard Time': 'Asia/Tokyo',
+    'India Standard Time': 'Asia/Kolkata',
+}
+CSV_FIELDS = ['uid', 'summary', 'start', 'end', 'timezone', 'all_day', 'location', 'description', 'recurrence']
+RECURRENCE_PROPERTIES = ('RRULE', 'EXRULE', 'RDATE', 'EXDATE')
+# Event fields fetched for dedupe keys and for export
+KEY_FIELDS = ('id', 'status', 'iCalUID', 'summary', 'start', 'end', 'recurrence')
+EXPORT_FIELDS = (
+    'id', 'iCalUID', 'status', 'summary', 'description', 'location', 'start', 'end', 'transparency', 'recurrence',
+    'recurringEventId', 'originalStartTime'
+)
+# Longest ICS content line in octets before it must be folded
+ICS_LINE_OCTETS = 75
+# Keep at most this many error messages in an import report
+MAX_REPORTED_ERRORS = 20
+
+_DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+_ESCAPED_RE = re.compile(r"\\([\\;,nN])")
+
+
+def resolve_timezone(tzid: str) -> str:
+    """IANA name for an ICS/CSV zone id; raises ValueError when it cannot be mapped"""
+    tzid = tzid.strip().strip('"')
+    if tzid in WINDOWS_TIMEZONES:
+        return WINDOWS_TIMEZONES[tzid]
+    # Generated ids such as "/mozilla.org/20050126_1/Europe/Berlin" end in the IANA name
+    parts = tzid.strip('/').split('/')
+    for size in (3, 2, 1):
+        candidate = '/'.join(parts[-size:])
+        if len(parts) < size:
+            continue
+        try:
+            ZoneInfo(candidate)
+            return candidate
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    raise ValueError(f"Unknown time zone '{tzid}'")
+
+
+# ----------------------------------------------------------------------
+# ICS parsing
+# ----------------------------------------------------------------------
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join folded content lines (continuations start with a space or tab)"""
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if current is not None and line[:1] in (' ', '\t'):
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _parse_property(line: str) -> Optional[Tuple[str, Dict[str, str], str]]:
+    """(NAME, {PARAM: value}, value) of a content line"""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return None
+    name, *raw_params = head.split(';')
+    params = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _unescape(text: str) -> str:
+    return _ESCAPED_RE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), text)
+
+
+def iter_ics(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Stream the VEVENTs of an iCalendar file as raw property dicts.
+
+    Each dict maps a property name to (params, value); recurrence lines are
+    collected as (name, params, value) under "recurrence". Only the event
+    being read is in memory.
+    """
+    stack: List[str] = []
+    event: Optional[Dict] = None
+    for line in _unfold(lines):
+        parsed = _parse_property(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+        if name == 'BEGIN':
+            stack.append(value.upper())
+            if value.upper() == 'VEVENT':
+                event = {'recurrence': []}
+            continue
+        if name == 'END':
+            if stack and stack[-1] == value.upper():
+                stack.pop()
+            if value.upper() == 'VEVENT' and event is not None:
+                yield event
+                event = None
+            continue
+        # Properties of nested components (VALARM) are not the event's
+        if event is None or not stack or stack[-1] != 'VEVENT':
+            continue
+        if name in RECURRENCE_PROPERTIES:
+            event['recurrence'].append((name, params, value))
+        elif name not in event:
+            event[name] = (params, value)
+
+
+def _ics_time(params: Dict[str, str], value: str, default_tz: str) -> Dict:
+    """Google start/end field for a DTSTART/DTEND value, in the event's own zone"""
+    value = value.strip()
+    if params.get('VALUE', '').upper() == 'DATE' or len(value) == 8:
+        day = datetime.strptime(value[:8], "%Y%m%d").date()
+        return {'date': day.isoformat()}
+    local = datetime.strptime(value.rstrip('Zz'), "%Y%m%dT%H%M%S")
+    if value[-1] in 'Zz':
+        # UTC times are moved to the default zone so the calendar shows local times
+        zone = default_tz
+        local = local.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(zone)).replace(tzinfo=None)
+    elif 'TZID' in params:
+        zone = resolve_timezone(params['TZID'])
+    else:
+        zone = default_tz
+    return {'dateTime': local.strftime("%Y-%m-%dT%H:%M:%S"), 'timeZone': zone}
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION_RE.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid DURATION '{value}'")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0)
+    )
+    return -duration if sign == '-' else duration
+
+
+def _shift(field: Dict, delta: timedelta) -> Dict:
+    if 'date' in field:
+        return {'date': (datetime.fromisoformat(field['date']) + delta).date().isoformat()}
+    shifted = datetime.fromisoformat(field['dateTime']) + delta
+    return {'dateTime': shifted.strftime("%Y-%m-%dT%H:%M:%S"), 'timeZone': field['timeZone']}
+
+
+def ics_to_event(raw: Dict, default_tz: str = DEFAULT_TIMEZONE) -> Dict:
+    """Validated Google event body for a raw VEVENT; raises ValueError"""
+    if 'RECURRENCE-ID' in raw:
+        raise ValueError("modified occurrences of a series are not imported")
+    if 'DTSTART' not in raw:
+        raise ValueError("missing DTSTART")
+    start = _ics_time(*raw['DTSTART'], default_tz)
+    if 'DTEND' in raw:
+        end = _ics_time(*raw['DTEND'], default_tz)
+    elif 'DURATION' in raw:
+        end = _shift(start, _parse_duration(raw['DURATION'][1]))
+    else:
+        # All-day events last the day; timed ones get Kim's usual hour
+        end = _shift(start, timedelta(days=1) if 'date' in start else timedelta(hours=1))
+    event = {
+        'summary': _unescape(raw['SUMMARY'][1]) if 'SUMMARY' in raw else '(no title)',
+        'start': start,
+        'end': end,
+    }
+    for prop, key in (('DESCRIPTION', 'description'), ('LOCATION', 'location')):
+        if prop in raw:
+            event[key] = _unescape(raw[prop][1])
+    if 'UID' in raw:
+        event['iCalUID'] = raw['UID'][1].strip()
+    if raw.get('STATUS', ({}, ''))[1].upper() == 'TENTATIVE':
+        event['status'] = 'tentative'
+    if raw.get('TRANSP', ({}, ''))[1].upper() == 'TRANSPARENT':
+        event['transparency'] = 'transparent'
+    return _validated(event, [_recurrence_line(*line) for line in raw['recurrence']], default_tz)
+
+
+def _recurrence_line(name: str, params: Dict[str, str], value: str) -> str:
+    """Rebuild a recurrence line with its TZID (if any) mapped to an IANA zone"""
+    if 'TZID' in params:
+        params = {**params, 'TZID': resolve_timezone(params['TZID'])}
+    head = ';'.join([name] + [f"{key}={param}" for key, param in params.items()])
+    return f"{head}:{value}"
+
+
+def _validated(event: Dict, recurrence: List[str], default_tz: str) -> Dict:
+    rules = normalize_recurrence(recurrence)
+    if rules:
+        event['recurrence'] = rules
+    start_ts = event_start_ts(event, default_tz)
+    end_ts = event_end_ts(event, default_tz)
+    if start_ts is None or end_ts is None:
+        raise ValueError("unreadable start or end")
+    # Zero-length entries are valid (reminders, or an hour swallowed by a DST change)
+    if end_ts < start_ts:
+        raise ValueError("ends before it starts")
+    return event
+
+
+# ----------------------------------------------------------------------
+# CSV parsing
+# ----------------------------------------------------------------------
+
+def _csv_date(value: str):
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{value}'")
+
+
+def _csv_time(value: str):
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p", "%I %p"):
+        try:
+            return datetime.strptime(value.strip().upper(), fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time '{value}'")
+
+
+def csv_to_event(row: Dict[str, str], default_tz: str = DEFAULT_TIMEZONE) -> Dict:
+    """
+    Validated Google event body for a CSV row; raises ValueError.
+
+    Reads Kim's own export columns (uid, summary, start, end, timezone, ...)
+    and Google Calendar's CSV layout (Subject, Start Date, Start Time, ...).
+    """
+    row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+    zone = resolve_timezone(row['timezone']) if row.get('timezone') else default_tz
+    all_day = row.get('all_day', row.get('all day event', '')).lower() in ('true', 'yes', '1')
+    if row.get('start'):
+        summary = row.get('summary', '')
+        start_text, end_text = row['start'], row.get('end', '')
+        parse = datetime.fromisoformat
+        start = parse(start_text)
+        end = parse(end_text) if end_text else None
+        all_day = all_day or 'T' not in start_text
+    elif row.get('start date'):
+        summary = row.get('subject', '')
+        day = _csv_date(row['start date'])
+        start = datetime.combine(day, _csv_time(row['start time']) if row.get('start time') and not all_day else datetime.min.time())
+        end = None
+        if row.get('end date') or row.get('end time'):
+            end_day = _csv_date(row['end date']) if row.get('end date') else day
+            end = datetime.combine(end_day, _csv_time(row['end time']) if row.get('end time') and not all_day else datetime.min.time())
+            if all_day:
+                # Google's CSV end date is inclusive; the API's is exclusive
+                end += timedelta(days=1)
+    else:
+        raise ValueError("missing start")
+
+    if start.tzinfo is not None:
+        start = start.astimezone(ZoneInfo(zone)).replace(tzinfo=None)
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone(ZoneInfo(zone)).replace(tzinfo=None)
+    if end is None:
+        end = start + (timedelta(days=1) if all_day else timedelta(hours=1))
+    if all_day:
+        event = {'start': {'date': start.date().isoformat()}, 'end': {'date': end.date().isoformat()}}
+    else:
+        event = {
+            'start': {'dateTime': start.strftime("%Y-%m-%dT%H:%M:%S"), 'timeZone': zone},
+            'end': {'dateTime': end.strftime("%Y-%m-%dT%H:%M:%S"), 'timeZone': zone},
+        }
+    event['summary'] = summary or '(no title)'
+    if row.get('description'):
+        event['description'] = row['description']
+    if row.get('location'):
+        event['location'] = row['location']
+    if row.get('uid'):
+        event['iCalUID'] = row['uid']
+    recurrence = [line for line in row.get('recurrence', '').splitlines() if line.strip()]
+    return _validated(event, recurrence, default_tz)
+
+
+def iter_source(path: str, fmt: Optional[str] = None, default_tz: str = DEFAULT_TIMEZONE) -> Iterator[Tuple[Optional[Dict], Optional[str]]]:
+    """Stream (event, None) or (None, error) for every entry of an .ics or .csv file"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in ('ics', 'csv'):
+        raise ValueError(f"Unsupported import format '{fmt}', expected ics or csv")
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if fmt == 'ics':
+            raw_events, convert = iter_ics(f), ics_to_event
+        else:
+            raw_events, convert = csv.DictReader(f), csv_to_event
+        for raw in raw_events:
+            try:
+                yield convert(raw, default_tz), None
+            except (ValueError, KeyError) as e:
+                label = raw.get('UID', ({}, ''))[1] if fmt == 'ics' else raw.get('uid') or raw.get('Subject') or ''
+                yield None, f"{label or 'event'}: {str(e)}"
+
+
+# ----------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------
+
+def event_keys(event: Dict, default_tz: str = DEFAULT_TIMEZONE) -> List[str]:
+    """Dedupe keys: the iCalendar UID when there is one, and a hash of title, times and recurrence"""
+    keys = []
+    if event.get('iCalUID'):
+        keys.append(f"uid:{event['iCalUID']}")
+    payload = json.dumps(
+        [
+            (event.get('summary') or '').strip().lower(),
+            event_start_ts(event, default_tz),
+            event_end_ts(event, default_tz),
+            event.get('recurrence') or []
+        ],
+        separators=(',', ':')
+    )
+    keys.append("sha:" + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32])
+    return keys
+
+
+def import_event_id(keys: List[str]) -> str:
+    """
+    Event id derived from the primary dedupe key (base32hex, as the API
+    requires): inserting the same entry again fails with 409 instead of
+    creating a copy, even when the checkpoint never saw the first insert.
+    """
+    return hashlib.sha256(keys[0].encode('utf-8')).hexdigest()[:32]
+
+
+class ImportCheckpoint:
+    """
+    SQLite record of the dedupe keys already on the calendar and of what
+    this import has inserted, so an interrupted import resumes where it
+    stopped and the key set never has to fit in memory.
+    """
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, event_id TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    @classmethod
+    def for_source(cls, source: str, calendar_id: str = 'primary') -> 'ImportCheckpoint':
+        digest = hashlib.sha256(f"{os.path.abspath(source)}|{calendar_id}".encode('utf-8')).hexdigest()[:16]
+        name = f"{os.path.splitext(os.path.basename(source))[0]}-{digest}.db"
+        return cls(os.path.join(DEFAULT_CHECKPOINT_DIR, name))
+
+    @property
+    def seeded(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM meta WHERE name = 'seeded'").fetchone() is not None
+
+    def seed(self, events: Iterable[Dict], default_tz: str = DEFAULT_TIMEZONE):
+        """Record the keys of the events already on the calendar (once per checkpoint)"""
+        with self._conn:
+            for event in events:
+                if event.get('status') == 'cancelled':
+                    continue
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO seen (key, event_id) VALUES (?, ?)",
+                    [(key, event.get('id')) for key in event_keys(event, default_tz)]
+                )
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('seeded', '1')")
+
+    def contains(self, keys: List[str]) -> bool:
+        placeholders = ",".join("?" * len(keys))
+        return self._conn.execute(f"SELECT 1 FROM seen WHERE key IN ({placeholders}) LIMIT 1", keys).fetchone() is not None
+
+    def record(self, entries: List[Tuple[List[str], Optional[str]]]):
+        """Remember a batch of (keys, event id) in one transaction"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (key, event_id) VALUES (?, ?)",
+                [(key, event_id) for keys, event_id in entries for key in keys]
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def import_events(
+    service,
+    source: str,
+    fmt: Optional[str] = None,
+    store: Optional[EventStore] = None,
+    checkpoint: Optional[ImportCheckpoint] = None,
+    calendar_id: str = 'primary',
+    default_tz: str = DEFAULT_TIMEZONE,
+    batch_size: int = BATCH_LIMIT,
+    dry_run: bool = False,
+    on_progress=None
+) -> Dict:
+    """
+    Stream an .ics/.csv file into the calendar.
+
+    Entries are validated and normalized one at a time, duplicates (of
+    events already on the calendar, earlier entries or a previous run of
+    the same import) are skipped, and inserts go out in rate-limited HTTP
+    batches. Each batch is checkpointed, so re-running after an
+    interruption only sends what is missing; event ids are derived from
+    the dedupe keys, so a batch that landed but was never checkpointed is
+    skipped on the next run. Memory stays flat: one batch is held at a
+    time and the dedupe keys live in the checkpoint database.
+    """
+    own_checkpoint = checkpoint is None
+    checkpoint = checkpoint or ImportCheckpoint.for_source(source, calendar_id)
+    report = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0, "failed": 0, "errors": []}
+
+    def note_error(message: str):
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append(message)
+
+    def flush(batch: List[Tuple[Dict, List[str]]]):
+        if dry_run:
+            report["imported"] += len(batch)
+            return
+        requests = [service.events().insert(calendarId=calendar_id, body=dict(event, id=import_event_id(keys)))
+                    for event, keys in batch]
+        results = _run_batched(service, requests, {}, store)
+        done = []
+        for (_, keys), result in zip(batch, results):
+            if result["ok"]:
+                done.append((keys, result["event"].get('id')))
+                report["imported"] += 1
+            elif result.get("status") == 409:
+                # Inserted by an earlier run that stopped before checkpointing it
+                done.append((keys, import_event_id(keys)))
+                report["duplicates"] += 1
+            else:
+                report["failed"] += 1
+                note_error(result["error"])
+        checkpoint.record(done)
+        if on_progress is not None:
+            on_progress(report)
+
+    try:
+        if not checkpoint.seeded:
+            existing = store.iter_all() if store is not None else iter_events(service, fields=KEY_FIELDS, calendars=calendar_id)
+            checkpoint.seed(existing, default_tz)
+
+        batch: List[Tuple[Dict, List[str]]] = []
+        pending = set()
+        for event, error in iter_source(source, fmt, default_tz):
+            report["read"] += 1
+            if error is not None:
+                report["invalid"] += 1
+                note_error(error)
+                continue
+            keys = event_keys(event, default_tz)
+            if pending.intersection(keys) or checkpoint.contains(keys):
+                report["duplicates"] += 1
+                continue
+            batch.append((event, keys))
+            pending.update(keys)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch, pending = [], set()
+        if batch:
+            flush(batch)
+        return report
+    finally:
+        if own_checkpoint:
+            checkpoint.close()
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences"""
+    if len(line.encode('utf-8')) <= ICS_LINE_OCTETS:
+        return line + '\r\n'
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # Continuation lines spend one octet on the leading space
+        limit = ICS_LINE_OCTETS if not parts else ICS_LINE_OCTETS - 1
+        if size + width > limit:
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_field(name: str, field: Dict, default_tz: str) -> str:
+    if field.get('date'):
+        return f"{name};VALUE=DATE:{field['date'].replace('-', '')}"
+    local, _, tz = field_datetime(field, default_tz)
+    return f"{name};TZID={tz.key}:{local.strftime('%Y%m%dT%H%M%S')}"
+
+
+def _exdate(master: Dict, original: Dict, default_tz: str) -> str:
+    """EXDATE line removing the occurrence that originally started at original, in the master's zone"""
+    if master['start'].get('date'):
+        day = original.get('date') or original['dateTime'][:10]
+        return f"EXDATE;VALUE=DATE:{day.replace('-', '')}"
+    _, _, zone = field_datetime(master['start'], default_tz)
+    local, _, tz = field_datetime(original, zone.key)
+    local = local.replace(tzinfo=tz).astimezone(zone).replace(tzinfo=None)
+    return f"EXDATE;TZID={zone.key}:{local.strftime('%Y%m%dT%H%M%S')}"
+
+
+def fold_exceptions(events: Iterable[Dict], default_tz: str = DEFAULT_TIMEZONE) -> Iterator[Dict]:
+    """
+    Rewrite series exceptions so every item stands on its own in a file.
+
+    A listing without singleEvents returns moved or cancelled occurrences
+    as separate items sharing their master's iCalUID. Each exception
+    becomes an EXDATE on its master, and a moved occurrence is also
+    written as a standalone event. Single events pass straight through;
+    only series and their exceptions are held until the end of the stream.
+    """
+    masters: Dict[str, Dict] = {}
+    exceptions: List[Dict] = []
+    for event in events:
+        if event.get('recurringEventId') and event.get('originalStartTime'):
+            exceptions.append(event)
+        elif event.get('recurrence'):
+            masters[event['id']] = event
+        else:
+            yield event
+    for exception in exceptions:
+        master = masters.get(exception['recurringEventId'])
+        if master is not None and master.get('start'):
+            master['recurrence'] = list(master['recurrence']) + [
+                _exdate(master, exception['originalStartTime'], default_tz)
+            ]
+    yield from masters.values()
+    for exception in exceptions:
+        if exception.get('status') == 'cancelled':
+            continue
+        moved = {k: v for k, v in exception.items() if k not in ('recurringEventId', 'originalStartTime', 'iCalUID')}
+        yield moved
+
+
+def write_ics(events: Iterable[Dict], out: IO[str], default_tz: str = DEFAULT_TIMEZONE) -> int:
+    """Write events as an iCalendar stream; returns how many were written"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Kim Assistant//Calendar Export//EN\r\n")
+    count = 0
+    for event in fold_exceptions(events, default_tz):
+        if event.get('status') == 'cancelled' or not event.get('start'):
+            continue
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{event.get('iCalUID') or event['id'] + '@kim'}",
+            f"DTSTAMP:{stamp}",
+            _ics_field("DTSTART", event['start'], default_tz),
+            _ics_field("DTEND", event.get('end') or event['start'], default_tz),
+            f"SUMMARY:{_escape(event.get('summary', ''))}",
+        ]
+        if event.get('description'):
+            lines.append(f"DESCRIPTION:{_escape(event['description'])}")
+        if event.get('location'):
+            lines.append(f"LOCATION:{_escape(event['location'])}")
+        if event.get('transparency') == 'transparent':
+            lines.append("TRANSP:TRANSPARENT")
+        lines.extend(event.get('recurrence') or [])
+        lines.append("END:VEVENT")
+        out.write(''.join(_fold(line) for line in lines))
+        count += 1
+    out.write("END:VCALENDAR\r\n")
+    return count
+
+
+def write_csv(events: Iterable[Dict], out: IO[str], default_tz: str = DEFAULT_TIMEZONE) -> int:
+    """Write events in Kim's CSV layout (CSV_FIELDS); returns how many were written"""
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    count = 0
+    for event in fold_exceptions(events, default_tz):
+        if event.get('status') == 'cancelled' or not event.get('start'):
+            continue
+        all_day = 'date' in event['start']
+        if all_day:
+            start, end, zone = event['start']['date'], (event.get('end') or event['start'])['date'], ''
+        else:
+            start_local, _, tz = field_datetime(event['start'], default_tz)
+            end_local, _, _ = field_datetime(event.get('end') or event['start'], default_tz)
+            start, end, zone = start_local.isoformat(), end_local.isoformat(), tz.key
+        writer.writerow({
+            'uid': event.get('iCalUID') or '',
+            'summary': event.get('summary', ''),
+            'start': start,
+            'end': end,
+            'timezone': zone,
+            'all_day': 'true' if all_day else 'false',
+            'location': event.get('location', ''),
+            'description': event.get('description', ''),
+            'recurrence': '\n'.join(event.get('recurrence') or []),
+        })
+        count += 1
+    return count
+
+
+def export_events(
+    service,
+    destination: str,
+    fmt: Optional[str] = None,
+    time_min: Optional[str] = None,
+    time_max: Optional[str] = None,
+    calendar_id: str = 'primary',
+    default_tz: str = DEFAULT_TIMEZONE
+) -> int:
+    """
+    Stream a calendar page by page into an .ics or .csv file; series are
+    exported once, with their rules and their exceptions (see fold_exceptions)
+    """
+    fmt = fmt or os.path.splitext(destination)[1].lstrip('.').lower()
+    if fmt not in ('ics', 'csv'):
+        raise ValueError(f"Unsupported export format '{fmt}', expected ics or csv")
+    events = iter_events(service, time_min=time_min, time_max=time_max, fields=EXPORT_FIELDS, calendars=calendar_id)
+    # Written to a temporary name first so a failed export never leaves a truncated file behind
+    partial = destination + '.partial'
+    with open(partial, 'w', encoding='utf-8', newline='') as out:
+        count = write_ics(events, out, default_tz) if fmt == 'ics' else write_csv(events, out, default_tz)
+    os.replace(partial, destination)
+    return count
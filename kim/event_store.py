@@ -0,0 +1,316 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+from googleapiclient.errors import HttpError
+from .calendar_client import execute_with_retry
+from .recurrence import UNBOUNDED, expand_events, is_recurring, series_bounds
+
+DEFAULT_TIMEZONE = 'Europe/Berlin'
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'memory', 'events.db')
+# 1: series masters instead of expanded instances (singleEvents=False)
+SCHEMA_VERSION = 1
+# Rows read per query when walking the whole table
+SCAN_PAGE_SIZE = 500
+
+
+def event_start_ts(event: Dict, default_tz: str = DEFAULT_TIMEZONE) -> Optional[float]:
+    """Return the event start as a UTC epoch timestamp"""
+    return _field_ts(event.get('start') or {}, default_tz)
+
+
+def event_end_ts(event: Dict, default_tz: str = DEFAULT_TIMEZONE) -> Optional[float]:
+    """Return the event end as a UTC epoch timestamp"""
+    return _field_ts(event.get('end') or {}, default_tz)
+
+
+def _field_ts(field: Dict, default_tz: str) -> Optional[float]:
+    value = field.get('dateTime') or field.get('date')
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(field.get('timeZone') or default_tz))
+    return dt.timestamp()
+
+
+class EventStore:
+    """
+    Local write-through copy of a Google Calendar kept fresh with sync tokens.
+
+    Recurring events are stored once, as their series master (whose
+    start_ts/end_ts span the whole series), next to the exceptions that
+    move or cancel single occurrences. Reads expand the series lazily for
+    the requested window only.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        calendar_id: str = 'primary',
+        max_staleness: float = 60.0,
+        default_timezone: str = DEFAULT_TIMEZONE
+    ):
+        self.db_path = db_path
+        self.calendar_id = calendar_id
+        self.max_staleness = max_staleness
+        self.default_timezone = default_timezone
+        self._last_sync = 0.0
+        self._lock = threading.RLock()
+        self._listeners = []
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # Older copies hold expanded instances and a sync token for them: resync from scratch
+                self._conn.execute("DROP TABLE IF EXISTS events")
+                self._conn.execute("DROP TABLE IF EXISTS sync_state")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS events (
+                    calendar_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    start_ts REAL,
+                    end_ts REAL,
+                    recurring INTEGER NOT NULL DEFAULT 0,
+                    recurring_id TEXT,
+                    body TEXT NOT NULL,
+                    PRIMARY KEY (calendar_id, id)
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_start ON events (calendar_id, start_ts)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS events_series ON events (calendar_id, recurring_id)"
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sync_state (
+                    calendar_id TEXT PRIMARY KEY,
+                    sync_token TEXT
+                )"""
+            )
+
+    def subscribe(self, listener):
+        """Notify listener.on_event_put / on_event_removed / on_reset on every local change"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    @property
+    def sync_token(self) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT sync_token FROM sync_state WHERE calendar_id = ?",
+            (self.calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_sync_token(self, token: Optional[str]):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token) VALUES (?, ?)",
+            (self.calendar_id, token)
+        )
+
+    def is_stale(self) -> bool:
+        return self.sync_token is None or time.monotonic() - self._last_sync > self.max_staleness
+
+    def ensure_fresh(self, service):
+        """Sync only when the local copy is older than max_staleness"""
+        if self.is_stale():
+            with self._lock:
+                # Another thread (e.g. a speculative prefetch) may have synced while this one waited
+                if self.is_stale():
+                    self.sync(service)
+
+    def sync(self, service):
+        """Full sync on first use, incremental syncToken syncs afterwards"""
+        with self._lock:
+            token = self.sync_token
+            try:
+                self._pull(service, token)
+            except HttpError as e:
+                # 410 Gone: the sync token expired, start over with a full sync
+                if token is not None and getattr(e.resp, 'status', None) == 410:
+                    self._pull(service, None)
+                else:
+                    raise
+            self._last_sync = time.monotonic()
+
+    def _pull(self, service, token: Optional[str]):
+        # Series masters, not every expanded instance: a daily standup is one row
+        params = {'calendarId': self.calendar_id, 'singleEvents': False}
+        if token:
+            params['syncToken'] = token
+        page_token = None
+        with self._conn:
+            if token is None:
+                self._conn.execute(
+                    "DELETE FROM events WHERE calendar_id = ?", (self.calendar_id,)
+                )
+                for listener in self._listeners:
+                    listener.on_reset()
+            while True:
+                if page_token:
+                    params['pageToken'] = page_token
+                result = execute_with_retry(service.events().list(**params))
+                for event in result.get('items', []):
+                    # A cancelled occurrence of a series is kept: it hides that occurrence
+                    if event.get('status') == 'cancelled' and not event.get('recurringEventId'):
+                        self._delete_row(event['id'])
+                    else:
+                        self._upsert_row(event)
+                page_token = result.get('nextPageToken')
+                if not page_token:
+                    self._set_sync_token(result.get('nextSyncToken'))
+                    break
+
+    # ------------------------------------------------------------------
+    # Local reads and write-through updates
+    # ------------------------------------------------------------------
+
+    def _upsert_row(self, event: Dict):
+        if is_recurring(event):
+            start_ts, end_ts = series_bounds(event, self.default_timezone)
+        elif event.get('status') == 'cancelled':
+            # Only looked up through its series, never by time range
+            start_ts = end_ts = None
+        else:
+            start_ts = event_start_ts(event, self.default_timezone)
+            end_ts = event_end_ts(event, self.default_timezone)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events (calendar_id, id, start_ts, end_ts, recurring, recurring_id, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.calendar_id,
+                event['id'],
+                start_ts,
+                end_ts,
+                int(is_recurring(event)),
+                event.get('recurringEventId'),
+                json.dumps(event, ensure_ascii=False)
+            )
+        )
+        for listener in self._listeners:
+            listener.on_event_put(event)
+
+    def _delete_row(self, event_id: str):
+        # Deleting a series deletes its exceptions with it
+        exception_ids = [row[0] for row in self._conn.execute(
+            "SELECT id FROM events WHERE calendar_id = ? AND recurring_id = ?",
+            (self.calendar_id, event_id)
+        )]
+        self._conn.execute(
+            "DELETE FROM events WHERE calendar_id = ? AND (id = ? OR recurring_id = ?)",
+            (self.calendar_id, event_id, event_id)
+        )
+        for removed in exception_ids + [event_id]:
+            for listener in self._listeners:
+                listener.on_event_removed(removed)
+
+    def put(self, event: Dict):
+        """Record an event returned by a successful API write"""
+        with self._lock, self._conn:
+            self._upsert_row(event)
+
+    def remove(self, event_id: str):
+        """Forget an event deleted through the API"""
+        with self._lock, self._conn:
+            self._delete_row(event_id)
+
+    def get(self, event_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM events WHERE calendar_id = ? AND id = ?",
+                (self.calendar_id, event_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _with_exceptions(self, rows: List) -> List[Dict]:
+        """Decode rows and add the exceptions of every series among them"""
+        events = [json.loads(row[0]) for row in rows]
+        master_ids = [event['id'] for event in events if is_recurring(event)]
+        if master_ids:
+            placeholders = ",".join("?" * len(master_ids))
+            exceptions = self._conn.execute(
+                f"SELECT body FROM events WHERE calendar_id = ? AND recurring_id IN ({placeholders})",
+                (self.calendar_id, *master_ids)
+            ).fetchall()
+            events.extend(json.loads(row[0]) for row in exceptions)
+        return events
+
+    def upcoming(self, max_results: int = 10, now: Optional[float] = None) -> List[Dict]:
+        """Events and occurrences that have not ended yet, ordered by start time"""
+        if now is None:
+            now = datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            # At most max_results single events can make the cut; series are expanded lazily
+            rows = self._conn.execute(
+                "SELECT body FROM events WHERE calendar_id = ? AND recurring = 0 AND end_ts > ? "
+                "ORDER BY start_ts LIMIT ?",
+                (self.calendar_id, now, max_results)
+            ).fetchall()
+            rows += self._conn.execute(
+                "SELECT body FROM events WHERE calendar_id = ? AND recurring = 1 AND end_ts > ?",
+                (self.calendar_id, now)
+            ).fetchall()
+            events = self._with_exceptions(rows)
+        return list(islice(expand_events(events, now, UNBOUNDED, self.default_timezone), max_results))
+
+    def iter_between(self, time_min: float, time_max: float) -> Iterator[Dict]:
+        """Lazily yield events and occurrences overlapping [time_min, time_max), by start time"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM events WHERE calendar_id = ? AND start_ts < ? AND end_ts > ?",
+                (self.calendar_id, time_max, time_min)
+            ).fetchall()
+            events = self._with_exceptions(rows)
+        return expand_events(events, time_min, time_max, self.default_timezone)
+
+    def between(self, time_min: float, time_max: float) -> List[Dict]:
+        """Events and occurrences overlapping [time_min, time_max), ordered by start time"""
+        return list(self.iter_between(time_min, time_max))
+
+    def all_events(self) -> List[Dict]:
+        """Stored rows as they are: single events, series masters and their exceptions"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT body FROM events WHERE calendar_id = ? ORDER BY start_ts",
+                (self.calendar_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_all(self, page_size: int = SCAN_PAGE_SIZE) -> Iterator[Dict]:
+        """Lazily yield every stored row, a page at a time, in id order"""
+        last_id = ''
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, body FROM events WHERE calendar_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (self.calendar_id, last_id, page_size)
+                ).fetchall()
+            for _, body in rows:
+                yield json.loads(body)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
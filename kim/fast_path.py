@@ -0,0 +1,274 @@
+import re
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+REQUIRED_FIELDS = ["title", "date", "start", "end"]
+
+CONFIRM_PHRASES = {
+    "yes", "yeah", "yep", "yup", "sure", "ok", "okay", "confirm", "confirmed",
+    "correct", "right", "sounds good", "do it", "go ahead", "yes please", "perfect"
+}
+CANCEL_PHRASES = {
+    "no", "nope", "cancel", "never mind", "nevermind", "stop", "forget it",
+    "cancel that", "no thanks", "start over"
+}
+GREETING_WORDS = {"hi", "hello", "hey", "there", "kim", "good", "morning", "afternoon", "evening"}
+FAREWELL_PHRASES = {"bye", "goodbye", "see you", "bye bye", "see you later", "thanks bye"}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+
+_ORDINAL = r"\d{1,2}(?:st|nd|rd|th)?"
+DATE_RE = re.compile(
+    r"\b(?:on\s+)?("
+    r"today|tonight|tomorrow|day after tomorrow"
+    r"|(?:next|this)\s+(?:" + "|".join(WEEKDAYS) + r")"
+    r"|(?:" + "|".join(WEEKDAYS) + r")"
+    r"|" + _ORDINAL + r"\s+(?:of\s+)?" + MONTHS +
+    r"|" + MONTHS + r"\s+" + _ORDINAL +
+    r"|\d{4}-\d{2}-\d{2}"
+    r")\b"
+)
+_CLOCK = r"(\d{1,2})(?::(\d{2}))?\s*(a\.?\s?m\.?|p\.?\s?m\.?)?"
+RANGE_RE = re.compile(
+    r"\b(?:from\s+)?" + _CLOCK + r"\s*(?:-|to|until|till)\s*" + _CLOCK + r"(?!\w)"
+)
+TIME_RE = re.compile(
+    r"\b(?:at\s+)?(?:(noon|midday|midnight)|" + _CLOCK + r")(?!\w)"
+)
+DURATION_RE = re.compile(r"\bfor\s+(\d+(?:\.\d+)?|an?|one|two|half an)\s*(hours?|hrs?|minutes?|mins?)\b")
+CREATE_VERB_RE = re.compile(
+    r"^(?:please\s+)?(?:can you\s+|could you\s+)?"
+    r"(?:schedule|book|add|create|set up|put|plan|arrange)\s+"
+    r"(?:(?:a|an|the|my|me)\s+)?(?P<title>.+)$"
+)
+FREE_SLOT_RE = re.compile(
+    r"\b(?:when am i free|when are we free|when (?:can|could) i (?:meet|fit)|"
+    r"find (?:me )?(?:a )?(?:free )?(?:slot|time)|free slots?|am i free)\b"
+)
+SLOT_DURATION_RE = re.compile(r"\b(\d+(?:\.\d+)?|an?|one|two|half an)\s*(hours?|hrs?|minutes?|mins?)\b")
+SLOT_RANGE_RE = re.compile(r"\b(this|next)\s+(week|month)\b|\bnext\s+(\d+)\s+days\b")
+FILLER_RE = re.compile(r"\b(?:on|at|for|from|in|the|please|kim|calendar|my|to|a|an)\b")
+
+
+class FastPathParser:
+    """Rule-based first pass that answers short turns without calling the LLM"""
+
+    def __init__(self, timezone: str = "Europe/Berlin", confidence_threshold: float = 0.8):
+        self.timezone = timezone
+        self.confidence_threshold = confidence_threshold
+        self._dateparser_settings = {
+            "TIMEZONE": timezone,
+            "RETURN_AS_TIMEZONE_AWARE": False,
+            "PREFER_DAY_OF_MONTH": "first",
+        }
+
+    def parse(self, user_input: str, context: Dict, now: Optional[datetime] = None) -> Tuple[Optional[Dict], float]:
+        """Return (LLM-shaped response, confidence); response is None when nothing matched"""
+        if now is None:
+            now = datetime.now(ZoneInfo(self.timezone))
+        text = self._normalize(user_input)
+        if not text:
+            return None, 0.0
+
+        if text in CONFIRM_PHRASES:
+            if all(context.get(f) for f in REQUIRED_FIELDS):
+                return self._response("confirm", dict(context)), 0.95
+            return None, 0.0
+        if text in CANCEL_PHRASES:
+            return self._response("cancel", {}, message="Okay, let's start over."), 0.95
+        words = text.split()
+        if words[0] in {"hi", "hello", "hey"} and all(w in GREETING_WORDS for w in words):
+            return self._response("general", {}), 0.95
+        if text in FAREWELL_PHRASES:
+            return self._response("general", {}), 0.95
+
+        if FREE_SLOT_RE.search(text):
+            return self._parse_free_slot(text, now.date())
+        return self._parse_scheduling(text, context, now.date())
+
+    def _parse_free_slot(self, text: str, today: date) -> Tuple[Optional[Dict], float]:
+        duration = None
+        match = SLOT_DURATION_RE.search(text)
+        if match:
+            duration = self._duration_minutes(*match.groups())
+
+        first, last = today, today + timedelta(days=6)
+        match = SLOT_RANGE_RE.search(text)
+        if match and match.group(3):
+            last = today + timedelta(days=int(match.group(3)) - 1)
+        elif match and match.group(2) == "week":
+            monday = today - timedelta(days=today.weekday())
+            if match.group(1) == "next":
+                first = monday + timedelta(days=7)
+            last = monday + timedelta(days=13 if match.group(1) == "next" else 6)
+        elif match:
+            month_start = today.replace(day=1)
+            if match.group(1) == "next":
+                first = month_start = (month_start + timedelta(days=32)).replace(day=1)
+            last = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        else:
+            match = DATE_RE.search(text)
+            if match:
+                first = last = self.resolve_date(match.group(1), today) or today
+
+        data = {"duration": duration, "range_start": first.isoformat(), "range_end": last.isoformat()}
+        return self._response("find_slot", data), 0.9
+
+    def _parse_scheduling(self, text: str, context: Dict, today: date) -> Tuple[Optional[Dict], float]:
+        data: Dict[str, str] = {}
+        remainder = text
+
+        match = DATE_RE.search(remainder)
+        if match:
+            resolved = self.resolve_date(match.group(1), today)
+            if resolved is None:
+                return None, 0.0
+            data["date"] = resolved.isoformat()
+            remainder = remainder[:match.start()] + " " + remainder[match.end():]
+
+        match = RANGE_RE.search(remainder)
+        if match:
+            start, end = self._clock_range(match.groups())
+            if start is None:
+                return None, 0.0
+            data["start"], data["end"] = start, end
+            remainder = remainder[:match.start()] + " " + remainder[match.end():]
+        else:
+            match = TIME_RE.search(remainder)
+            if match and self._looks_like_time(match):
+                start = self._clock(*match.groups())
+                if start is None:
+                    return None, 0.0
+                data["start"] = start
+                remainder = remainder[:match.start()] + " " + remainder[match.end():]
+
+        match = DURATION_RE.search(remainder)
+        start = data.get("start") or context.get("start")
+        if match and start and "end" not in data:
+            data["end"] = self._add_minutes(start, self._duration_minutes(*match.groups()))
+            remainder = remainder[:match.start()] + " " + remainder[match.end():]
+
+        if "start" in data and "end" not in data:
+            data["end"] = self._add_minutes(data["start"], 60)
+
+        title, confidence = self._extract_title(remainder, data, context)
+        if title:
+            data["title"] = title
+        if not data:
+            return None, 0.0
+
+        merged = {**{k: v for k, v in context.items() if k in REQUIRED_FIELDS}, **data}
+        if "start" in data and "end" not in data and context.get("end"):
+            merged["end"] = self._add_minutes(data["start"], 60)
+        missing = [f for f in REQUIRED_FIELDS if not merged.get(f)]
+        return self._response("create", merged, missing_fields=missing), confidence
+
+    def _extract_title(self, remainder: str, data: Dict, context: Dict) -> Tuple[Optional[str], float]:
+        leftover = " ".join(remainder.split())
+        verb = CREATE_VERB_RE.match(leftover)
+        if verb:
+            title = self._clean_title(verb.group("title"))
+            return (title, 0.9) if title else (None, 0.85)
+
+        content = " ".join(FILLER_RE.sub(" ", leftover).split())
+        if not content:
+            # Pure date/time follow-up such as "tomorrow at 3pm"
+            return None, 0.9 if data else 0.0
+        awaiting_title = not context.get("title") and any(context.get(f) for f in REQUIRED_FIELDS)
+        if not data and awaiting_title and len(content.split()) <= 5 and not re.search(r"\d|\?|^(?:what|when|how|who|why|where)\b", content):
+            # Short answer to "what should I call it?"
+            return self._clean_title(leftover), 0.85
+        # Free text mixed with date/time needs the LLM to pick the title
+        return None, 0.4
+
+    def _clean_title(self, text: str) -> Optional[str]:
+        words = [w for w in text.split() if w not in {"please", "for", "on", "at", "from"}]
+        while words and words[-1] in {"on", "at", "for", "from", "to", "the", "a", "an"}:
+            words.pop()
+        title = " ".join(words).strip(" .,!?")
+        return title.title() if title else None
+
+    def resolve_date(self, phrase: str, today: date) -> Optional[date]:
+        """Resolve a date phrase to an absolute date, preferring the future"""
+        phrase = phrase.strip().lower()
+        if phrase in ("today", "tonight"):
+            return today
+        if phrase == "tomorrow":
+            return today + timedelta(days=1)
+        if phrase == "day after tomorrow":
+            return today + timedelta(days=2)
+        words = phrase.split()
+        if words[-1] in WEEKDAYS:
+            delta = (WEEKDAYS.index(words[-1]) - today.weekday()) % 7
+            if delta == 0 and words[0] != "this":
+                delta = 7
+            return today + timedelta(days=delta)
+        # dateparser takes a few hundred ms to import; most phrases never need it
+        import dateparser
+        parsed = dateparser.parse(
+            phrase,
+            languages=["en"],
+            settings={**self._dateparser_settings, "RELATIVE_BASE": datetime.combine(today, datetime.min.time())}
+        )
+        if parsed is None:
+            return None
+        resolved = parsed.date()
+        if resolved < today and not re.search(r"\d{4}", phrase):
+            resolved = resolved.replace(year=resolved.year + 1)
+        return resolved
+
+    def _looks_like_time(self, match) -> bool:
+        named, hour, minute, meridiem = match.groups()
+        # A bare number ("2 people") is not a time; require a marker
+        return bool(named or minute or meridiem or match.group(0).startswith("at"))
+
+    def _clock(self, named, hour, minute, meridiem) -> Optional[str]:
+        if named:
+            return "00:00" if named == "midnight" else "12:00"
+        h, m = int(hour), int(minute or 0)
+        if meridiem:
+            pm = meridiem.startswith("p")
+            if h < 1 or h > 12:
+                return None
+            h = (h % 12) + (12 if pm else 0)
+        elif h < 8 and not minute:
+            # "at 3" during the day almost always means the afternoon
+            h += 12
+        if h > 23 or m > 59:
+            return None
+        return f"{h:02d}:{m:02d}"
+
+    def _clock_range(self, groups) -> Tuple[Optional[str], Optional[str]]:
+        h1, m1, mer1, h2, m2, mer2 = groups
+        # "2 to 3pm": the second meridiem applies to both ends
+        if mer2 and not mer1 and int(h1) <= int(h2):
+            mer1 = mer2
+        start = self._clock(None, h1, m1, mer1)
+        end = self._clock(None, h2, m2, mer2)
+        return (start, end) if start and end else (None, None)
+
+    def _duration_minutes(self, amount: str, unit: str) -> int:
+        value = {"a": 1, "an": 1, "one": 1, "two": 2, "half an": 0.5}.get(amount)
+        if value is None:
+            value = float(amount)
+        return int(value * 60) if unit.startswith("h") else int(value)
+
+    def _add_minutes(self, hhmm: str, minutes: int) -> str:
+        start = datetime.strptime(hhmm, "%H:%M")
+        return (start + timedelta(minutes=minutes)).strftime("%H:%M")
+
+    def _normalize(self, text: str) -> str:
+        text = text.lower().strip()
+        text = re.sub(r"[,!?]+", " ", text)
+        text = re.sub(r"\.(?!\w)", " ", text)
+        return " ".join(text.split())
+
+    def _response(self, intent: str, data: Dict, message: str = "", missing_fields: Optional[List[str]] = None) -> Dict:
+        return {
+            "intent": intent,
+            "message": message,
+            "missing_fields": missing_fields or [],
+            "data": data
+        }
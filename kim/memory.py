@@ -1,15 +1,55 @@
 import os
 import json
+import time
+import sqlite3
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
+from .memory_store import _TOKEN_RE, SQLiteMemoryStore
+from .memory_writer import DebouncedWriter, atomic_write, dumps
+from .profile_extractor import ProfileUpdater, extract_facts, rebuild_profile
+from .tracing import span, traced
 
 class MemoryManager:
-    def __init__(self):
-        self.memory_dir = os.path.join(os.path.dirname(__file__), 'memory')
+    def __init__(
+        self,
+        fsync_every: int = 8,
+        fsync_interval: float = 2.0,
+        compact_threshold: int = 1000,
+        compact_keep: int = 200,
+        backend: Optional[str] = None,
+        memory_dir: Optional[str] = None,
+        write_delay: float = 0.5,
+        max_write_delay: float = 2.0
+    ):
+        # Server sessions each get their own directory; the CLI uses kim/memory
+        self.memory_dir = memory_dir or os.path.join(os.path.dirname(__file__), 'memory')
         self.profile_path = os.path.join(self.memory_dir, 'profile.json')
+        # Legacy full-rewrite file, migrated into the append-only log on first load
         self.conversation_path = os.path.join(self.memory_dir, 'conversation.json')
+        self.conversation_log_path = os.path.join(self.memory_dir, 'conversation.jsonl')
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.compact_keep = compact_keep
+        self._log_file = None
+        self._log_lines = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        # Writes are queued here and flushed by a background writer once turns settle
+        self._pending_profile: Optional[bytes] = None
+        self._pending_turns: List = []
+        self._pending_lock = threading.Lock()
+        # Serializes log and profile file access between the writer and callers
+        self._io_lock = threading.RLock()
+        self._writer = DebouncedWriter(self._write_pending, write_delay, max_write_delay)
         self._ensure_memory_directory()
+        # "json" keeps flat files; "sqlite" keeps full, searchable history in memory.db
+        self.backend = backend or os.getenv("KIM_MEMORY_BACKEND", "json")
+        self.store = None
+        if self.backend == "sqlite":
+            self.store = SQLiteMemoryStore(os.path.join(self.memory_dir, 'memory.db'))
         
         # Initialize with default profile structure
         self.default_profile = {
@@ -40,23 +80,81 @@ class MemoryManager:
 
     def _ensure_memory_directory(self):
         """Create memory directory if it doesn't exist"""
-        Path(self.memory_dir).mkdir(exist_ok=True)
+        Path(self.memory_dir).mkdir(parents=True, exist_ok=True)
 
     def load_profile(self) -> Dict:
         """Load user profile with default fallback values"""
+        self.flush()
         try:
-            if os.path.exists(self.profile_path):
+            if self.store is not None:
+                profile = self.store.load_profile()
+                if isinstance(profile, dict):
+                    return self._deep_merge(self.default_profile, profile)
+            elif os.path.exists(self.profile_path):
                 with open(self.profile_path, 'r', encoding='utf-8') as f:
                     profile = json.load(f)
                     # Validate loaded profile structure
                     if isinstance(profile, dict):
                         return self._deep_merge(self.default_profile, profile)
-        except (json.JSONDecodeError, TypeError, OSError) as e:
+        except (json.JSONDecodeError, TypeError, OSError, sqlite3.Error) as e:
             print(f"⚠️ Profile load error: {str(e)}")
         return self.default_profile.copy()
 
-    def load_conversation(self) -> List[Dict]:
-        """Load conversation history with validation"""
+    def load_conversation(self, limit: Optional[int] = None) -> List[Dict]:
+        """Load conversation history from the append-only log, recovering from torn writes"""
+        self.flush()
+        with self._io_lock:
+            return self._load_conversation(limit)
+
+    def _load_conversation(self, limit: Optional[int] = None) -> List[Dict]:
+        if self.store is not None:
+            try:
+                return self.store.load_conversation(limit)
+            except sqlite3.Error as e:
+                print(f"⚠️ Conversation load error: {str(e)}")
+                return []
+        try:
+            if not os.path.exists(self.conversation_log_path):
+                legacy = self._load_legacy_conversation()
+                if legacy:
+                    self._rewrite_log(legacy)
+                return legacy[-limit:] if limit else legacy
+
+            entries = []
+            lines = skipped = 0
+            # Start and end of the last line; only a bad last line can be a torn append
+            last_start = offset = 0
+            last_bad = False
+            with open(self.conversation_log_path, 'rb') as f:
+                for raw in f:
+                    last_start, offset = offset, offset + len(raw)
+                    lines += 1
+                    try:
+                        entry = json.loads(raw) if raw.endswith(b'\n') else None
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        entry = None
+                    last_bad = entry is None
+                    if last_bad:
+                        skipped += 1
+                    elif isinstance(entry, dict):
+                        entries.append(entry)
+            if last_bad:
+                # Partial last line from a crash mid-append
+                print("⚠️ Conversation log had a torn tail, truncating to last good entry")
+                with open(self.conversation_log_path, 'r+b') as f:
+                    f.truncate(last_start)
+                lines -= 1
+                skipped -= 1
+            if skipped:
+                # Damage in the middle is skipped, never truncated: the entries after it are intact
+                print(f"⚠️ Conversation log has {skipped} unreadable line(s), skipping them")
+            self._log_lines = lines
+            return entries[-limit:] if limit else entries
+        except OSError as e:
+            print(f"⚠️ Conversation load error: {str(e)}")
+        return []
+
+    def _load_legacy_conversation(self) -> List[Dict]:
         try:
             if os.path.exists(self.conversation_path):
                 with open(self.conversation_path, 'r', encoding='utf-8') as f:
@@ -68,92 +166,161 @@ class MemoryManager:
             print(f"⚠️ Conversation load error: {str(e)}")
         return []
 
+    def append_conversation(self, entry: Dict):
+        """Queue one turn for the log; the background writer appends it, batching fsync and compaction"""
+        with span("memory.append", backend=self.backend):
+            try:
+                # Captured now: the writer never sees a dict the caller is still changing
+                turn = dict(entry) if self.store is not None else dumps(entry) + b'\n'
+            except TypeError as e:
+                print(f"⚠️ Conversation append error: {str(e)}")
+                return
+            with self._pending_lock:
+                self._pending_turns.append(turn)
+            self._writer.mark_dirty()
+
+    def flush(self):
+        """Write queued turns and profile changes now"""
+        if self._writer.pending:
+            self._writer.flush()
+
+    def _write_pending(self):
+        with self._io_lock:
+            with self._pending_lock:
+                turns, self._pending_turns = self._pending_turns, []
+                profile, self._pending_profile = self._pending_profile, None
+            if turns:
+                self._append_conversation(turns)
+            if profile is not None:
+                self._write_profile(profile)
+
+    def _append_conversation(self, turns: List):
+        if self.store is not None:
+            try:
+                self.store.append_turns(turns)
+            except sqlite3.Error as e:
+                print(f"⚠️ Conversation append error: {str(e)}")
+            return
+        try:
+            if self._log_file is None:
+                if self._log_lines is None:
+                    self._log_lines = self._count_log_lines()
+                self._log_file = open(self.conversation_log_path, 'ab')
+            self._log_file.write(b''.join(turns))
+            self._log_file.flush()
+            self._log_lines += len(turns)
+            self._unsynced += len(turns)
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self.sync_conversation()
+            if self._log_lines > self.compact_threshold:
+                self.compact_conversation()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Conversation append error: {str(e)}")
+
+    def sync_conversation(self):
+        """Force buffered log appends to disk"""
+        if self._log_file is not None and self._unsynced:
+            with span("memory.fsync", entries=self._unsynced):
+                os.fsync(self._log_file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def compact_conversation(self):
+        """Rewrite the log keeping only the newest compact_keep entries"""
+        with self._io_lock:
+            entries = self._load_conversation(limit=self.compact_keep)
+            self._rewrite_log(entries)
+
+    @traced("memory.rewrite_log")
+    def _rewrite_log(self, entries: List[Dict]):
+        self._close_log()
+        tmp_path = self.conversation_log_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for entry in entries:
+                f.write(dumps(entry) + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.conversation_log_path)
+        self._log_lines = len(entries)
+
+    def _count_log_lines(self) -> int:
+        if not os.path.exists(self.conversation_log_path):
+            return 0
+        with open(self.conversation_log_path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def _close_log(self):
+        if self._log_file is not None:
+            self.sync_conversation()
+            self._log_file.close()
+            self._log_file = None
+
+    def close(self):
+        """Write everything queued and close the conversation log"""
+        self._writer.close()
+        try:
+            with self._io_lock:
+                self._close_log()
+            if self.store is not None:
+                self.store.close()
+        except OSError as e:
+            print(f"⚠️ Conversation log close error: {str(e)}")
+
+    @traced("memory.save_profile")
     def save_profile(self, profile: Dict):
-        """Save profile with error handling"""
+        """Queue the profile for the background writer; repeated saves are coalesced into one write"""
+        try:
+            data = dumps(profile)
+        except TypeError as e:
+            print(f"⚠️ Profile save error: {str(e)}")
+            return
+        with self._pending_lock:
+            self._pending_profile = data
+        self._writer.mark_dirty()
+
+    @traced("memory.write_profile")
+    def _write_profile(self, data: bytes):
         try:
-            with open(self.profile_path, 'w', encoding='utf-8') as f:
-                json.dump(profile, f, indent=4, ensure_ascii=False)
-        except (OSError, TypeError) as e:
+            if self.store is not None:
+                self.store.save_profile(data.decode('utf-8'))
+                return
+            atomic_write(self.profile_path, data)
+        except (OSError, sqlite3.Error) as e:
             print(f"⚠️ Profile save error: {str(e)}")
 
     def save_conversation(self, conversation: List[Dict]):
-        """Save conversation history with validation"""
+        """Replace the whole conversation log (prefer append_conversation per turn)"""
         try:
             if not isinstance(conversation, list):
                 print("⚠️ Conversation data is not a list, not saving")
                 return
                 
-            with open(self.conversation_path, 'w', encoding='utf-8') as f:
-                json.dump(conversation, f, indent=4, ensure_ascii=False)
-        except (OSError, TypeError) as e:
+            with self._io_lock:
+                # Replaces whatever turns were still queued
+                with self._pending_lock:
+                    self._pending_turns = []
+                if self.store is not None:
+                    self.store.replace_conversation(conversation)
+                else:
+                    self._rewrite_log(conversation)
+        except (OSError, TypeError, sqlite3.Error) as e:
             print(f"⚠️ Conversation save error: {str(e)}")
 
     def update_profile_from_conversation(self, user_input: str, current_profile: Dict) -> Dict:
-        """Update profile from conversation with better parsing"""
-        changes = {}
-        input_lower = user_input.lower()
-        
-        # Enhanced name detection
-        if any(phrase in input_lower for phrase in ["my name is", "i'm called", "call me"]):
-            for phrase in ["my name is", "i'm called", "call me"]:
-                if phrase in input_lower:
-                    name = user_input.split(phrase)[-1].strip(" .")
-                    if name and name != current_profile["personal"]["name"]:
-                        changes["name"] = name
-                        current_profile["personal"]["name"] = name
-                        break
-        
-        # Enhanced schedule detection
-        schedule_phrases = ["i work", "my hours", "available from"]
-        if any(phrase in input_lower for phrase in schedule_phrases):
-            time_parts = []
-            if "from" in input_lower and "to" in input_lower:
-                try:
-                    time_part = input_lower.split("from")[-1]
-                    start_end = time_part.split("to")
-                    if len(start_end) == 2:
-                        start = start_end[0].strip()
-                        end = start_end[1].split()[0].strip()
-                        if start and end:
-                            changes["work_hours"] = {"start": start, "end": end}
-                            current_profile["schedule"]["work_hours"].update({
-                                "start": start,
-                                "end": end
-                            })
-                except (IndexError, AttributeError):
-                    pass
-        
-        # Enhanced responsibility detection
-        responsibility_phrases = ["need to", "have to", "must", "should", "i'll", "i will"]
-        if any(phrase in input_lower for phrase in responsibility_phrases):
-            responsibility = self._extract_responsibility(user_input)
-            if responsibility and responsibility not in current_profile["responsibilities"]:
-                changes["new_responsibility"] = responsibility
-                current_profile["responsibilities"].append(responsibility)
-        
+        """Apply the name, work hours and responsibilities stated in user_input; returns (profile, changes)"""
+        changes = ProfileUpdater(current_profile).apply(extract_facts(user_input))
         if changes:
             self.save_profile(current_profile)
-        
         return current_profile, changes
 
-    def _extract_responsibility(self, text: str) -> Optional[str]:
-        """Improved responsibility extraction"""
-        phrases = [
-            ("need to", 2),
-            ("have to", 2),
-            ("must", 1),
-            ("should", 1),
-            ("i'll", 1),
-            ("i will", 2)
-        ]
-        
-        for phrase, words in phrases:
-            if phrase in text.lower():
-                parts = text.lower().split(phrase)
-                if len(parts) > 1:
-                    responsibility = " ".join(parts[-1].strip().split()[:words])
-                    return responsibility.capitalize()
-        return None
+    def rebuild_profile_from_history(self, profile: Optional[Dict] = None) -> Dict:
+        """Replay every stored user turn into profile (default: the saved one) and save the result"""
+        base = profile if profile is not None else self.load_profile()
+        rebuilt, changes = rebuild_profile(self.load_conversation(), base)
+        if changes:
+            self.save_profile(rebuilt)
+        return rebuilt
 
     def _deep_merge(self, source: Dict, updates: Dict) -> Dict:
         """Safer deep merge implementation"""
@@ -167,7 +334,37 @@ class MemoryManager:
                 source[key] = value
         return source
 
-    def get_contextual_prompt(self, profile: Dict, conversation: List[str]) -> str:
+    def search_history(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Past turns matching query; only the sqlite backend keeps a searchable index.
+
+        Never waits for a flush: turns still queued for the writer are matched
+        in memory, newest first, ahead of the committed ones. The index is read
+        under the I/O lock so a batch being written is seen whole or not at all.
+        """
+        if self.store is None:
+            return []
+        terms = _TOKEN_RE.findall(query.lower())
+        with self._pending_lock:
+            queued = list(self._pending_turns)
+        results = [
+            turn for turn in reversed(queued)
+            if terms and all(term in _TOKEN_RE.findall(turn.get("content", "").lower()) for term in terms)
+        ][:limit]
+        if len(results) >= limit:
+            return results
+        try:
+            with self._io_lock:
+                committed = self.store.search(query, limit)
+            # The writer may have committed the queued turns in the meantime
+            seen = {(t.get("role"), t.get("content"), t.get("timestamp")) for t in results}
+            committed = [t for t in committed if (t["role"], t["content"], t["timestamp"]) not in seen]
+            return results + committed[:limit - len(results)]
+        except sqlite3.Error as e:
+            print(f"⚠️ History search error: {str(e)}")
+            return results
+
+    def get_contextual_prompt(self, profile: Dict, conversation: List[str], query: Optional[str] = None) -> str:
         """Generate context prompt with better formatting"""
         prompt_parts = [
             f"User Profile:",
@@ -186,12 +383,27 @@ class MemoryManager:
         if any(phrase in last_convo for phrase in time_phrases):
             prompt_parts.append(f"- Preferred Times: {profile['preferences']['preferred_meeting_times']}")
         
+        # Add what the user said about this topic before
+        if query:
+            related = self.search_history(query, limit=3)
+            if related:
+                prompt_parts.append("Related past turns:")
+                prompt_parts.extend(f"- {turn['role']}: {turn['content']}" for turn in related)
+        
         return "\n".join(prompt_parts)
 
     def clear_conversation(self):
         """Clear conversation history"""
         try:
-            if os.path.exists(self.conversation_path):
-                os.remove(self.conversation_path)
+            with self._io_lock:
+                with self._pending_lock:
+                    self._pending_turns = []
+                if self.store is not None:
+                    self.store.replace_conversation([])
+                self._close_log()
+                for path in (self.conversation_path, self.conversation_log_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._log_lines = 0
         except OSError as e:
             print(f"⚠️ Failed to clear conversation: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,132 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Union
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SQLiteMemoryStore:
+    """SQLite backend for MemoryManager keeping full history with an FTS5 index"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._create_schema()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        with self.conn as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS profile (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TEXT
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+                    content, content='turns', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+                    INSERT INTO turns_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+                    INSERT INTO turns_fts (turns_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                END;
+                """
+            )
+
+    def load_profile(self) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data FROM profile WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_profile(self, profile: Union[Dict, str]):
+        """Store the profile; a str is taken as already serialized JSON"""
+        data = profile if isinstance(profile, str) else json.dumps(profile, ensure_ascii=False)
+        with self._write_lock, self.conn as conn:
+            conn.execute("INSERT OR REPLACE INTO profile (id, data) VALUES (1, ?)", (data,))
+
+    def load_conversation(self, limit: Optional[int] = None) -> List[Dict]:
+        if limit:
+            rows = self.conn.execute(
+                "SELECT role, content, timestamp FROM "
+                "(SELECT * FROM turns ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (limit,)
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT role, content, timestamp FROM turns ORDER BY id"
+            ).fetchall()
+        return [{"role": r, "content": c, "timestamp": t} for r, c, t in rows]
+
+    def append_turns(self, entries: Iterable[Dict]):
+        with self._write_lock, self.conn as conn:
+            self._insert_turns(conn, entries)
+
+    def replace_conversation(self, entries: List[Dict]):
+        """Swap the whole history in one transaction: readers see the old turns or the new ones"""
+        with self._write_lock, self.conn as conn:
+            conn.execute("DELETE FROM turns")
+            self._insert_turns(conn, entries)
+
+    @staticmethod
+    def _insert_turns(conn: sqlite3.Connection, entries: Iterable[Dict]):
+        conn.executemany(
+            "INSERT INTO turns (role, content, timestamp) VALUES (?, ?, ?)",
+            ((e.get("role", ""), e.get("content", ""), e.get("timestamp")) for e in entries)
+        )
+
+    def search(self, query: str, limit: int = 5, role: Optional[str] = None) -> List[Dict]:
+        """Newest past turns containing all words of query, or any word if none contain all"""
+        terms = _TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+        quoted = [f'"{t}"' for t in terms]
+        rows = self._match(" AND ".join(quoted), limit, role)
+        if not rows and len(quoted) > 1:
+            rows = self._match(" OR ".join(quoted), limit, role)
+        return [{"role": r, "content": c, "timestamp": t} for r, c, t in rows]
+
+    def _match(self, match: str, limit: int, role: Optional[str]) -> List[tuple]:
+        # ORDER BY rowid DESC walks the FTS doclists backwards and stops at LIMIT,
+        # so latency stays flat as history grows instead of scoring every hit
+        sql = (
+            "SELECT t.role, t.content, t.timestamp FROM turns_fts "
+            "JOIN turns t ON t.id = turns_fts.rowid "
+            "WHERE turns_fts MATCH ?"
+        )
+        params: list = [match]
+        if role:
+            sql += " AND t.role = ?"
+            params.append(role)
+        sql += " ORDER BY turns_fts.rowid DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def count_turns(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import threading
+from typing import Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library produces the same compact output, only slower
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def atomic_write(path: str, data: bytes):
+    """Replace path with data; a crash leaves either the old file or the new one, never a truncated one"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DebouncedWriter:
+    """
+    Runs a flush callback in the background once writes settle.
+
+    mark_dirty() only records that there is something to write. The flush
+    runs on a writer thread after `delay` seconds without new writes, and
+    no later than `max_delay` after the first one, so a burst of turns is
+    written once. The thread exits when nothing is pending, so idle
+    sessions cost no thread; it is not a daemon, so pending writes still
+    land when the interpreter exits. flush() and close() write
+    synchronously in the caller.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], None],
+        delay: float = 0.5,
+        max_delay: float = 2.0,
+        name: str = "kim-memory-writer"
+    ):
+        self._flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self.name = name
+        self._cond = threading.Condition()
+        # Reentrant: a flush may read back what it is writing
+        self._flush_lock = threading.RLock()
+        self._first_dirty: Optional[float] = None
+        self._last_dirty: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.flushes = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._first_dirty is not None
+
+    def mark_dirty(self):
+        with self._cond:
+            now = time.monotonic()
+            if self._first_dirty is None:
+                self._first_dirty = now
+            self._last_dirty = now
+            if self._closed:
+                synchronous = True
+            else:
+                synchronous = False
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name)
+                    self._thread.start()
+        if synchronous:
+            # After close there is no writer thread to wait for
+            self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._first_dirty is None:
+                        self._thread = None
+                        return
+                    deadline = min(self._last_dirty + self.delay, self._first_dirty + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._cond.wait(remaining)
+                self._first_dirty = self._last_dirty = None
+            self._run_flush()
+
+    def _run_flush(self):
+        with self._flush_lock:
+            try:
+                self._flush()
+                self.flushes += 1
+            except Exception as e:
+                print(f"⚠️ Memory write error: {str(e)}")
+
+    def flush(self):
+        """Write whatever is pending now, in the calling thread"""
+        with self._cond:
+            self._first_dirty = self._last_dirty = None
+        self._run_flush()
+
+    def close(self):
+        """Write what is pending and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
@@ -0,0 +1,202 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .streaming import TurnCancelled
+from .tracing import StageMetrics, span
+
+EXIT_COMMANDS = ["exit", "quit"]
+
+
+class _Utterance:
+    def __init__(self, audio, captured_at: float):
+        self.audio = audio
+        self.captured_at = captured_at
+        self.transcript: Optional[Future] = None
+        # Cancel flag of the reply this utterance talked over, if any
+        self.interrupts: Optional[threading.Event] = None
+
+
+class VoicePipeline:
+    """
+    Capture -> recognize -> think pipeline running on separate threads.
+
+    The listener keeps capturing while earlier turns are being recognized
+    and answered. Recognition runs in a worker pool; results are consumed
+    in capture order by a single think stage that calls
+    ``assistant.process_input``. Speech arriving while a reply is still
+    streaming cancels that reply (barge-in): at once when the listener
+    reports speech starting (``on_speech``), otherwise as soon as the
+    utterance is recognized. Noise that transcribes to nothing is ignored.
+    """
+
+    def __init__(
+        self,
+        assistant,
+        listener,
+        recognize: Optional[Callable] = None,
+        recognize_workers: int = 2,
+        max_pending: int = 4,
+        on_output: Callable[[str], None] = print,
+        on_partial: Optional[Callable[[str, bool], None]] = None
+    ):
+        self.assistant = assistant
+        self.listener = listener
+        self.recognize = recognize or listener.recognize
+        self.on_output = on_output
+        self.on_partial = on_partial
+        self.metrics = StageMetrics()
+        self._recognizers = ThreadPoolExecutor(max_workers=recognize_workers, thread_name_prefix="kim-asr")
+        self._pending: "queue.Queue[Optional[_Utterance]]" = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        # Cancel flag of the reply in flight; every reply gets its own, so a late barge-in can't hit the next one
+        self._reply: Optional[threading.Event] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self, think_thread: bool = True) -> 'VoicePipeline':
+        self.listener.start()
+        stages = [(self._dispatch_loop, "kim-dispatch")]
+        if think_thread:
+            stages.append((self._think_loop, "kim-think"))
+        for target, name in stages:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def run(self, think_in_caller: bool = False):
+        """
+        Run until an exit command, the end of the audio source, or Ctrl+C.
+
+        With think_in_caller the think stage runs on the calling thread,
+        which single-thread profilers need to see the assistant's work.
+        """
+        self.start(think_thread=not think_in_caller)
+        try:
+            if think_in_caller:
+                self._think_loop()
+            while not self._stop.is_set():
+                self._stop.wait(0.2)
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        self._interrupt(self._reply)
+        self.listener.stop()
+        try:
+            self._pending.put_nowait(None)
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._recognizers.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            audio = self.listener.get_utterance(timeout=0.2)
+            if audio is None:
+                if self.listener.finished.is_set():
+                    self._put(None)
+                    return
+                continue
+            utterance = _Utterance(audio, time.perf_counter())
+            utterance.transcript = self._recognizers.submit(self._timed_recognize, audio)
+            reply = self._reply
+            if reply is not None:
+                # The user talked over the reply: drop it once the audio turns out to be words
+                utterance.interrupts = reply
+                utterance.transcript.add_done_callback(lambda done: self._interrupt_if_speech(done, reply))
+            self._put(utterance)
+
+    def on_speech(self, partial: str):
+        """Listener callback for speech starting (e.g. streaming partials); interrupts the reply at once"""
+        if partial and partial.strip():
+            self._interrupt(self._reply)
+
+    def _interrupt(self, reply: Optional[threading.Event]):
+        if reply is not None:
+            reply.set()
+
+    def _interrupt_if_speech(self, transcript: Future, reply: threading.Event):
+        if not transcript.cancelled() and transcript.exception() is None and (transcript.result() or "").strip():
+            self._interrupt(reply)
+
+    def _put(self, utterance: Optional[_Utterance]):
+        # Bounded queue: block capture hand-off rather than grow without limit
+        while not self._stop.is_set():
+            try:
+                self._pending.put(utterance, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def _timed_recognize(self, audio) -> Optional[str]:
+        start = time.perf_counter()
+        try:
+            return self.recognize(audio)
+        finally:
+            self.metrics.record("recognize", time.perf_counter() - start)
+
+    def _think_loop(self):
+        while not self._stop.is_set():
+            try:
+                utterance = self._pending.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if utterance is None:
+                self._stop.set()
+                return
+            try:
+                text = utterance.transcript.result()
+            except Exception as e:
+                self.on_output(f"Kim: Speech recognition error: {str(e)}")
+                continue
+            if not text or not text.strip():
+                if utterance.interrupts is None:
+                    self.on_output("Kim: I didn't catch that. Could you repeat?")
+                # Noise picked up while Kim was answering is not worth a reply
+                continue
+            self.metrics.record("transcribed", time.perf_counter() - utterance.captured_at)
+            if any(cmd in text.lower() for cmd in EXIT_COMMANDS):
+                self.on_output("Kim: Goodbye! Have a great day!")
+                self._stop.set()
+                return
+            self._respond(text, utterance)
+
+    def _respond(self, text: str, utterance: _Utterance):
+        self.on_output(f"You: {text}")
+        cancel = self._reply = threading.Event()
+        streamed = []
+
+        def on_partial(chunk: str):
+            if cancel.is_set():
+                raise TurnCancelled()
+            if self.on_partial is not None:
+                self.on_partial(chunk, not streamed)
+            streamed.append(chunk)
+
+        start = time.perf_counter()
+        try:
+            response = self.assistant.process_input(text, on_partial=on_partial)
+        except TurnCancelled:
+            self.metrics.record("cancelled", time.perf_counter() - start)
+            self.on_output("Kim: (interrupted)")
+            return
+        except Exception as e:
+            self.on_output(f"Kim: Error: {str(e)}")
+            return
+        finally:
+            self._reply = None
+        self.metrics.record("think", time.perf_counter() - start)
+        self.metrics.record("turn", time.perf_counter() - utterance.captured_at)
+        if cancel.is_set():
+            self.on_output("Kim: (interrupted)")
+        elif not streamed or self.on_partial is None:
+            self.on_output(f"Kim: {response}")
+        elif response != "".join(streamed):
+            # Structured replies (e.g. the confirmation prompt) replace the streamed text
+            self.on_output(f"\nKim: {response}")
+        else:
+            self.on_output("")
@@ -0,0 +1,238 @@
+import copy
+import functools
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+TRIGGERS = {
+    "name": ["my name is", "my name's", "i'm called", "i am called", "call me"],
+    "hours": [
+        "i work", "i'm working", "i am working", "my hours", "my hours are", "my work hours are",
+        "my working hours are", "i'm available", "i am available", "available"
+    ],
+    "duty": ["need to", "have to", "has to", "got to", "gotta", "must", "should", "i'll", "i will"],
+}
+TRIGGER_KINDS = {phrase: kind for kind, phrases in TRIGGERS.items() for phrase in phrases}
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    Regex alternation factored into a prefix trie.
+
+    "i work|i will|i'm called" becomes "i(?: w(?:ork|ill)|'m called)", so
+    at each position the engine rejects on the first character instead of
+    trying every phrase - the Aho-Corasick idea within the re module.
+    Longer phrases are preferred where one is a prefix of another.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not ends else "(?:" + "|".join(branches) + ")"
+        return body + "?" if ends else body
+
+    return build(trie)
+
+
+# Every trigger phrase in one trie-shaped pattern over lowercased text: one scan finds them all, in order.
+# No leading \b: a pattern that starts with literals lets the engine skip ahead; the caller checks the boundary
+TRIGGER_RE = re.compile(_trie_pattern(TRIGGER_KINDS) + r"\b")
+
+# "must say", "have to go" are figures of speech, not tasks
+MIN_DUTY_WORDS = 2
+MAX_DUTY_WORDS = 6
+DUTY_STOP_WORDS = ["and", "but", "because", "so", "or", "then", "if", "before", "after"]
+NAME_STOP_WORDS = {"and", "but", "so", "i", "i'm", "im", "from", "at", "please", "by", "the", "kim"}
+# "call me back", "call me tomorrow": the words after the trigger are not a name
+NOT_NAMES = {
+    "back", "later", "tomorrow", "today", "tonight", "when", "if", "at", "on", "in", "after", "before",
+    "maybe", "again", "a", "an", "the", "up", "about", "now", "asap", "please", "whenever", "sometime"
+}
+
+
+def _none_of(words, follow: str) -> str:
+    """Lookahead rejecting any of words when followed by follow"""
+    return "(?!" + _trie_pattern(words) + follow + ")"
+
+
+# Each kind of fact has its own tail pattern, matched right after its trigger. The word limits
+# and stop words are compiled in, so a match is the finished value.
+_WORD = r"[^\W\d_][\w'-]*"
+_NAME_START = _none_of(NAME_STOP_WORDS | NOT_NAMES, r"(?![\w'-])")
+_NAME_NEXT = _none_of(NAME_STOP_WORDS, r"(?![\w'-])")
+# Up to three words, cut at a stop word
+NAME_TAIL_RE = re.compile(r"\s+(?P<value>" + _NAME_START + _WORD + r"(?:\s+" + _NAME_NEXT + _WORD + r"){0,2})")
+_CLOCK = r"(\d{1,2})(?:[:.](\d{2}))?\s*(a\.?\s?m\.?|p\.?\s?m\.?)?"
+# Up to a few words ("monday to friday") may sit between the trigger and the hours
+HOURS_TAIL_RE = re.compile(
+    r"(?:\s+[^\s\d]+){0,6}?\s+(?:from\s+|between\s+)?" + _CLOCK +
+    r"\s*(?:-|to|until|till|and)\s*" + _CLOCK + r"(?!\w)"
+)
+# The clause up to punctuation or a conjunction, MIN to MAX_DUTY_WORDS words of it;
+# "should I ...?", "must be", "have to not ..." are not tasks
+_DUTY_WORD = r"[^\s.!?;,]+"
+DUTY_TAIL_RE = re.compile(
+    r"(?!\s+(?:i|we|you|it|that|this|be|not)\b)\s+(?P<value>" + _DUTY_WORD +
+    r"(?:[^\S\n]+" + _none_of(DUTY_STOP_WORDS, r"[^\S\n]") + _DUTY_WORD +
+    "){%d,%d})" % (MIN_DUTY_WORDS - 1, MAX_DUTY_WORDS - 1)
+)
+
+
+def _name(value: str) -> Optional[str]:
+    name = " ".join(value.split()).strip("'-")
+    if not name:
+        return None
+    # Speech recognition hands over lowercase text
+    return name.title() if name.islower() else name
+
+
+def _clock(hour: str, minute: Optional[str], meridiem: Optional[str]) -> Optional[Tuple[int, int]]:
+    h, m = int(hour), int(minute or 0)
+    if meridiem:
+        if h < 1 or h > 12:
+            return None
+        h = (h % 12) + (12 if meridiem.startswith("p") else 0)
+    if h > 24 or m > 59:
+        return None
+    return h % 24, m
+
+
+@functools.lru_cache(maxsize=1024)
+def _work_hours(h1, m1, mer1, h2, m2, mer2) -> Optional[Tuple[str, str]]:
+    # People repeat the same few hours, so the conversions are reused
+    # "1 to 5pm": the second meridiem applies to both ends when that keeps them in order
+    if mer2 and not mer1 and int(h1) < int(h2) <= 12:
+        mer1 = mer2
+    start, end = _clock(h1, m1, mer1), _clock(h2, m2, mer2)
+    if start is None or end is None:
+        return None
+    if not mer2 and end <= start and end[0] < 12:
+        # "9 to 5" is nine to five in the afternoon
+        end = (end[0] + 12, end[1])
+    if end <= start:
+        return None
+    return f"{start[0]:02d}:{start[1]:02d}", f"{end[0]:02d}:{end[1]:02d}"
+
+
+def _duty(value: str) -> str:
+    duty = " ".join(value.split())
+    return duty[0].upper() + duty[1:]
+
+
+def duty_key(duty: str) -> str:
+    """Dedupe key for a responsibility: case and spacing do not make it new"""
+    return " ".join(duty.casefold().split())
+
+
+def extract_facts(text: str) -> Dict:
+    """
+    Profile facts stated in one utterance, found in a single pass.
+
+    Returns {"name", "work_hours", "responsibilities"}: the last name and
+    work hours mentioned (or None), with hours as {"start", "end"} in
+    HH:MM, and every responsibility in order of appearance.
+    """
+    facts = {"name": None, "work_hours": None, "responsibilities": []}
+    if not text:
+        return facts
+    text = text.replace("’", "'")
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters grow when lowercased; offsets must line up with the original
+        text = lowered
+    # Matching runs on the lowercased text; names and tasks are cut from the original
+    for trigger in TRIGGER_RE.finditer(lowered):
+        before = trigger.start() - 1
+        if before >= 0 and (lowered[before].isalnum() or lowered[before] == "_"):
+            continue
+        kind = TRIGGER_KINDS[trigger.group()]
+        if kind == "name":
+            tail = NAME_TAIL_RE.match(lowered, trigger.end())
+            name = _name(text[tail.start("value"):tail.end("value")]) if tail else None
+            if name:
+                facts["name"] = name
+        elif kind == "hours":
+            tail = HOURS_TAIL_RE.match(lowered, trigger.end())
+            hours = _work_hours(*tail.groups()) if tail else None
+            if hours:
+                facts["work_hours"] = {"start": hours[0], "end": hours[1]}
+        else:
+            tail = DUTY_TAIL_RE.match(lowered, trigger.end())
+            if tail:
+                start, end = tail.span("value")
+                facts["responsibilities"].append(_duty(text[start:end]))
+    return facts
+
+
+def extract_many(texts: Iterable[str]) -> Iterator[Dict]:
+    """extract_facts over a stream of utterances"""
+    for text in texts:
+        yield extract_facts(text)
+
+
+class ProfileUpdater:
+    """
+    Applies extracted facts to a profile dict in place.
+
+    Known responsibilities are kept in a set of dedupe keys, so applying a
+    whole conversation log costs one lookup per fact instead of a scan of
+    the list.
+    """
+
+    def __init__(self, profile: Dict):
+        self.profile = profile
+        profile.setdefault("personal", {})
+        profile.setdefault("schedule", {}).setdefault("work_hours", {})
+        profile.setdefault("responsibilities", [])
+        self._known = {duty_key(duty) for duty in profile["responsibilities"] if isinstance(duty, str)}
+
+    def apply(self, facts: Dict) -> Dict:
+        """Write facts into the profile; returns only what changed"""
+        changes = {}
+        name = facts.get("name")
+        if name and name != self.profile["personal"].get("name"):
+            self.profile["personal"]["name"] = name
+            changes["name"] = name
+
+        hours = facts.get("work_hours")
+        work_hours = self.profile["schedule"]["work_hours"]
+        if hours and (work_hours.get("start"), work_hours.get("end")) != (hours["start"], hours["end"]):
+            work_hours.update(hours)
+            changes["work_hours"] = dict(hours)
+
+        added = []
+        for duty in facts.get("responsibilities", ()):
+            key = duty_key(duty)
+            if key not in self._known:
+                self._known.add(key)
+                self.profile["responsibilities"].append(duty)
+                added.append(duty)
+        if added:
+            changes["new_responsibilities"] = added
+        return changes
+
+
+def rebuild_profile(turns: Iterable[Dict], profile: Dict) -> Tuple[Dict, Dict]:
+    """
+    Replay the user's side of a conversation log into a copy of profile.
+
+    Later statements win for name and work hours. Returns the new profile
+    and the accumulated changes.
+    """
+    updater = ProfileUpdater(copy.deepcopy(profile))
+    changes: Dict = {}
+    texts = (turn.get("content") or "" for turn in turns if turn.get("role") == "user")
+    for facts in extract_many(texts):
+        for key, value in updater.apply(facts).items():
+            if key == "new_responsibilities":
+                changes.setdefault(key, []).extend(value)
+            else:
+                changes[key] = value
+    return updater.profile, changes
@@ -0,0 +1,77 @@
+import io
+import sys
+import pstats
+import cProfile
+import threading
+from typing import List, Optional
+
+PROFILE_MODES = ("cprofile", "pyinstrument")
+
+
+class SessionProfiler:
+    """
+    Profiles one whole session.
+
+    cProfile profilers are per thread, so in "cprofile" mode every thread
+    started while profiling gets its own profiler (via threading.setprofile)
+    and the results are merged into one .prof file. pyinstrument samples
+    only the thread that started it, so that mode expects the caller to
+    run the think stage on the main thread.
+    """
+
+    def __init__(self, mode: str = "cprofile", output: Optional[str] = None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        self.output = output or ("kim_profile.prof" if mode == "cprofile" else "kim_profile.html")
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._pyinstrument = None
+
+    def _start_thread_profile(self, frame, event, arg):
+        # First profile event of a new thread: swap the hook for a real profiler
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        if self.mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError as e:
+                raise ImportError("--profile pyinstrument needs 'pip install pyinstrument'") from e
+            self._pyinstrument = Profiler()
+            self._pyinstrument.start()
+            return self
+        threading.setprofile(self._start_thread_profile)
+        main = cProfile.Profile()
+        self._profiles.append(main)
+        main.enable()
+        return self
+
+    def stop(self) -> str:
+        """Stop profiling, write the output file and return a short text summary"""
+        if self._pyinstrument is not None:
+            self._pyinstrument.stop()
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(self._pyinstrument.output_html())
+            return self._pyinstrument.output_text(unicode=True, color=False)
+
+        threading.setprofile(None)
+        self._profiles[0].disable()
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # A thread that never ran any Python code has no stats
+                continue
+        stats.dump_stats(self.output)
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats("cumulative").print_stats(25)
+        return text.getvalue()
@@ -0,0 +1,189 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+from .async_llm import CHARS_PER_TOKEN
+
+# Per-message framing tokens in the chat format
+MESSAGE_OVERHEAD = 4
+SUMMARY_WORDS = 12
+SCHEDULED_RE = re.compile(r"✅ Scheduled: .+")
+
+
+_encodings: Dict[str, object] = {}
+_encodings_lock = threading.Lock()
+
+
+def _load_encoding(model: str):
+    """tiktoken encoding for model, loaded once per process; None when unavailable"""
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # Not installed, or the BPE file cannot be downloaded
+                print(f"⚠️ tiktoken unavailable ({str(e)[:60]}), estimating tokens")
+                _encodings[model] = None
+        return _encodings[model]
+
+
+class TokenCounter:
+    """
+    tiktoken counts for the model once load() has run, a character estimate
+    before that. Loading may download the BPE file, so it belongs in warm-up
+    and never happens inside a turn.
+    """
+
+    def __init__(self, model: str = "gpt-4o"):
+        self.model = model
+
+    def load(self):
+        """Load (and possibly download) the encoding; returns None when unavailable"""
+        return _load_encoding(self.model)
+
+    @property
+    def encoding(self):
+        return _encodings.get(self.model)
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    def count_messages(self, messages: Iterable[Dict]) -> int:
+        return sum(self.count(m.get("content") or "") + MESSAGE_OVERHEAD for m in messages)
+
+
+def summarize_turns(turns: Iterable[Dict]) -> List[str]:
+    """
+    One short line per older turn: what the user asked for and what got scheduled.
+
+    Extractive on purpose - no extra LLM call per turn. Assistant turns only
+    survive when they record a scheduled event.
+    """
+    lines = []
+    for turn in turns:
+        content = (turn.get("content") or "").strip()
+        if not content:
+            continue
+        if turn.get("role") == "user":
+            words = content.split()
+            text = " ".join(words[:SUMMARY_WORDS]) + (" ..." if len(words) > SUMMARY_WORDS else "")
+            lines.append(f"User asked: {text}")
+        else:
+            match = SCHEDULED_RE.search(content)
+            if match:
+                lines.append(match.group(0).replace("✅ ", ""))
+    return lines
+
+
+class PromptBuilder:
+    """
+    Assembles chat messages within a token budget.
+
+    The static system prompt always goes first and is never edited, so the
+    provider's prefix cache can reuse it between turns; requests also carry
+    a prompt_cache_key naming that prefix. Everything else shares
+    ``budget`` tokens, filled in priority order: the current slot context,
+    profile facts, related turns from the history store, recent turns
+    verbatim, and a compact summary of the turns that no longer fit.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        model: str = "gpt-4o",
+        budget: int = 1200,
+        recent_turns: int = 6,
+        related_turns: int = 3,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.related_turns = related_turns
+        self.counter = counter or TokenCounter(model)
+        self.static_prefix = [{"role": "system", "content": system_prompt}]
+        self.last_usage: Dict[str, int] = {}
+
+    def _fits(self, used: int, text: str) -> bool:
+        return used + self.counter.count(text) + MESSAGE_OVERHEAD <= self.budget
+
+    def build(
+        self,
+        user_input: str,
+        slot_context: Sequence[str] = (),
+        profile: Optional[Dict] = None,
+        history: Sequence[Dict] = (),
+        memory=None
+    ) -> List[Dict]:
+        used = self.counter.count(user_input) + MESSAGE_OVERHEAD
+        sections = []
+
+        if slot_context:
+            text = "Current context:\n" + "\n".join(slot_context)
+            used += self.counter.count(text) + MESSAGE_OVERHEAD
+            sections.append(text)
+
+        recent = list(history)[-self.recent_turns:] if self.recent_turns else []
+        if profile and memory is not None:
+            try:
+                facts = memory.get_contextual_prompt(profile, [t.get("content", "") for t in recent])
+            except (KeyError, TypeError, AttributeError):
+                facts = ""
+            if facts and self._fits(used, facts):
+                used += self.counter.count(facts) + MESSAGE_OVERHEAD
+                sections.append(facts)
+
+        if memory is not None and self.related_turns:
+            seen = {(t.get("role"), t.get("content")) for t in history}
+            related = [
+                f"- {t['role']}: {t['content']}"
+                for t in memory.search_history(user_input, limit=self.related_turns + len(seen))
+                if (t.get("role"), t.get("content")) not in seen
+            ][:self.related_turns]
+            while related and not self._fits(used, "Related past turns:\n" + "\n".join(related)):
+                related.pop()
+            if related:
+                text = "Related past turns:\n" + "\n".join(related)
+                used += self.counter.count(text) + MESSAGE_OVERHEAD
+                sections.append(text)
+
+        # Newest turns first until the budget runs out; the rest become the summary
+        kept: List[Dict] = []
+        for turn in reversed(recent):
+            message = {"role": turn.get("role", "user"), "content": turn.get("content", "")}
+            cost = self.counter.count(message["content"]) + MESSAGE_OVERHEAD
+            if used + cost > self.budget:
+                break
+            kept.insert(0, message)
+            used += cost
+        older = list(history)[:len(history) - len(kept)]
+        summary = summarize_turns(older)
+        while summary and not self._fits(used, "Earlier in this conversation:\n" + "\n".join(summary)):
+            summary.pop(0)
+        if summary:
+            text = "Earlier in this conversation:\n" + "\n".join(summary)
+            used += self.counter.count(text) + MESSAGE_OVERHEAD
+            sections.insert(0, text)
+
+        messages = list(self.static_prefix)
+        if sections:
+            messages.append({"role": "system", "content": "\n\n".join(sections)})
+        messages.extend(kept)
+        messages.append({"role": "user", "content": user_input})
+        self.last_usage = {
+            "static": self.counter.count_messages(self.static_prefix),
+            "dynamic": used,
+            "total": self.counter.count_messages(messages)
+        }
+        return messages
@@ -0,0 +1,60 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def _chunks(self, tokens: float):
+        # More than the bucket holds is taken a bucketful at a time, so it still costs its full size
+        while tokens > self.capacity:
+            yield self.capacity
+            tokens -= self.capacity
+        yield tokens
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until tokens are available"""
+        for chunk in self._chunks(tokens):
+            while True:
+                wait = self.try_acquire(chunk)
+                if wait <= 0:
+                    break
+                time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait without blocking the event loop until tokens are available"""
+        for chunk in self._chunks(tokens):
+            while True:
+                wait = self.try_acquire(chunk)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 32.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,313 @@
+import re
+import heapq
+import functools
+from datetime import datetime, timedelta
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+from dateutil.rrule import rrulestr, rruleset
+
+DEFAULT_TIMEZONE = 'Europe/Berlin'
+RECURRENCE_PREFIXES = ('RRULE:', 'EXRULE:', 'RDATE', 'EXDATE')
+UNBOUNDED = float('inf')
+
+_UNTIL_RE = re.compile(r"UNTIL=(\d{8})(T\d{6}Z?)?", re.IGNORECASE)
+_FREQ_RE = re.compile(r"FREQ=(\w+)", re.IGNORECASE)
+_INTERVAL_RE = re.compile(r"INTERVAL=(\d+)", re.IGNORECASE)
+_PERIOD_NAMES = {'DAILY': 'day', 'WEEKLY': 'week', 'MONTHLY': 'month', 'YEARLY': 'year'}
+
+
+def normalize_recurrence(recurrence: Union[str, Iterable[str], None]) -> Optional[List[str]]:
+    """
+    Validate RRULE/EXRULE/RDATE/EXDATE lines for an event body.
+
+    Accepts one rule ("FREQ=WEEKLY;BYDAY=MO" or "RRULE:FREQ=...") or a list
+    of lines; returns the lines Google Calendar expects, or None for no
+    recurrence. Raises ValueError for rules dateutil cannot parse.
+    """
+    if not recurrence:
+        return None
+    lines = [recurrence] if isinstance(recurrence, str) else list(recurrence)
+    normalized = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not line.upper().startswith(RECURRENCE_PREFIXES):
+            line = f"RRULE:{line}"
+        if line.upper().startswith(('RRULE:', 'EXRULE:')):
+            try:
+                rrulestr(_naive_rule(line.split(':', 1)[1], ZoneInfo('UTC')), dtstart=datetime(2000, 1, 1))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Invalid recurrence rule '{line}': {str(e)}") from e
+        normalized.append(line)
+    return normalized or None
+
+
+def is_recurring(event: Dict) -> bool:
+    """True for a series master (an event with recurrence lines)"""
+    return bool(event.get('recurrence'))
+
+
+def field_datetime(field: Dict, default_tz: str) -> Tuple[Optional[datetime], bool, ZoneInfo]:
+    """(naive wall-clock start, all_day, zone) of an event start/end field"""
+    tz = ZoneInfo(field.get('timeZone') or default_tz)
+    if field.get('dateTime'):
+        dt = datetime.fromisoformat(field['dateTime'].replace('Z', '+00:00'))
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(tz).replace(tzinfo=None)
+        return dt, False, tz
+    if field.get('date'):
+        return datetime.fromisoformat(field['date']), True, tz
+    return None, False, tz
+
+
+def _naive_rule(rule: str, tz: ZoneInfo) -> str:
+    """
+    Rewrite UNTIL as local wall-clock time: rules are expanded against a
+    naive DTSTART so occurrences keep their local time across DST changes.
+    """
+    def local_until(match):
+        day, time_part = match.group(1), match.group(2)
+        if not time_part:
+            # A date-only UNTIL includes that whole day
+            return f"UNTIL={day}T235959"
+        if time_part.upper().endswith('Z'):
+            utc = datetime.strptime(day + time_part[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=ZoneInfo('UTC'))
+            return f"UNTIL={utc.astimezone(tz).strftime('%Y%m%dT%H%M%S')}"
+        return match.group(0)
+
+    return _UNTIL_RE.sub(local_until, rule)
+
+
+def _parse_dates(line: str, tz: ZoneInfo) -> List[datetime]:
+    """Naive local datetimes of an RDATE/EXDATE line ("EXDATE;TZID=...:20261020T100000,...")"""
+    params, _, values = line.partition(':')
+    zone = tz
+    for param in params.split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.upper() == 'TZID':
+            zone = ZoneInfo(value)
+    result = []
+    for value in values.split(','):
+        value = value.strip()
+        if not value:
+            continue
+        if 'T' not in value:
+            result.append(datetime.strptime(value, "%Y%m%d"))
+            continue
+        dt = datetime.strptime(value.rstrip('Zz'), "%Y%m%dT%H%M%S")
+        aware = dt.replace(tzinfo=ZoneInfo('UTC') if value[-1] in 'Zz' else zone)
+        result.append(aware.astimezone(tz).replace(tzinfo=None))
+    return result
+
+
+def _fast_forward(rule: str, dtstart: datetime, not_before: Optional[datetime]) -> datetime:
+    """
+    A later DTSTART that yields the same occurrences from not_before on.
+
+    Only DAILY/WEEKLY rules without COUNT are moved, by whole multiples of
+    their period, so the phase (weekday, every-other-week) is unchanged.
+    COUNT and MONTHLY/YEARLY series are expanded from their real start:
+    their length is bounded or a dozen occurrences a year.
+    """
+    if not_before is None or not_before <= dtstart or 'COUNT=' in rule.upper():
+        return dtstart
+    freq = _FREQ_RE.search(rule)
+    interval = _INTERVAL_RE.search(rule)
+    step = int(interval.group(1)) if interval else 1
+    if freq is None:
+        return dtstart
+    frequency = freq.group(1).upper()
+    if frequency == 'DAILY':
+        period = timedelta(days=step)
+    elif frequency == 'WEEKLY':
+        period = timedelta(weeks=step)
+    else:
+        return dtstart
+    return dtstart + period * ((not_before - dtstart) // period)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_rule(rule: str, dtstart: datetime):
+    # Fast-forwarded starts repeat for queries in the same period, so parsed rules are reused
+    return rrulestr(rule, dtstart=dtstart)
+
+
+def _ruleset(event: Dict, dtstart: datetime, tz: ZoneInfo, not_before: Optional[datetime] = None) -> rruleset:
+    rules = rruleset()
+    has_rule = False
+    for line in event.get('recurrence') or []:
+        kind = line.split(':', 1)[0].split(';', 1)[0].upper()
+        if kind in ('RRULE', 'EXRULE'):
+            rule = _naive_rule(line.split(':', 1)[1], tz)
+            parsed = _compile_rule(rule, _fast_forward(rule, dtstart, not_before) if kind == 'RRULE' else dtstart)
+            if kind == 'RRULE':
+                rules.rrule(parsed)
+                has_rule = True
+            else:
+                rules.exrule(parsed)
+        elif kind == 'RDATE':
+            for dt in _parse_dates(line, tz):
+                rules.rdate(dt)
+        elif kind == 'EXDATE':
+            for dt in _parse_dates(line, tz):
+                rules.exdate(dt)
+    if not has_rule:
+        # RDATE-only series still start at DTSTART
+        rules.rdate(dtstart)
+    return rules
+
+
+def _to_ts(naive: datetime, tz: ZoneInfo) -> float:
+    return naive.replace(tzinfo=tz).timestamp()
+
+
+def _instance(event: Dict, start: datetime, end: datetime, all_day: bool, tz: ZoneInfo, original_ts: float) -> Dict:
+    """One occurrence shaped like an API instance (singleEvents=True)"""
+    instance = {k: v for k, v in event.items() if k != 'recurrence'}
+    utc_start = datetime.fromtimestamp(original_ts, ZoneInfo('UTC'))
+    if all_day:
+        instance['id'] = f"{event['id']}_{start.strftime('%Y%m%d')}"
+        instance['start'] = {'date': start.date().isoformat()}
+        instance['end'] = {'date': end.date().isoformat()}
+        instance['originalStartTime'] = {'date': start.date().isoformat()}
+    else:
+        instance['id'] = f"{event['id']}_{utc_start.strftime('%Y%m%dT%H%M%SZ')}"
+        instance['start'] = {'dateTime': start.replace(tzinfo=tz).isoformat(), 'timeZone': tz.key}
+        instance['end'] = {'dateTime': end.replace(tzinfo=tz).isoformat(), 'timeZone': tz.key}
+        instance['originalStartTime'] = {'dateTime': utc_start.isoformat().replace('+00:00', 'Z')}
+    instance['recurringEventId'] = event['id']
+    return instance
+
+
+def iter_occurrences(
+    event: Dict,
+    time_min: float,
+    time_max: float = UNBOUNDED,
+    default_tz: str = DEFAULT_TIMEZONE,
+    exclude: Container[float] = ()
+) -> Iterator[Dict]:
+    """
+    Lazily yield the occurrences of a series overlapping [time_min, time_max), by start.
+
+    exclude holds original start timestamps replaced by exception events
+    (moved or cancelled instances), which are skipped here.
+    """
+    start, all_day, tz = field_datetime(event.get('start') or {}, default_tz)
+    end, _, _ = field_datetime(event.get('end') or {}, default_tz)
+    if start is None:
+        return
+    duration = (end - start) if end is not None and end > start else timedelta(0)
+    # Occurrences starting up to one duration before the window still overlap it
+    window_start = datetime.fromtimestamp(time_min, tz).replace(tzinfo=None) - duration
+    rules = _ruleset(event, start, tz, window_start)
+    for occurrence in rules.xafter(window_start, inc=True):
+        occurrence_ts = _to_ts(occurrence, tz)
+        if occurrence_ts >= time_max:
+            return
+        occurrence_end = occurrence + duration
+        if _to_ts(occurrence_end, tz) <= time_min or occurrence_ts in exclude:
+            continue
+        yield _instance(event, occurrence, occurrence_end, all_day, tz, occurrence_ts)
+
+
+def series_bounds(event: Dict, default_tz: str = DEFAULT_TIMEZONE) -> Tuple[Optional[float], Optional[float]]:
+    """(first start, last end) of a series as UTC timestamps; the end is inf for open-ended rules"""
+    start, _, tz = field_datetime(event.get('start') or {}, default_tz)
+    end, _, _ = field_datetime(event.get('end') or {}, default_tz)
+    if start is None:
+        return None, None
+    duration = (end - start) if end is not None and end > start else timedelta(0)
+    rules = [line.upper() for line in event.get('recurrence') or [] if line.upper().startswith('RRULE:')]
+    if any('UNTIL=' not in rule and 'COUNT=' not in rule for rule in rules):
+        return _to_ts(start, tz), UNBOUNDED
+    # Bounded series: walk it once (on write, not per query) to find the last occurrence
+    last = None
+    for last in _ruleset(event, start, tz):
+        pass
+    last = last or start
+    return _to_ts(start, tz), _to_ts(last + duration, tz)
+
+
+def original_start_ts(event: Dict, default_tz: str = DEFAULT_TIMEZONE) -> Optional[float]:
+    """Original start of an exception instance (moved or cancelled occurrence)"""
+    field = event.get('originalStartTime')
+    if not field:
+        return None
+    start, _, tz = field_datetime(field, default_tz)
+    return _to_ts(start, tz) if start is not None else None
+
+
+def _start_ts(event: Dict, default_tz: str) -> float:
+    start, _, tz = field_datetime(event.get('start') or {}, default_tz)
+    return _to_ts(start, tz) if start is not None else 0.0
+
+
+def _end_ts(event: Dict, default_tz: str) -> float:
+    end, _, tz = field_datetime(event.get('end') or {}, default_tz)
+    return _to_ts(end, tz) if end is not None else _start_ts(event, default_tz)
+
+
+def expand_events(
+    events: Iterable[Dict],
+    time_min: float,
+    time_max: float = UNBOUNDED,
+    default_tz: str = DEFAULT_TIMEZONE
+) -> Iterator[Dict]:
+    """
+    Single events, series masters and their exceptions -> instances
+    overlapping [time_min, time_max), lazily merged in start order.
+
+    Only the single events are held in memory; each series is a generator,
+    so taking the first n results expands no more than needed.
+    """
+    singles = {}
+    masters = {}
+    overrides: Dict[str, set] = {}
+    for event in events:
+        master_id = event.get('recurringEventId')
+        if master_id:
+            original = original_start_ts(event, default_tz)
+            if original is not None:
+                overrides.setdefault(master_id, set()).add(original)
+        if event.get('status') == 'cancelled':
+            continue
+        if is_recurring(event):
+            masters[event['id']] = event
+        else:
+            singles[event['id']] = event
+
+    single_starts = []
+    for event in singles.values():
+        start = _start_ts(event, default_tz)
+        if start < time_max and _end_ts(event, default_tz) > time_min:
+            single_starts.append((start, event))
+    single_starts.sort(key=lambda item: item[0])
+    streams = [iter(single_starts)]
+    for master_id, master in masters.items():
+        occurrences = iter_occurrences(master, time_min, time_max, default_tz, overrides.get(master_id, ()))
+        streams.append((_start_ts(instance, default_tz), instance) for instance in occurrences)
+    for _, event in heapq.merge(*streams, key=lambda item: item[0]):
+        yield event
+
+
+def recurrence_summary(recurrence: Optional[List[str]]) -> str:
+    """Short spoken description of the first RRULE ("weekly on MO,WE")"""
+    for line in recurrence or []:
+        if not line.upper().startswith('RRULE:'):
+            continue
+        parts = dict(part.split('=', 1) for part in line.split(':', 1)[1].split(';') if '=' in part)
+        freq = parts.get('FREQ', '').upper()
+        interval = int(parts.get('INTERVAL', 1))
+        if interval == 1 or freq not in _PERIOD_NAMES:
+            text = freq.lower()
+        else:
+            text = f"every {interval} {_PERIOD_NAMES[freq]}s"
+        if parts.get('BYDAY'):
+            text += f" on {parts['BYDAY']}"
+        if parts.get('COUNT'):
+            text += f", {parts['COUNT']} times"
+        elif parts.get('UNTIL'):
+            text += f" until {parts['UNTIL'][:4]}-{parts['UNTIL'][4:6]}-{parts['UNTIL'][6:8]}"
+        return text
+    return ""
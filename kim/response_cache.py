@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import date
+from typing import Dict, Optional
+from .fast_path import DATE_RE, FastPathParser
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), 'memory', 'llm_cache.db')
+
+_FILLER_RE = re.compile(r"\b(?:please|kim|can you|could you|would you)\b")
+# Relative dates DATE_RE does not resolve: their meaning moves with the calendar day
+_RELATIVE_RE = re.compile(
+    r"\b(?:in\s+(?:a|an|one|two|three|four|five|six|seven|\d+)\s+(?:days?|weeks?|months?|years?)"
+    r"|(?:next|this|last|coming|following)\s+(?:week|weekend|month|year|days?)"
+    r"|weekend|yesterday|ago|upcoming|later|soon|now|tonight|today|tomorrow)\b"
+)
+
+
+class ResponseCache:
+    """Persistent LRU/TTL cache of LLM replies keyed on the normalized turn"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        timezone: str = "Europe/Berlin"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dates = FastPathParser(timezone)
+        self._lock = threading.Lock()
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+            )
+
+    def normalize(self, user_input: str, today: date) -> str:
+        """
+        Lowercase, drop filler and rewrite relative dates as ISO dates.
+
+        Relative phrases without a fixed date ("next week", "in 3 days")
+        pin the text to today, so their cached replies expire with the day.
+        """
+        text = user_input.lower()
+        text = re.sub(r"[^\w\s:'-]", " ", text)
+        text = _FILLER_RE.sub(" ", text)
+
+        def resolve(match):
+            resolved = self._dates.resolve_date(match.group(1), today)
+            return resolved.isoformat() if resolved else match.group(0)
+
+        text = DATE_RE.sub(resolve, text)
+        text = re.sub(r"(\d)\s+([ap]m)\b", r"\1\2", text)
+        text = " ".join(text.split())
+        if _RELATIVE_RE.search(text):
+            # Still relative to today: the reply is only valid on the day it was given
+            text += f" @{today.isoformat()}"
+        return text
+
+    def make_key(
+        self,
+        user_input: str,
+        context: Dict,
+        prompt_version: str,
+        today: date,
+        prompt_context: str = ""
+    ) -> str:
+        """prompt_context: digest of the stable per-user prompt context (profile facts)"""
+        payload = json.dumps(
+            {
+                "utterance": self.normalize(user_input, today),
+                "context": context,
+                "prompt": prompt_version,
+                "prompt_context": prompt_context
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        expired = self._conn.execute(
+            "DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = max(0, count - self.max_entries)
+        if overflow:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+        self.evictions += expired + overflow
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
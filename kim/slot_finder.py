@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import numpy as np
+from .busy_index import WEEKDAY_NAMES, parse_hhmm, parse_time_range
+
+MINUTES_PER_DAY = 24 * 60
+SHORT_BREAK_MINUTES = 15
+
+
+class SlotFinder:
+    """
+    Free-slot search over a minute-resolution availability grid.
+
+    The date range becomes a (days x 1440) boolean array in local wall
+    time. Busy events (padded by the profile's buffer_time), time outside
+    work hours and work days, the lunch break and short breaks are masked
+    out with array operations; a cumulative sum then finds every start
+    with ``duration`` free minutes in one pass, and candidates are ranked
+    by the profile's preferred meeting windows.
+    """
+
+    def __init__(self, profile: Optional[Dict] = None, timezone: str = "Europe/Berlin", step: int = 15):
+        self.profile = profile or {}
+        self.tz = ZoneInfo(timezone)
+        self.step = step
+
+    def availability(
+        self,
+        busy: Iterable[Tuple[float, float]],
+        first_day: date,
+        last_day: date,
+        not_before: Optional[datetime] = None
+    ) -> np.ndarray:
+        """Boolean grid of free minutes, shape (days, 1440)"""
+        days = (last_day - first_day).days + 1
+        free = np.ones((days, MINUTES_PER_DAY), dtype=bool)
+
+        schedule = self.profile.get("schedule", {})
+        work_hours = schedule.get("work_hours", {})
+        work_days = work_hours.get("days")
+        if work_days:
+            weekdays = (np.arange(days) + first_day.weekday()) % 7
+            allowed = np.isin(weekdays, [WEEKDAY_NAMES.index(d) for d in work_days if d in WEEKDAY_NAMES])
+            free[~allowed] = False
+        work_start, work_end = parse_hhmm(work_hours.get("start", "")), parse_hhmm(work_hours.get("end", ""))
+        if work_start is not None and work_end is not None and work_start < work_end:
+            free[:, :work_start] = False
+            free[:, work_end:] = False
+
+        breaks = schedule.get("break_preferences", {})
+        lunch = parse_time_range(breaks.get("lunch_time", ""))
+        if lunch:
+            free[:, lunch[0]:lunch[1]] = False
+        for short_break in breaks.get("short_breaks", []) or []:
+            start = parse_hhmm(short_break)
+            if start is not None:
+                free[:, start:start + SHORT_BREAK_MINUTES] = False
+
+        flat = free.reshape(-1)
+        buffer = int(self.profile.get("preferences", {}).get("buffer_time") or 0)
+        starts, ends = self._busy_offsets(busy, first_day, days, buffer)
+        if len(starts):
+            # Difference array: +1 where a busy block starts, -1 where it ends
+            delta = np.zeros(flat.size + 1, dtype=np.int32)
+            np.add.at(delta, starts, 1)
+            np.add.at(delta, ends, -1)
+            flat &= np.cumsum(delta[:-1]) == 0
+
+        if not_before is not None:
+            cutoff = self._offset(not_before, first_day)
+            flat[:max(0, min(flat.size, cutoff))] = False
+        return free
+
+    def _offset(self, moment: datetime, first_day: date) -> int:
+        local = moment.astimezone(self.tz)
+        return (local.date() - first_day).days * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+    def _busy_offsets(
+        self,
+        busy: Iterable[Tuple[float, float]],
+        first_day: date,
+        days: int,
+        buffer: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        limit = days * MINUTES_PER_DAY
+        starts, ends = [], []
+        for start_ts, end_ts in busy:
+            s = self._offset(datetime.fromtimestamp(start_ts, self.tz), first_day) - buffer
+            e = self._offset(datetime.fromtimestamp(end_ts, self.tz), first_day) + buffer
+            if e <= 0 or s >= limit:
+                continue
+            starts.append(max(s, 0))
+            ends.append(min(e, limit))
+        return np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+
+    def feasible_starts(self, free: np.ndarray, duration: int) -> np.ndarray:
+        """Flat minute offsets where `duration` consecutive free minutes begin, on the step grid"""
+        flat = free.reshape(-1)
+        if duration <= 0 or duration > flat.size:
+            return np.empty(0, dtype=np.int64)
+        run = np.concatenate(([0], np.cumsum(flat, dtype=np.int32)))
+        window = run[duration:] - run[:-duration]
+        candidates = np.flatnonzero(window == duration)
+        return candidates[candidates % self.step == 0]
+
+    def _preference_scores(self, starts: np.ndarray, duration: int) -> np.ndarray:
+        scores = np.zeros(starts.size, dtype=np.float64)
+        minute_of_day = starts % MINUTES_PER_DAY
+        windows = self.profile.get("preferences", {}).get("preferred_meeting_times", []) or []
+        for window in windows:
+            bounds = parse_time_range(window)
+            if not bounds:
+                continue
+            inside = (minute_of_day >= bounds[0]) & (minute_of_day + duration <= bounds[1])
+            touches = (minute_of_day < bounds[1]) & (minute_of_day + duration > bounds[0])
+            scores += np.where(inside, 2.0, np.where(touches, 1.0, 0.0))
+        # Earlier days win ties
+        scores -= (starts // MINUTES_PER_DAY) * 1e-3
+        return scores
+
+    def find_slots(
+        self,
+        busy: Iterable[Tuple[float, float]],
+        range_start: date,
+        range_end: date,
+        duration: int,
+        limit: int = 3,
+        now: Optional[datetime] = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """Best non-overlapping free slots of `duration` minutes between two dates (inclusive)"""
+        if now is None:
+            now = datetime.now(self.tz)
+        free = self.availability(busy, range_start, range_end, not_before=now)
+        starts = self.feasible_starts(free, duration)
+        if not starts.size:
+            return []
+        order = np.argsort(-self._preference_scores(starts, duration), kind="stable")
+
+        chosen: List[int] = []
+        for idx in order:
+            start = int(starts[idx])
+            if all(abs(start - other) >= duration for other in chosen):
+                chosen.append(start)
+                if len(chosen) == limit:
+                    break
+        chosen.sort()
+        day0 = datetime.combine(range_start, datetime.min.time(), self.tz)
+        return [
+            (
+                self._at(day0, offset),
+                self._at(day0, offset + duration)
+            )
+            for offset in chosen
+        ]
+
+    def _at(self, day0: datetime, offset: int) -> datetime:
+        days, minutes = divmod(offset, MINUTES_PER_DAY)
+        day = (day0 + timedelta(days=days)).date()
+        return datetime.combine(day, datetime.min.time(), self.tz) + timedelta(minutes=minutes)
@@ -0,0 +1,190 @@
+import threading
+import weakref
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from .tracing import span
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _speculation_executor() -> ThreadPoolExecutor:
+    """Small pool shared by every brain; speculation is best effort and never queues much"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kim-speculate")
+        return _executor
+
+
+def slot_key(data: Dict) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """(date, start, end) a prediction is made for, or None without a date"""
+    if not data or not data.get("date"):
+        return None
+    return data["date"], data.get("start"), data.get("end")
+
+
+def payload_key(data: Dict) -> Tuple:
+    """What a pre-built body depends on; the title is filled in when it is taken"""
+    return slot_key(data), str(data.get("recurrence") or "")
+
+
+class _Prediction:
+    def __init__(self, key: Tuple, data: Dict):
+        self.key = key
+        self.data = data
+        self.future: Optional[Future] = None
+
+
+class SpeculativePrefetcher:
+    """
+    Warms the calendar for the day the user is probably talking about.
+
+    As soon as a partial transcript or the fast-path parse names a date,
+    a background job syncs the event store, loads that day's busy
+    intervals and, once start and end are known, runs the schedule check
+    and builds the create_event payload. When the real turn gets to its
+    schedule check for the same slot, the result is already there. A new
+    guess cancels the previous one; a guess that turns out wrong or stale,
+    or is still running after ``wait_timeout`` seconds, is discarded and
+    the check runs as usual.
+
+    ``stats`` counts predictions made, checks answered from one (hits),
+    checks for the predicted day that still had to run but found the
+    index warm (warmed), predictions that were wrong or stale (misses),
+    guesses superseded before use (cancelled) and pre-built event bodies
+    sent as they were (payload_hits).
+    """
+
+    def __init__(self, brain, enabled: bool = True, wait_timeout: float = 0.5):
+        # The brain owns this prefetcher; a strong reference back would keep every session's brain alive until gc
+        self.brain = weakref.proxy(brain)
+        # Off, nothing is predicted and every check runs on demand
+        self.enabled = enabled
+        # A prefetch stuck on a slow sync must not hold up the turn longer than doing the check itself
+        self.wait_timeout = wait_timeout
+        self.stats = {"predicted": 0, "hits": 0, "warmed": 0, "misses": 0, "cancelled": 0, "payload_hits": 0}
+        self._lock = threading.Lock()
+        self._prediction: Optional[_Prediction] = None
+        self._payload: Optional[Tuple[Tuple, Dict]] = None
+        self._partial: Optional[str] = None
+        self._partial_job: Optional[Future] = None
+
+    # Triggers ----------------------------------------------------------
+
+    def on_partial(self, text: str):
+        """StreamingTranscriber callback; runs on the audio thread, so it only hands off"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._partial = text
+            if self._partial_job is None or self._partial_job.done():
+                # Partials arrive faster than they parse: the job picks up the latest one
+                self._partial_job = _speculation_executor().submit(self._parse_partial)
+
+    def _parse_partial(self):
+        with self._lock:
+            text, self._partial = self._partial, None
+        if not text:
+            return
+        try:
+            parsed, _ = self.brain.fast_path.parse(text, dict(self.brain.conversation_context))
+        except Exception:
+            # Half a sentence can trip the parser; the final transcript gets the real parse
+            return
+        if parsed is not None and parsed.get("intent") == "create":
+            self.speculate(parsed.get("data") or {})
+
+    def speculate(self, data: Dict):
+        """Start prefetching for data's date (and times, when present) unless already doing so"""
+        key = slot_key(data)
+        if key is None or not self.enabled:
+            return
+        with self._lock:
+            current = self._prediction
+            if current is not None and current.key == key:
+                return
+            if current is not None:
+                current.future.cancel()
+                self.stats["cancelled"] += 1
+            prediction = _Prediction(key, dict(data))
+            prediction.future = _speculation_executor().submit(self._prefetch, prediction)
+            self._prediction = prediction
+            self.stats["predicted"] += 1
+
+    def discard(self):
+        """Drop the current guess, e.g. when the conversation starts over"""
+        with self._lock:
+            if self._prediction is not None:
+                self._prediction.future.cancel()
+                self.stats["cancelled"] += 1
+            self._prediction = None
+            self._payload = None
+
+    # Background work ---------------------------------------------------
+
+    def _prefetch(self, prediction: _Prediction) -> Dict:
+        brain = self.brain
+        data = prediction.data
+        with span("speculation.prefetch", date=data["date"]):
+            brain._ensure_busy_index()
+            result = {"version": brain.busy_index.version, "problems": None, "body": None}
+            window = brain._proposed_window(data)
+            if window is None:
+                # Only the day is known so far: load its intervals (and expand its series)
+                day_start = brain._day_start(data["date"])
+                brain.busy_index.intervals_between(day_start.timestamp(), (day_start + timedelta(days=1)).timestamp())
+                return result
+            result["problems"] = brain._schedule_problems(*window)
+            try:
+                # The time is often heard before the title: take_payload fills it in
+                result["body"] = brain._event_payload({**data, "title": ""})
+            except ValueError:
+                pass
+            return result
+
+    # Consumers ---------------------------------------------------------
+
+    def take_check(self, data: Dict) -> Optional[List[str]]:
+        """The speculative schedule check for data, or None when there is no valid one"""
+        key = slot_key(data)
+        with self._lock:
+            prediction, self._prediction = self._prediction, None
+        if prediction is None:
+            return None
+        same_day = key is not None and prediction.key[0] == key[0]
+        try:
+            # A guess for the right day is worth waiting for even without times: the index is warm after it
+            result = prediction.future.result(timeout=self.wait_timeout) if same_day else None
+        except (CancelledError, Exception):
+            result = None
+        fresh = (
+            result is not None
+            and result["version"] == self.brain.busy_index.version
+            and not self.brain.event_store.is_stale()
+        )
+        with self._lock:
+            if not fresh or prediction.key != key or result["problems"] is None:
+                self.stats["warmed" if fresh else "misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            if result["body"] is not None:
+                self._payload = (payload_key(prediction.data), result["body"])
+        return result["problems"]
+
+    def take_payload(self, data: Dict) -> Optional[Dict]:
+        """The create_event body built ahead for exactly this event, if any"""
+        with self._lock:
+            payload, self._payload = self._payload, None
+            if payload is None or payload[0] != payload_key(data):
+                return None
+            self.stats["payload_hits"] += 1
+            return {**payload[1], "summary": data.get("title")}
+
+    def report(self) -> str:
+        stats = self.stats
+        decided = stats["hits"] + stats["warmed"] + stats["misses"]
+        rate = f"{stats['hits'] / decided:.0%}" if decided else "n/a"
+        return (f"{stats['predicted']} predictions, {stats['hits']} hits ({rate}), {stats['warmed']} warmed, "
+                f"{stats['misses']} misses, {stats['cancelled']} cancelled, {stats['payload_hits']} payloads reused")
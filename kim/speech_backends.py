@@ -0,0 +1,128 @@
+import os
+import json
+from abc import ABC, abstractmethod
+from typing import Optional
+import speech_recognition as sr
+
+
+class SpeechBackend(ABC):
+    """Speech-to-text engine used by the listeners in voice_input"""
+
+    name = "base"
+    # True when the engine can decode audio chunk by chunk while the user speaks
+    # (see StreamingSpeechBackend); checked before a StreamingTranscriber is built
+    streaming = False
+
+    @abstractmethod
+    def transcribe(self, audio: sr.AudioData) -> Optional[str]:
+        """Transcribe a complete utterance"""
+
+
+class StreamingSpeechBackend(SpeechBackend):
+    """Engine that can also decode incrementally, while the audio is captured"""
+
+    streaming = True
+
+    @abstractmethod
+    def open_stream(self, sample_rate: int) -> 'SpeechStream':
+        """Start an incremental decode session for 16-bit mono PCM"""
+
+
+class SpeechStream(ABC):
+    """One incremental decode session; fed raw PCM chunks as they are captured"""
+
+    @abstractmethod
+    def accept(self, chunk: bytes) -> Optional[str]:
+        """Feed audio; returns the final transcript when an utterance ends"""
+
+    @abstractmethod
+    def partial(self) -> str:
+        """Best guess for the utterance in progress"""
+
+    @abstractmethod
+    def finish(self) -> Optional[str]:
+        """Flush the decoder at the end of the audio"""
+
+
+class GoogleSpeechBackend(SpeechBackend):
+    """Google Web Speech API; needs the whole phrase and a network round-trip"""
+
+    name = "google"
+
+    def __init__(self, recognizer: Optional[sr.Recognizer] = None, language: str = 'en-US'):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, audio: sr.AudioData) -> Optional[str]:
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            print("Sorry, I couldn't understand your speech.")
+            return None
+        except sr.RequestError as e:
+            print(f"Speech recognition service error: {str(e)}")
+            return None
+
+
+class VoskSpeechBackend(StreamingSpeechBackend):
+    """Offline Kaldi decoder (vosk) that transcribes while the user is still speaking"""
+
+    name = "vosk"
+
+    def __init__(self, model_path: Optional[str] = None):
+        try:
+            import vosk
+        except ImportError as e:
+            raise ImportError("The vosk backend needs 'pip install vosk' and a downloaded model") from e
+        model_path = model_path or os.getenv("KIM_VOSK_MODEL")
+        if not model_path or not os.path.isdir(model_path):
+            raise ValueError("Set KIM_VOSK_MODEL to the directory of a vosk model")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def open_stream(self, sample_rate: int) -> SpeechStream:
+        return _VoskStream(self._vosk.KaldiRecognizer(self.model, sample_rate))
+
+    def transcribe(self, audio: sr.AudioData) -> Optional[str]:
+        stream = self.open_stream(audio.sample_rate)
+        pcm = audio.get_raw_data(convert_width=2)
+        parts = []
+        for i in range(0, len(pcm), 8000):
+            text = stream.accept(pcm[i:i + 8000])
+            if text:
+                parts.append(text)
+        tail = stream.finish()
+        if tail:
+            parts.append(tail)
+        return " ".join(parts) or None
+
+
+class _VoskStream(SpeechStream):
+    def __init__(self, recognizer):
+        self._recognizer = recognizer
+
+    def accept(self, chunk: bytes) -> Optional[str]:
+        if self._recognizer.AcceptWaveform(chunk):
+            return json.loads(self._recognizer.Result()).get("text") or None
+        return None
+
+    def partial(self) -> str:
+        return json.loads(self._recognizer.PartialResult()).get("partial", "")
+
+    def finish(self) -> Optional[str]:
+        return json.loads(self._recognizer.FinalResult()).get("text") or None
+
+
+BACKENDS = {
+    "google": GoogleSpeechBackend,
+    "vosk": VoskSpeechBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, **kwargs) -> SpeechBackend:
+    """Build the backend named by name or KIM_ASR_BACKEND (default: google)"""
+    name = (name or os.getenv("KIM_ASR_BACKEND", "google")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend '{name}', choose one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,114 @@
+import json
+from typing import Dict, Optional
+
+
+class StreamingJSONParser:
+    """Incremental parser for a streamed JSON object that surfaces one string field early.
+
+    Chunks are fed as they arrive from the model. The decoded text of the
+    watched top-level field (``message`` by default) is returned from
+    ``feed`` as soon as its characters stream in; the complete object is
+    parsed by ``finish`` once the stream ends.
+    """
+
+    def __init__(self, field: str = "message"):
+        self.field = field
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_chars = []
+        self._last_key: Optional[str] = None
+        self._expect_key = False
+        self._after_colon = False
+        self._emitting = False
+        self._pending_escape = ""
+        self.field_done = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk; return newly decoded characters of the watched field"""
+        self._buffer.append(chunk)
+        out = []
+        for ch in chunk:
+            if self._emitting:
+                self._feed_field_char(ch, out)
+            elif self._in_string:
+                self._feed_string_char(ch)
+            else:
+                self._feed_structural_char(ch)
+        return "".join(out)
+
+    def _feed_structural_char(self, ch: str):
+        if ch == '"':
+            if self._depth == 1 and self._after_colon and self._last_key == self.field and not self.field_done:
+                self._emitting = True
+                self._after_colon = False
+                return
+            self._in_string = True
+            self._string_chars = []
+        elif ch in "{[":
+            self._depth += 1
+            self._expect_key = ch == "{" and self._depth == 1
+            self._after_colon = False
+        elif ch in "}]":
+            self._depth -= 1
+        elif ch == ":" and self._depth == 1:
+            self._after_colon = True
+        elif ch == "," and self._depth == 1:
+            self._expect_key = True
+            self._after_colon = False
+        elif not ch.isspace():
+            self._after_colon = False
+
+    def _feed_string_char(self, ch: str):
+        if self._escape:
+            self._escape = False
+            self._string_chars.append(ch)
+        elif ch == "\\":
+            self._escape = True
+            self._string_chars.append(ch)
+        elif ch == '"':
+            self._in_string = False
+            if self._depth == 1 and self._expect_key:
+                self._last_key = json.loads('"' + "".join(self._string_chars) + '"')
+                self._expect_key = False
+            else:
+                self._after_colon = False
+        else:
+            self._string_chars.append(ch)
+
+    def _feed_field_char(self, ch: str, out: list):
+        if self._pending_escape:
+            self._pending_escape += ch
+            decoded = self._decode_escape(self._pending_escape)
+            if decoded is not None:
+                out.append(decoded)
+                self._pending_escape = ""
+        elif ch == "\\":
+            self._pending_escape = ch
+        elif ch == '"':
+            self._emitting = False
+            self.field_done = True
+        else:
+            out.append(ch)
+
+    def _decode_escape(self, seq: str) -> Optional[str]:
+        if seq[1] != "u":
+            return json.loads('"' + seq + '"')
+        if len(seq) < 6:
+            return None
+        code = int(seq[2:6], 16)
+        if 0xD800 <= code < 0xDC00:
+            # High surrogate: wait for the low half before decoding
+            if len(seq) < 12:
+                return None
+            return json.loads('"' + seq[:12] + '"')
+        return json.loads('"' + seq[:6] + '"')
+
+    def finish(self) -> Dict:
+        """Parse the complete object once the stream has ended"""
+        return json.loads("".join(self._buffer))
+
+
+class TurnCancelled(Exception):
+    """Raised from a streaming callback to abandon the reply in flight (barge-in)"""
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import uuid
+import functools
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageMetrics:
+    """Thread-safe latency samples per pipeline stage"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            samples = self._samples.setdefault(stage, [])
+            samples.append(seconds)
+            if len(samples) > self.max_samples:
+                del samples[0]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        result = {}
+        for stage, samples in snapshot.items():
+            if not samples:
+                continue
+            result[stage] = {
+                "count": len(samples),
+                "p50_ms": samples[len(samples) // 2] * 1000,
+                "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+                "max_ms": samples[-1] * 1000
+            }
+        return result
+
+    def histogram(self, stage: str) -> Dict[str, int]:
+        """Sample counts per latency bucket ("<=10ms" ... ">10000ms")"""
+        with self._lock:
+            samples = list(self._samples.get(stage, []))
+        counts = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+        counts[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for seconds in samples:
+            ms = seconds * 1000
+            for bound in HISTOGRAM_BUCKETS_MS:
+                if ms <= bound:
+                    counts[f"<={bound}ms"] += 1
+                    break
+            else:
+                counts[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+        return counts
+
+    def report(self) -> str:
+        width = max((len(stage) for stage in self._samples), default=12)
+        lines = []
+        for stage, stats in self.summary().items():
+            lines.append(
+                f"{stage:<{width}} n={stats['count']:<4} p50 {stats['p50_ms']:.0f} ms  "
+                f"p95 {stats['p95_ms']:.0f} ms  max {stats['max_ms']:.0f} ms"
+            )
+        return "\n".join(lines)
+
+
+class Span:
+    """One timed operation; nested spans share the root's trace id"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent", "root", "start", "end",
+                 "_start_perf", "attributes", "breakdown")
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict):
+        self.name = name
+        self.parent = parent
+        self.root = parent.root if parent is not None else self
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = attributes
+        # Time spent in each descendant stage; only filled on root spans
+        self.breakdown: Dict[str, float] = {}
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.end: Optional[float] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self._start_perf
+
+    def to_dict(self) -> Dict:
+        record = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes
+        }
+        if self.parent is None and self.breakdown:
+            record["breakdown_ms"] = {k: round(v * 1000, 3) for k, v in self.breakdown.items()}
+        return record
+
+
+class JSONLExporter:
+    """Appends finished spans to a JSON Lines file, one span per line"""
+
+    def __init__(self, path: str, flush_every: int = 32):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, 'a', encoding='utf-8')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, default=str, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._pending += 1
+            # Root spans close a turn; make them visible right away
+            if self._pending >= self.flush_every or record.get("parent_id") is None:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            self._file.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("kim_current_span", default=None)
+
+
+class Tracer:
+    """
+    Lightweight spans for turn latency breakdowns.
+
+    Every span's duration feeds per-stage metrics (percentiles and
+    histograms). Root spans (one per turn) also collect how long each
+    stage below them took. Finished spans go to the configured exporters,
+    and with ``otel=True`` every span is mirrored into the OpenTelemetry
+    API so an installed SDK/OTLP exporter receives the same tree.
+    """
+
+    def __init__(self, keep_turns: int = 100):
+        self.metrics = StageMetrics()
+        self.exporters: List = []
+        self.recent_turns = deque(maxlen=keep_turns)
+        self._otel = None
+
+    def configure(self, jsonl_path: Optional[str] = None, otel: bool = False):
+        if jsonl_path:
+            self.exporters.append(JSONLExporter(jsonl_path))
+        if otel:
+            try:
+                from opentelemetry import trace
+                self._otel = trace.get_tracer("kim")
+            except ImportError:
+                print("⚠️ opentelemetry-api is not installed; spans stay local")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        token = _current_span.set(span)
+        with ExitStack() as stack:
+            if self._otel is not None:
+                stack.enter_context(self._otel.start_as_current_span(name, attributes=attributes))
+            try:
+                yield span
+            except BaseException as e:
+                span.set_attribute("error", type(e).__name__)
+                raise
+            finally:
+                span.end = time.perf_counter()
+                _current_span.reset(token)
+                self._finish(span)
+
+    def _finish(self, span: Span):
+        self.metrics.record(span.name, span.duration)
+        if span.parent is not None:
+            root = span.root
+            root.breakdown[span.name] = root.breakdown.get(span.name, 0.0) + span.duration
+        else:
+            self.recent_turns.append(span.to_dict())
+        for exporter in self.exporters:
+            try:
+                exporter.export(span.to_dict())
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Trace export error: {str(e)}")
+
+    def traced(self, name: str):
+        """Decorator: run the function inside a span"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def last_breakdown(self, name: str = "process_input") -> str:
+        """One-line stage breakdown of the most recent root span called name"""
+        turn = next((t for t in reversed(self.recent_turns) if t["name"] == name), None)
+        if turn is None:
+            return ""
+        parts = [f"{stage} {ms:.0f} ms" for stage, ms in
+                 sorted(turn.get("breakdown_ms", {}).items(), key=lambda item: -item[1])]
+        return f"{turn['name']} {turn['duration_ms']:.0f} ms: " + (", ".join(parts) or "no sub-stages")
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
@@ -1,46 +1,267 @@
+import os
+import queue
+import threading
 import speech_recognition as sr
-import time
+from typing import Callable, Optional
+from .speech_backends import SpeechBackend, StreamingSpeechBackend, GoogleSpeechBackend, create_backend
+from .tracing import span
 
-def recognize_speech_from_microphone():
+# Energy threshold from the last calibration, reused so later listeners skip it
+_calibrated_energy_threshold: Optional[float] = None
+
+
+class MicrophoneListener:
+    """
+    Keeps one audio source open and captures utterances on a background thread.
+
+    The ambient noise calibration runs once (or is taken from the cache of a
+    previous listener); after that the recognizer's dynamic energy threshold
+    tracks a rolling estimate of the background noise between phrases.
+    Captured utterances are handed back through a bounded queue.
+    Any speech_recognition AudioSource works, e.g. ``lambda: sr.AudioFile(path)``.
+    """
+
+    def __init__(
+        self,
+        source_factory: Callable[[], sr.AudioSource] = sr.Microphone,
+        recognizer: Optional[sr.Recognizer] = None,
+        calibration_duration: float = 1.0,
+        phrase_time_limit: float = 10,
+        max_queued: int = 4,
+        backend: Optional[SpeechBackend] = None
+    ):
+        self.source_factory = source_factory
+        self.recognizer = recognizer or self._default_recognizer()
+        self.backend = backend or GoogleSpeechBackend(self.recognizer)
+        self.calibration_duration = calibration_duration
+        self.phrase_time_limit = phrase_time_limit
+        self.utterances: "queue.Queue[sr.AudioData]" = queue.Queue(maxsize=max_queued)
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _default_recognizer(self) -> sr.Recognizer:
+        recognizer = sr.Recognizer()
+        # Adjusted listening parameters
+        recognizer.pause_threshold = 1.5    # Longer pause before considering speech ended
+        recognizer.energy_threshold = 4000  # Sensitivity adjustment
+        recognizer.dynamic_energy_threshold = True  # Auto-adjust for noisy environments
+        return recognizer
+
+    def start(self) -> 'MicrophoneListener':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.finished.clear()
+            self._thread = threading.Thread(target=self._run, name="kim-listener", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        global _calibrated_energy_threshold
+        try:
+            with self.source_factory() as source:
+                if _calibrated_energy_threshold is None or not self._is_live(source):
+                    with span("asr.calibrate", duration=self.calibration_duration):
+                        self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_duration)
+                    if self._is_live(source):
+                        _calibrated_energy_threshold = self.recognizer.energy_threshold
+                else:
+                    self.recognizer.energy_threshold = _calibrated_energy_threshold
+
+                while not self._stop.is_set():
+                    try:
+                        # Short timeout so stop() is noticed; silence keeps updating the threshold
+                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=self.phrase_time_limit)
+                    except sr.WaitTimeoutError:
+                        if self._exhausted(source):
+                            break
+                        continue
+                    if self._exhausted(source):
+                        # At end of a file source listen() returns the leftover buffer; keep it only if it holds a phrase
+                        if self._duration(audio) > self.recognizer.non_speaking_duration + self.recognizer.phrase_threshold:
+                            self._enqueue(audio)
+                        break
+                    if audio.frame_data:
+                        self._enqueue(audio)
+                if self._is_live(source):
+                    _calibrated_energy_threshold = self.recognizer.energy_threshold
+        except Exception as e:
+            print(f"⚠️ Audio capture error: {str(e)}")
+        finally:
+            self.finished.set()
+
+    def _enqueue(self, audio: sr.AudioData):
+        try:
+            self.utterances.put_nowait(audio)
+        except queue.Full:
+            # Nobody is consuming; keep the newest speech
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(audio)
+
+    def _duration(self, audio: sr.AudioData) -> float:
+        return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+    def _is_live(self, source) -> bool:
+        return not isinstance(source, sr.AudioFile)
+
+    def _exhausted(self, source) -> bool:
+        reader = getattr(source, 'audio_reader', None)
+        if reader is None:
+            return False
+        try:
+            return reader.tell() >= reader.getnframes()
+        except (AttributeError, OSError):
+            return False
+
+    def get_utterance(self, timeout: Optional[float] = None) -> Optional[sr.AudioData]:
+        """Next captured utterance, or None on timeout / when the source has ended"""
+        while True:
+            try:
+                return self.utterances.get(timeout=0.1 if timeout is None else timeout)
+            except queue.Empty:
+                if timeout is not None or self.finished.is_set():
+                    return None
+
+    def recognize(self, audio: sr.AudioData) -> Optional[str]:
+        """Transcribe one utterance with the configured backend"""
+        with span("asr.recognize", backend=self.backend.name):
+            return self.backend.transcribe(audio)
+
+
+class StreamingTranscriber:
+    """
+    Listener for streaming backends: decodes audio chunks while the user speaks.
+
+    Partial transcripts go to ``on_partial`` as they change; final
+    transcripts are queued as text, so ``recognize`` is a pass-through and
+    the listener can stand in for MicrophoneListener in the pipeline.
+    """
+
+    def __init__(
+        self,
+        backend: StreamingSpeechBackend,
+        source_factory: Callable[[], sr.AudioSource] = sr.Microphone,
+        on_partial: Optional[Callable[[str], None]] = None,
+        chunk_size: int = 4000,
+        max_queued: int = 4
+    ):
+        if not backend.streaming:
+            raise ValueError(f"{backend.name} backend cannot decode incrementally")
+        self.backend = backend
+        self.source_factory = source_factory
+        self.on_partial = on_partial
+        self.chunk_size = chunk_size
+        self.utterances: "queue.Queue[str]" = queue.Queue(maxsize=max_queued)
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'StreamingTranscriber':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.finished.clear()
+            self._thread = threading.Thread(target=self._run, name="kim-stream-asr", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            with self.source_factory() as source:
+                stream = self.backend.open_stream(source.SAMPLE_RATE)
+                last_partial = ""
+                while not self._stop.is_set():
+                    chunk = source.stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if source.SAMPLE_WIDTH != 2:
+                        chunk = sr.AudioData(chunk, source.SAMPLE_RATE, source.SAMPLE_WIDTH).get_raw_data(convert_width=2)
+                    text = stream.accept(chunk)
+                    if text:
+                        last_partial = ""
+                        self._enqueue(text)
+                    elif self.on_partial is not None:
+                        partial = stream.partial()
+                        if partial and partial != last_partial:
+                            last_partial = partial
+                            self.on_partial(partial)
+                tail = stream.finish()
+                if tail:
+                    self._enqueue(tail)
+        except Exception as e:
+            print(f"⚠️ Audio capture error: {str(e)}")
+        finally:
+            self.finished.set()
+
+    def _enqueue(self, text: str):
+        try:
+            self.utterances.put_nowait(text)
+        except queue.Full:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(text)
+
+    def get_utterance(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next final transcript, or None on timeout / when the source has ended"""
+        while True:
+            try:
+                return self.utterances.get(timeout=0.1 if timeout is None else timeout)
+            except queue.Empty:
+                if timeout is not None or self.finished.is_set():
+                    return None
+
+    def recognize(self, text: str) -> str:
+        return text
+
+
+_default_listener = None
+
+
+def get_default_listener():
+    """Process-wide microphone listener for KIM_ASR_BACKEND, started on first use"""
+    global _default_listener
+    if _default_listener is None:
+        backend_name = os.getenv("KIM_ASR_BACKEND", "google")
+        if backend_name == "google":
+            _default_listener = MicrophoneListener()
+        else:
+            backend = create_backend(backend_name)
+            if backend.streaming:
+                _default_listener = StreamingTranscriber(backend)
+            else:
+                _default_listener = MicrophoneListener(backend=backend)
+    return _default_listener.start()
+
+
+def recognize_speech_from_microphone(timeout: float = 15):
     """
     Captures audio from the microphone and converts it into text.
     Returns the recognized text or None if no speech is recognized.
     """
-    recognizer = sr.Recognizer()
-    
-    # Adjusted listening parameters
-    recognizer.pause_threshold = 1.5    # Longer pause before considering speech ended
-    recognizer.energy_threshold = 4000  # Sensitivity adjustment
-    recognizer.dynamic_energy_threshold = True  # Auto-adjust for noisy environments
-
-    with sr.Microphone() as source:
-        print("Listening... Please speak now.")
-        
-        # Adjust for ambient noise with longer duration
-        recognizer.adjust_for_ambient_noise(source, duration=1.5)
-        
-        try:
-            # Timeout settings:
-            # - 5 seconds to start speaking
-            # - 10 seconds maximum phrase length
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-            
-            # Small processing delay
-            time.sleep(0.3)
-            
-            print("Processing your speech...")
-            
-            # Using Google Web Speech API with explicit English language
-            text = recognizer.recognize_google(audio, language='en-US')
-            print(f"You said: {text}")
-            return text
-            
-        except sr.WaitTimeoutError:
-            print("I didn't hear anything. Please try again.")
-            return None
-        except sr.UnknownValueError:
-            print("Sorry, I couldn't understand your speech.")
-            return None
-        except sr.RequestError as e:
-            print(f"Speech recognition service error: {str(e)}")
-            return None
\ No newline at end of file
+    listener = get_default_listener()
+    print("Listening... Please speak now.")
+
+    audio = listener.get_utterance(timeout=timeout)
+    if audio is None:
+        print("I didn't hear anything. Please try again.")
+        return None
+
+    print("Processing your speech...")
+    text = listener.recognize(audio)
+    if text:
+        print(f"You said: {text}")
+    return text
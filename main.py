@@ -1,19 +1,34 @@
+import os
 import time
+import asyncio
+import argparse
+import threading
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from kim.brain import CalendarBrain
 from kim.memory import MemoryManager
-from kim.voice_input import recognize_speech_from_microphone
+from kim.voice_input import StreamingTranscriber, get_default_listener
+from kim.pipeline import VoicePipeline
+from kim.profiling import PROFILE_MODES, SessionProfiler
+from kim.tracing import span, tracer
 from zoneinfo import ZoneInfo
 import speech_recognition as sr
 
+# Turns kept in memory; the full history lives in the on-disk conversation log
+HISTORY_LIMIT = 50
+
 class KimAssistant:
-    def __init__(self):
+    def __init__(self, memory: Optional[MemoryManager] = None, brain: Optional[CalendarBrain] = None):
         try:
-            self.memory = MemoryManager()
-            self.brain = CalendarBrain()
+            self.memory = memory or MemoryManager()
+            self.brain = brain or CalendarBrain()
             self.profile = self._safe_load_profile()
-            self.conversation_history = self._safe_load_conversation()
+            self.brain.profile = self.profile
+            self.conversation_history = deque(self._safe_load_conversation(), maxlen=HISTORY_LIMIT)
+            # The brain budgets prompt context from the same memory and history
+            self.brain.memory = self.memory
+            self.brain.history = self.conversation_history
             self.recognizer = sr.Recognizer()
             print("🔊 Kim initialized and ready!")
         except Exception as e:
@@ -30,13 +45,18 @@ class KimAssistant:
 
     def _safe_load_conversation(self) -> List[Dict]:
         try:
-            conv = self.memory.load_conversation()
+            conv = self.memory.load_conversation(limit=HISTORY_LIMIT)
             return conv if isinstance(conv, list) else []
         except Exception as e:
             print(f"Conversation load error: {str(e)}")
             return []
 
-    def process_input(self, user_input: str) -> str:
+    def process_input(self, user_input: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
+        # Root span of the turn: every traced stage below adds to its breakdown
+        with span("process_input"):
+            return self._process_input(user_input, on_partial)
+
+    def _process_input(self, user_input: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
         if not user_input:
             return "I didn't catch that. Could you repeat?"
         
@@ -52,62 +72,121 @@ class KimAssistant:
             self._update_conversation("assistant", response)
             return response
         
-        response_data = self.brain.process_conversation(user_input)
+        response_data = self.brain.process_conversation(user_input, on_message_delta=on_partial)
         response = response_data.get("message", "How can I help?")
         
         self._update_conversation("user", user_input)
         self._update_conversation("assistant", response)
         return response
 
+    async def process_input_async(self, user_input: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """process_input for the server's event loop"""
+        if not user_input:
+            return "I didn't catch that. Could you repeat?"
+
+        with span("process_input"):
+            if self.brain.awaiting_confirmation:
+                # The confirmation path is calendar I/O only; keep it off the loop
+                return await asyncio.to_thread(self._process_input, user_input, on_partial)
+
+            response_data = await self.brain.process_conversation_async(user_input, on_message_delta=on_partial)
+            response = response_data.get("message", "How can I help?")
+
+            self._update_conversation("user", user_input)
+            self._update_conversation("assistant", response)
+            return response
+
     def _update_conversation(self, role: str, content: str):
         try:
-            self.conversation_history.append({
+            entry = {
                 "role": role,
                 "content": content,
                 "timestamp": datetime.now(ZoneInfo("Europe/Berlin")).isoformat()
-            })
-            self.memory.save_conversation(self.conversation_history[-10:])
+            }
+            self.conversation_history.append(entry)
+            self.memory.append_conversation(entry)
         except Exception as e:
             print(f"Conversation update error: {str(e)}")
 
     def save_state(self):
         try:
             self.memory.save_profile(self.profile)
+            self.memory.close()
         except Exception as e:
             print(f"State save error: {str(e)}")
 
-def main():
+def show_partial(text: str, first: bool):
+    if first:
+        print("Kim: ", end="", flush=True)
+    print(text, end="", flush=True)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Kim, the voice calendar assistant")
+    parser.add_argument("--trace", metavar="PATH", default=os.getenv("KIM_TRACE"),
+                        help="append every span (turn breakdowns included) to this JSONL file")
+    parser.add_argument("--otel", action="store_true",
+                        help="mirror spans into OpenTelemetry (configure the SDK/exporter via OTEL_* settings)")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES,
+                        help="profile this session with cProfile (default) or pyinstrument")
+    parser.add_argument("--profile-output", metavar="PATH", help="where to write the profile")
+    parser.add_argument("--warm-calendar", action="store_true",
+                        help="log in to Google Calendar in the background at startup, not on the first calendar request")
+    return parser.parse_args(argv)
+
+def warm_up_in_background(assistant: KimAssistant, calendar: bool = False) -> threading.Thread:
+    """Load the clients and parsers the first turn needs while the microphone calibrates"""
+    def run():
+        try:
+            assistant.brain.warm_up(calendar=calendar)
+        except Exception as e:
+            # Whatever failed is retried, and reported, when a turn needs it
+            print(f"⚠️ Warm-up error: {str(e)}")
+
+    thread = threading.Thread(target=run, name="kim-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    tracer.configure(jsonl_path=args.trace, otel=args.otel)
+    profiler = SessionProfiler(args.profile, args.profile_output).start() if args.profile else None
+
+    # Microphone first: it calibrates while the assistant loads and the rest warms up
+    listener = get_default_listener()
     assistant = KimAssistant()
+    warm_up_in_background(assistant, calendar=args.warm_calendar)
+    # Capture, recognition and the assistant run concurrently; the microphone never goes deaf
+    pipeline = VoicePipeline(assistant, listener, on_partial=show_partial)
+    if isinstance(listener, StreamingTranscriber):
+        speculate = assistant.brain.speculation.on_partial
+
+        def on_speech(partial: str):
+            # Talking over a reply stops it right away
+            pipeline.on_speech(partial)
+            # Half-spoken requests already name the day: fetch its calendar before the sentence ends
+            speculate(partial)
+        listener.on_partial = on_speech
     
     try:
-        while True:
-            print("\nListening... (say 'exit' to quit)")
-            
-            try:
-                user_input = recognize_speech_from_microphone()
-                if not user_input:
-                    print("Kim: I didn't catch that. Could you repeat?")
-                    continue
-                    
-                if any(exit_cmd in user_input.lower() for exit_cmd in ["exit", "quit"]):
-                    print("Kim: Goodbye! Have a great day!")
-                    break
-                    
-                print(f"You: {user_input}")
-                response = assistant.process_input(user_input)
-                print(f"Kim: {response}")
-                
-            except sr.UnknownValueError:
-                print("Kim: I didn't understand that. Could you repeat?")
-            except sr.RequestError as e:
-                print(f"Kim: Speech recognition error: {str(e)}")
-            except Exception as e:
-                print(f"Kim: Error: {str(e)}")
-                
+        print("\nListening... (say 'exit' to quit)")
+        pipeline.run(think_in_caller=args.profile == "pyinstrument")
     except KeyboardInterrupt:
         print("\nShutting down...")
     finally:
         assistant.save_state()
+        report = pipeline.metrics.report()
+        if report:
+            print(f"\nStage latencies:\n{report}")
+        traced = tracer.metrics.report()
+        if traced:
+            print(f"\nTraced stages:\n{traced}")
+            print(f"Last turn: {tracer.last_breakdown()}")
+        if assistant.brain.speculation.stats["predicted"]:
+            print(f"Speculation: {assistant.brain.speculation.report()}")
+        tracer.close()
+        if profiler is not None:
+            summary = profiler.stop()
+            print(f"\nProfile written to {profiler.output}\n{summary}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,294 @@
+import os
+import re
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from aiohttp import web, WSMsgType
+from kim.async_llm import AsyncLLMGateway
+from kim.brain import CalendarBrain, _openai_client
+from kim.calendar_api import authenticate_google_calendar
+from kim.busy_index import BusyIndex
+from kim.event_store import EventStore
+from kim.memory import MemoryManager
+from kim.response_cache import ResponseCache
+from main import KimAssistant
+
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kim', 'memory', 'sessions')
+# Session ids double as directory names
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SharedBackends:
+    """
+    LLM client, calendar client and calendar caches shared by every session.
+
+    The sync OpenAI client and the calendar login are created on first use,
+    once for all sessions. LLM replies are cached per session (see
+    SessionManager), never across users.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        calendar_service=None,
+        event_store: Optional[EventStore] = None,
+        llm_gateway: Optional[AsyncLLMGateway] = None,
+        timezone: str = "Europe/Berlin"
+    ):
+        self._client = client
+        self._calendar_service = calendar_service
+        self._init_lock = threading.Lock()
+        self.timezone = timezone
+        self.llm_gateway = llm_gateway or AsyncLLMGateway()
+        self.event_store = event_store or EventStore()
+        self.busy_index = BusyIndex(timezone)
+
+    @property
+    def client(self):
+        with self._init_lock:
+            if self._client is None:
+                self._client = _openai_client()
+            return self._client
+
+    @property
+    def calendar_service(self):
+        with self._init_lock:
+            if self._calendar_service is None:
+                self._calendar_service = authenticate_google_calendar()
+            return self._calendar_service
+
+    def new_brain(self, response_cache: ResponseCache) -> CalendarBrain:
+        return CalendarBrain(
+            client_factory=lambda: self.client,
+            calendar_factory=lambda: self.calendar_service,
+            event_store=self.event_store,
+            busy_index=self.busy_index,
+            response_cache=response_cache,
+            llm_gateway=self.llm_gateway
+        )
+
+
+class Session:
+    def __init__(self, session_id: str, assistant: KimAssistant):
+        self.session_id = session_id
+        self.assistant = assistant
+        # Turns of one session run one at a time, in arrival order
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Turns queued or running, by normalized text: a double tap or retry joins the first
+        self.pending: Dict[str, asyncio.Future] = {}
+
+
+class SessionManager:
+    """
+    Per-session KimAssistant instances over shared backends.
+
+    Each session has its own conversation context, profile and memory
+    directory (sessions_dir/<session_id>). Turns run on the event loop with
+    the LLM call awaited through the shared gateway; calendar work, the
+    reply cache and the prompt's history search go to the worker pool.
+    Idle sessions are saved and dropped.
+    """
+
+    def __init__(
+        self,
+        backends: SharedBackends,
+        sessions_dir: str = SESSIONS_DIR,
+        max_workers: int = 32,
+        idle_timeout: float = 900.0,
+        memory_backend: Optional[str] = None
+    ):
+        self.backends = backends
+        self.sessions_dir = sessions_dir
+        self.idle_timeout = idle_timeout
+        self.memory_backend = memory_backend
+        # Calendar, SQLite and file work from every session shares this pool
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kim-io")
+        self.sessions: Dict[str, Session] = {}
+        self._creating: Dict[str, asyncio.Future] = {}
+
+    def _create(self, session_id: str) -> Session:
+        memory_dir = os.path.join(self.sessions_dir, session_id)
+        memory = MemoryManager(memory_dir=memory_dir, backend=self.memory_backend)
+        # Replies depend on the user's profile and history: each session caches its own
+        cache = ResponseCache(os.path.join(memory_dir, 'llm_cache.db'), timezone=self.backends.timezone)
+        return Session(session_id, KimAssistant(memory=memory, brain=self.backends.new_brain(cache)))
+
+    async def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        # Concurrent first requests for one id must not build two sessions
+        pending = self._creating.get(session_id)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self.executor, self._create, session_id)
+            self._creating[session_id] = pending
+            try:
+                self.sessions[session_id] = await pending
+            finally:
+                del self._creating[session_id]
+            return self.sessions[session_id]
+        return await pending
+
+    async def run_turn(self, session: Session, text: str, on_partial=None) -> str:
+        key = " ".join(text.lower().split())
+        pending = session.pending.get(key)
+        if pending is not None:
+            # Same words while the first is still queued or running: one turn, one LLM call
+            return await asyncio.shield(pending)
+        pending = asyncio.ensure_future(self._run_turn(session, text, on_partial))
+        session.pending[key] = pending
+        pending.add_done_callback(lambda _: session.pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _run_turn(self, session: Session, text: str, on_partial=None) -> str:
+        async with session.lock:
+            session.last_used = time.monotonic()
+            reply = await session.assistant.process_input_async(text, on_partial)
+            session.last_used = time.monotonic()
+            return reply
+
+    async def close(self, session_id: str):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        async with session.lock:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, session.assistant.save_state)
+            await loop.run_in_executor(self.executor, session.assistant.brain.response_cache.close)
+
+    async def reap_idle(self, interval: float = 60.0):
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            for session_id in [s.session_id for s in self.sessions.values() if s.last_used < cutoff]:
+                await self.close(session_id)
+
+    async def close_all(self):
+        for session_id in list(self.sessions):
+            await self.close(session_id)
+        self.executor.shutdown(wait=True)
+
+
+def _session_id(request: web.Request) -> str:
+    session_id = request.match_info["session_id"]
+    if not SESSION_ID_RE.match(session_id):
+        raise web.HTTPBadRequest(text="Invalid session id")
+    return session_id
+
+
+async def handle_turn(request: web.Request) -> web.Response:
+    """POST /sessions/{id}/turns {"text": ...} -> {"reply": ..., "latency_ms": ...}"""
+    manager: SessionManager = request.app["sessions"]
+    session_id = _session_id(request)
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Expected a JSON body")
+    text = payload.get("text", "") if isinstance(payload, dict) else ""
+    started = time.perf_counter()
+    session = await manager.get(session_id)
+    reply = await manager.run_turn(session, text)
+    return web.json_response({
+        "session_id": session_id,
+        "reply": reply,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+
+
+async def handle_websocket(request: web.Request) -> web.WebSocketResponse:
+    """
+    GET /sessions/{id}/ws: every text frame is one user turn.
+
+    Replies stream back as {"type": "delta", "text": ...} frames followed by
+    one {"type": "reply", "text": ..., "latency_ms": ...} frame.
+    """
+    manager: SessionManager = request.app["sessions"]
+    session_id = _session_id(request)
+    ws = web.WebSocketResponse(heartbeat=30.0)
+    await ws.prepare(request)
+    session = await manager.get(session_id)
+    loop = asyncio.get_running_loop()
+
+    async for msg in ws:
+        if msg.type != WSMsgType.TEXT:
+            if msg.type == WSMsgType.ERROR:
+                break
+            continue
+        deltas: asyncio.Queue = asyncio.Queue()
+
+        def on_partial(chunk: str):
+            # Called on the loop (LLM stream) or a worker thread (confirmation path)
+            loop.call_soon_threadsafe(deltas.put_nowait, chunk)
+
+        async def forward_deltas():
+            while True:
+                chunk = await deltas.get()
+                if chunk is None:
+                    return
+                await ws.send_json({"type": "delta", "text": chunk})
+
+        started = time.perf_counter()
+        forwarder = asyncio.create_task(forward_deltas())
+        try:
+            reply = await manager.run_turn(session, msg.data, on_partial)
+        finally:
+            loop.call_soon_threadsafe(deltas.put_nowait, None)
+            await forwarder
+        await ws.send_json({
+            "type": "reply",
+            "text": reply,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+    return ws
+
+
+async def handle_close_session(request: web.Request) -> web.Response:
+    await request.app["sessions"].close(_session_id(request))
+    return web.json_response({"closed": True})
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({"sessions": len(request.app["sessions"].sessions)})
+
+
+def create_app(manager: SessionManager) -> web.Application:
+    app = web.Application()
+    app["sessions"] = manager
+    app.router.add_post("/sessions/{session_id}/turns", handle_turn)
+    app.router.add_get("/sessions/{session_id}/ws", handle_websocket)
+    app.router.add_delete("/sessions/{session_id}", handle_close_session)
+    app.router.add_get("/health", handle_health)
+
+    async def start_reaper(app):
+        # asyncio.to_thread inside the brain runs on the bounded pool too
+        asyncio.get_running_loop().set_default_executor(manager.executor)
+        app["reaper"] = asyncio.create_task(manager.reap_idle())
+
+    async def shutdown(app):
+        app["reaper"].cancel()
+        await manager.close_all()
+
+    app.on_startup.append(start_reaper)
+    app.on_cleanup.append(shutdown)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Kim to many concurrent sessions over HTTP/WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=32, help="threads for calendar and disk work")
+    parser.add_argument("--idle-timeout", type=float, default=900.0, help="seconds before an idle session is saved and dropped")
+    args = parser.parse_args()
+
+    manager = SessionManager(SharedBackends(), max_workers=args.workers, idle_timeout=args.idle_timeout)
+    web.run_app(create_app(manager), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kim import calendar_client
+
+
+@pytest.fixture(autouse=True)
+def unlimited_calendar_quota(monkeypatch):
+    """The fake calendar has no quota; pacing would only slow the tests down"""
+    monkeypatch.setattr(calendar_client.calendar_rate_limiter, "rate", 1e6)
+    monkeypatch.setattr(calendar_client.calendar_rate_limiter, "capacity", 1e6)
@@ -0,0 +1,97 @@
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.fakes import FakeAsyncOpenAI, FakeCalendarService, FakeOpenAI
+from kim.async_llm import AsyncLLMGateway
+from kim.event_store import EventStore
+from server import SessionManager, SharedBackends
+
+REPLY = '{"intent": "general", "message": "Hello there", "missing_fields": [], "data": {}}'
+
+
+def messages(history):
+    return [{"role": "system", "content": "You are Kim"}, *history, {"role": "user", "content": "hello"}]
+
+
+def test_coalesce_key_joins_requests_with_different_history():
+    llm = FakeAsyncOpenAI([REPLY], delay=0.01)
+    gateway = AsyncLLMGateway(llm)
+
+    async def both():
+        return await asyncio.gather(
+            gateway.complete("gpt-4o", messages([]), coalesce_key="k"),
+            gateway.complete("gpt-4o", messages([{"role": "user", "content": "earlier"}]), coalesce_key="k"),
+        )
+
+    assert asyncio.run(both()) == [REPLY, REPLY]
+    assert llm.calls == 1
+    assert gateway.stats()["coalesced"] == 1
+
+
+def test_completion_limit_is_sent_upstream():
+    llm = FakeAsyncOpenAI([REPLY])
+    gateway = AsyncLLMGateway(llm, max_completion_tokens=128)
+
+    asyncio.run(gateway.complete("gpt-4o", messages([])))
+
+    assert llm.requests[0]["max_completion_tokens"] == 128
+
+
+def test_failing_stream_callback_only_fails_its_own_caller():
+    llm = FakeAsyncOpenAI([REPLY], chunk_size=8, delay=0.01)
+    gateway = AsyncLLMGateway(llm)
+
+    def hang_up(content):
+        raise ConnectionResetError("client went away")
+
+    async def both():
+        first = asyncio.ensure_future(gateway.complete("gpt-4o", messages([]), on_content=hang_up, coalesce_key="k"))
+        await asyncio.sleep(0)
+        second = await gateway.complete("gpt-4o", messages([]), coalesce_key="k")
+        with pytest.raises(ConnectionResetError):
+            await first
+        return second
+
+    assert asyncio.run(both()) == REPLY
+    assert llm.calls == 1
+
+
+def test_failing_stream_callback_abandons_an_unshared_stream():
+    llm = FakeAsyncOpenAI([REPLY], chunk_size=8)
+    gateway = AsyncLLMGateway(llm)
+    seen = []
+
+    def stop(content):
+        seen.append(content)
+        raise ConnectionResetError()
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(gateway.complete("gpt-4o", messages([]), on_content=stop))
+    assert len(seen) == 1
+
+
+def test_double_tapped_turn_makes_one_llm_call(tmp_path):
+    llm = FakeAsyncOpenAI([REPLY], delay=0.01)
+    backends = SharedBackends(
+        client=FakeOpenAI([]),
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(os.path.join(tmp_path, "events.db")),
+        llm_gateway=AsyncLLMGateway(llm)
+    )
+    manager = SessionManager(backends, sessions_dir=str(tmp_path / "sessions"))
+
+    async def double_tap():
+        session = await manager.get("alice")
+        replies = await asyncio.gather(manager.run_turn(session, "Tell me a joke"),
+                                       manager.run_turn(session, "tell me  a joke"))
+        history = list(session.assistant.conversation_history)
+        await manager.close_all()
+        return replies, history
+
+    replies, history = asyncio.run(double_tap())
+
+    assert replies == ["Hello there", "Hello there"]
+    assert llm.calls == 1
+    assert [t["content"] for t in history if t["role"] == "user"] == ["Tell me a joke"]
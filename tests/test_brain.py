@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.response_cache import ResponseCache
+
+OVERNIGHT = {"title": "Night shift", "date": "2027-01-04", "start": "22:00", "end": "02:00"}
+
+
+@pytest.fixture
+def brain():
+    brain = CalendarBrain(
+        client=FakeOpenAI([]),
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(":memory:"),
+        response_cache=ResponseCache(":memory:")
+    )
+    brain.speculation.enabled = False
+    return brain
+
+
+def test_overnight_payload_ends_on_the_next_day(brain):
+    body = brain._event_payload(OVERNIGHT)
+
+    assert body["start"]["dateTime"] == "2027-01-04T22:00:00"
+    assert body["end"]["dateTime"] == "2027-01-05T02:00:00"
+    start, end = brain._proposed_window(OVERNIGHT)
+    assert end.date().isoformat() == "2027-01-05"
+
+
+def test_confirmed_overnight_event_is_created(brain):
+    brain.conversation_context = dict(OVERNIGHT)
+    brain.awaiting_confirmation = True
+
+    assert brain.create_event_from_context().startswith("✅ Scheduled: Night shift")
+    [event] = brain.calendar_service.calendars["primary"].values()
+    assert event["end"]["dateTime"] == "2027-01-05T02:00:00"
+
+
+def test_payload_needs_a_complete_window(brain):
+    with pytest.raises(ValueError):
+        brain._event_payload({"title": "Dentist", "date": "2027-01-04", "start": "15:00"})
@@ -0,0 +1,96 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from benchmarks.fakes import FakeCalendarService
+from kim.busy_index import BusyIndex
+from kim.event_store import EventStore
+
+TIMEZONE = "Europe/Berlin"
+BERLIN = ZoneInfo(TIMEZONE)
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=BERLIN).timestamp()
+
+
+def timed(event_id, day, start, end, **extra):
+    return {
+        "id": event_id,
+        "summary": event_id,
+        "start": {"dateTime": f"2027-01-{day:02d}T{start}:00", "timeZone": TIMEZONE},
+        "end": {"dateTime": f"2027-01-{day:02d}T{end}:00", "timeZone": TIMEZONE},
+        **extra,
+    }
+
+
+def ids(index, start, end):
+    return [c["id"] for c in index.conflicts(start, end)]
+
+
+def test_touching_intervals_do_not_conflict():
+    index = BusyIndex(TIMEZONE)
+    index.load([timed("a", 4, "10:00", "11:00")])
+
+    assert ids(index, ts(2027, 1, 4, 11), ts(2027, 1, 4, 12)) == []
+    assert ids(index, ts(2027, 1, 4, 9), ts(2027, 1, 4, 10)) == []
+    assert ids(index, ts(2027, 1, 4, 10, 59), ts(2027, 1, 4, 12)) == ["a"]
+    assert ids(index, ts(2027, 1, 4, 9), ts(2027, 1, 4, 10, 1)) == ["a"]
+
+
+def test_all_day_event_blocks_its_local_day_only():
+    index = BusyIndex(TIMEZONE)
+    index.on_event_put({"id": "holiday", "start": {"date": "2027-01-05"}, "end": {"date": "2027-01-06"}})
+
+    assert ids(index, ts(2027, 1, 5, 0), ts(2027, 1, 5, 0, 30)) == ["holiday"]
+    assert ids(index, ts(2027, 1, 5, 23, 30), ts(2027, 1, 6, 1)) == ["holiday"]
+    assert ids(index, ts(2027, 1, 4, 23), ts(2027, 1, 5, 0)) == []
+    assert ids(index, ts(2027, 1, 6, 0), ts(2027, 1, 6, 1)) == []
+
+
+def test_removed_and_moved_events_stop_conflicting():
+    index = BusyIndex(TIMEZONE)
+    index.on_event_put(timed("long", 4, "08:00", "18:00"))
+    index.on_event_put(timed("short", 4, "12:00", "13:00"))
+    assert ids(index, ts(2027, 1, 4, 12), ts(2027, 1, 4, 12, 30)) == ["long", "short"]
+
+    index.on_event_removed("long")
+    assert ids(index, ts(2027, 1, 4, 9), ts(2027, 1, 4, 10)) == []
+
+    index.on_event_put(timed("short", 4, "15:00", "16:00"))
+    assert ids(index, ts(2027, 1, 4, 12), ts(2027, 1, 4, 13)) == []
+    assert ids(index, ts(2027, 1, 4, 15, 30), ts(2027, 1, 4, 17)) == ["short"]
+    assert len(index) == 1
+
+
+def test_full_sync_puts_are_sorted_once_before_the_next_query():
+    service = FakeCalendarService(page_size=3)
+    for day in (9, 4, 7, 5, 8, 6):
+        service._insert("primary", timed(f"day {day}", day, "10:00", "11:00"))
+    store = EventStore(":memory:", default_timezone=TIMEZONE)
+    index = BusyIndex(TIMEZONE)
+    store.subscribe(index)
+
+    store.sync(service)
+
+    assert [c["summary"] for c in index.conflicts(ts(2027, 1, 1), ts(2027, 1, 31))] == [
+        f"day {day}" for day in range(4, 10)
+    ]
+    store.close()
+
+
+def test_finished_and_future_series_are_skipped():
+    index = BusyIndex(TIMEZONE)
+    index.load([
+        timed("past", 4, "09:00", "10:00", recurrence=["RRULE:FREQ=DAILY;COUNT=3"]),
+        timed("weekly", 4, "09:00", "10:00", recurrence=["RRULE:FREQ=WEEKLY"]),
+        {**timed("later", 4, "09:00", "10:00", recurrence=["RRULE:FREQ=DAILY"]),
+         "start": {"dateTime": "2027-03-01T09:00:00", "timeZone": TIMEZONE},
+         "end": {"dateTime": "2027-03-01T10:00:00", "timeZone": TIMEZONE}},
+    ])
+
+    assert ids(index, ts(2027, 1, 18, 9), ts(2027, 1, 18, 10)) == ["weekly_20270118T080000Z"]
+    assert ids(index, ts(2027, 1, 5, 9), ts(2027, 1, 5, 10)) == ["past_20270105T080000Z"]
+
+    index.on_event_removed("weekly")
+    assert ids(index, ts(2027, 1, 18, 9), ts(2027, 1, 18, 10)) == []
+    assert len(index) == 2
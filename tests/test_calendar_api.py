@@ -0,0 +1,183 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpMockSequence
+
+from benchmarks.fakes import FakeCalendarService
+from kim import calendar_api, calendar_client, rate_limit
+from kim.calendar_api import BATCH_LIMIT, MAX_LISTING_WORKERS, create_events, delete_events, iter_events
+from kim.event_store import EventStore, event_start_ts
+
+TIMEZONE = "Europe/Berlin"
+
+
+def add(service, calendar_id, summary, start, end, **extra):
+    return service._insert(calendar_id, {
+        "summary": summary,
+        "start": {"dateTime": start, "timeZone": TIMEZONE},
+        "end": {"dateTime": end, "timeZone": TIMEZONE},
+        **extra
+    })
+
+
+def test_fake_lists_in_insertion_order_without_order_by():
+    service = FakeCalendarService()
+    add(service, "primary", "later", "2027-01-05T10:00:00+01:00", "2027-01-05T11:00:00+01:00")
+    add(service, "primary", "earlier", "2027-01-04T10:00:00+01:00", "2027-01-04T11:00:00+01:00")
+
+    assert [e["summary"] for e in iter_events(service)] == ["later", "earlier"]
+    assert [e["summary"] for e in iter_events(service, single_events=True)] == ["earlier", "later"]
+
+
+def test_merging_calendars_orders_occurrences_by_start():
+    service = FakeCalendarService(page_size=2)
+    add(service, "primary", "friday", "2027-01-08T09:00:00+01:00", "2027-01-08T10:00:00+01:00")
+    add(service, "primary", "monday", "2027-01-04T09:00:00+01:00", "2027-01-04T10:00:00+01:00")
+    # A series that started years ago: its master must not sort first
+    add(service, "team", "weekly", "2020-01-07T12:00:00+01:00", "2020-01-07T13:00:00+01:00",
+        recurrence=["RRULE:FREQ=WEEKLY;BYDAY=TU"])
+    add(service, "team", "wednesday", "2027-01-06T15:00:00+01:00", "2027-01-06T16:00:00+01:00")
+
+    events = list(iter_events(service, time_min="2027-01-04T00:00:00Z", time_max="2027-01-09T00:00:00Z",
+                              calendars=["primary", "team"]))
+
+    assert [e["summary"] for e in events] == ["monday", "weekly", "wednesday", "friday"]
+    starts = [event_start_ts(e, TIMEZONE) for e in events]
+    assert starts == sorted(starts)
+
+
+def test_listings_share_one_pool(monkeypatch):
+    service = FakeCalendarService(page_size=1)
+    workers = set()
+    fetch_page = calendar_api._fetch_page
+
+    def recording_fetch(service, params):
+        workers.add(threading.current_thread())
+        return fetch_page(service, params)
+    monkeypatch.setattr(calendar_api, "_fetch_page", recording_fetch)
+    calendars = [f"calendar-{i}" for i in range(3)]
+    for day, calendar_id in enumerate(calendars * 3, start=4):
+        add(service, calendar_id, f"event {day}", f"2027-01-{day:02d}T09:00:00+01:00", f"2027-01-{day:02d}T10:00:00+01:00")
+
+    for _ in range(20):
+        assert len(list(iter_events(service, calendars=calendars))) == 9
+        # Stopping early cancels the read-ahead instead of leaving it queued
+        assert next(iter_events(service, calendars=calendars))["summary"] == "event 4"
+
+    assert len(workers) <= MAX_LISTING_WORKERS
+
+
+def batch_response(parts, boundary="batch_response"):
+    """multipart/mixed batch reply of (request_id, status, body) parts, as the API sends it"""
+    chunks = []
+    for request_id, status, body in parts:
+        reason = "OK" if status < 400 else "Error"
+        chunks.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-batch + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+            f"{json.dumps(body)}\r\n"
+        )
+    headers = {"status": "200", "content-type": f"multipart/mixed; boundary={boundary}"}
+    return headers, "".join(chunks) + f"--{boundary}--\r\n"
+
+
+def mocked_service(responses):
+    http = HttpMockSequence(responses)
+    return build_from_document(get_static_doc("calendar", "v3"), http=http), http
+
+
+def new_events(count):
+    return [
+        {"summary": f"Event {i}", "start_datetime": "2027-01-04T10:00:00", "end_datetime": "2027-01-04T11:00:00"}
+        for i in range(count)
+    ]
+
+
+def test_create_events_splits_batches_at_the_limit_and_reports_per_item_errors(tmp_path):
+    failed = 3
+    first = [
+        (i, 400, {"error": {"code": 400, "message": "Invalid start time"}}) if i == failed
+        else (i, 200, {"id": f"evt{i}", "summary": f"Event {i}", "status": "confirmed"})
+        for i in range(BATCH_LIMIT)
+    ]
+    second = [(i, 200, {"id": f"evt{i}", "summary": f"Event {i}"}) for i in range(BATCH_LIMIT, 60)]
+    service, http = mocked_service([batch_response(first), batch_response(second)])
+    store = EventStore(str(tmp_path / "events.db"))
+    invalid = {"summary": "No times"}
+
+    results = create_events(service, new_events(60) + [invalid], store=store)
+
+    assert len(http.request_sequence) == 2
+    assert [uri for uri, *_ in http.request_sequence] == ["https://www.googleapis.com/batch/calendar/v3"] * 2
+    assert http.request_sequence[0][2].count("POST /calendar/v3/calendars/primary/events") == BATCH_LIMIT
+    assert http.request_sequence[1][2].count("POST /calendar/v3/calendars/primary/events") == 10
+    assert len(results) == 61
+    assert not results[failed]["ok"] and "Invalid start time" in results[failed]["error"]
+    assert all(results[i]["ok"] for i in range(60) if i != failed)
+    assert results[59]["event"]["id"] == "evt59"
+    assert not results[60]["ok"] and results[60]["error"].startswith("Invalid event")
+    # Only what the server accepted is written through
+    assert store.get("evt0") is not None and store.get(f"evt{failed}") is None
+    store.close()
+
+
+def test_delete_events_batches_and_updates_the_store(tmp_path):
+    service, http = mocked_service([batch_response([(0, 204, ""), (1, 404, {"error": {"code": 404, "message": "Not Found"}})])])
+    store = EventStore(str(tmp_path / "events.db"))
+    store.put({"id": "a", "summary": "A", "start": {"dateTime": "2027-01-04T10:00:00+01:00"},
+               "end": {"dateTime": "2027-01-04T11:00:00+01:00"}})
+
+    results = delete_events(service, ["a", "missing"], store=store)
+
+    assert [r["ok"] for r in results] == [True, False]
+    assert [r["id"] for r in results] == ["a", "missing"]
+    assert store.get("a") is None
+    assert len(http.request_sequence) == 1
+    store.close()
+
+
+def test_retryable_items_are_requeued_into_a_new_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(calendar_api, "backoff_delay", lambda attempt: 0)
+    first = [
+        (0, 200, {"id": "evt0", "summary": "Event 0"}),
+        (1, 429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}}),
+        (2, 503, {"error": {"code": 503, "message": "Backend Error"}}),
+        (3, 400, {"error": {"code": 400, "message": "Invalid start time"}}),
+    ]
+    second = [(1, 200, {"id": "evt1", "summary": "Event 1"}), (2, 200, {"id": "evt2", "summary": "Event 2"})]
+    service, http = mocked_service([batch_response(first), batch_response(second)])
+    store = EventStore(str(tmp_path / "events.db"))
+
+    results = create_events(service, new_events(4), store=store)
+
+    assert [r["ok"] for r in results] == [True, True, True, False]
+    assert len(http.request_sequence) == 2
+    assert http.request_sequence[1][2].count("POST /calendar/v3/calendars/primary/events") == 2
+    assert store.get("evt2") is not None
+    store.close()
+
+
+def test_a_full_batch_costs_one_token_per_call(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+
+    def sleep(seconds):
+        clock.now += seconds
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep))
+    limiter = calendar_client.calendar_rate_limiter
+    monkeypatch.setattr(limiter, "rate", 5.0)
+    monkeypatch.setattr(limiter, "capacity", 10.0)
+    monkeypatch.setattr(limiter, "_tokens", 10.0)
+    monkeypatch.setattr(limiter, "_updated", 0.0)
+    service = FakeCalendarService()
+
+    assert all(r["ok"] for r in create_events(service, new_events(BATCH_LIMIT)))
+
+    assert service.calls["batch"] == 1
+    # 10 in the bucket, the other 40 at 5 per second
+    assert clock.now == 8.0
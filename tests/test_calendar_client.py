@@ -0,0 +1,127 @@
+import pytest
+from googleapiclient.errors import HttpError
+
+from benchmarks.fakes import FakeCalendarService, FakeRequest, _Response
+from kim import calendar_client
+from kim.calendar_api import _event_body, create_events, insert_event
+from kim.calendar_client import execute_with_retry, is_idempotent
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(calendar_client, "backoff_delay", lambda attempt: 0.0)
+
+
+def failing(status, times, then=lambda: {"ok": True}, content=b'{"error": {"message": "boom"}}'):
+    """fn for FakeRequest that raises HttpError(status) `times` times, then calls `then`"""
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) <= times:
+            raise HttpError(_Response(status), content)
+        return then()
+    return fn, attempts
+
+
+def body(**fields):
+    return _event_body("Dentist", "2027-01-04T15:00:00", "2027-01-04T16:00:00", **fields)
+
+
+def test_reads_are_retried_on_server_errors():
+    fn, attempts = failing(503, 2)
+
+    assert execute_with_retry(FakeRequest(fn, 'calendar.events.list')) == {"ok": True}
+    assert len(attempts) == 3
+
+
+def test_insert_without_client_id_is_not_retried_after_a_server_error():
+    fn, attempts = failing(503, 1)
+    anonymous = {k: v for k, v in body().items() if k != 'id'}
+
+    with pytest.raises(HttpError):
+        execute_with_retry(FakeRequest(fn, 'calendar.events.insert', anonymous))
+    assert len(attempts) == 1
+
+
+def test_insert_without_client_id_is_retried_when_rate_limited():
+    fn, attempts = failing(429, 1)
+
+    execute_with_retry(FakeRequest(fn, 'calendar.events.insert', {"summary": "x"}))
+
+    assert len(attempts) == 2
+
+
+def test_insert_with_client_id_is_retried():
+    fn, attempts = failing(500, 1)
+
+    execute_with_retry(FakeRequest(fn, 'calendar.events.insert', body()))
+
+    assert len(attempts) == 2
+
+
+def test_batch_is_idempotent_only_when_every_call_is():
+    service = FakeCalendarService()
+    batch = service.new_batch_http_request()
+    batch.add(service.events().insert(calendarId='primary', body=body()))
+    batch.add(service.events().delete(calendarId='primary', eventId='a'))
+    assert is_idempotent(batch)
+
+    batch.add(service.events().insert(calendarId='primary', body={"summary": "no id"}))
+    assert not is_idempotent(batch)
+
+
+class LostResponseService(FakeCalendarService):
+    """Applies the first insert, then fails as if its response never arrived"""
+
+    def __init__(self):
+        super().__init__()
+        self.lost = False
+
+    def _insert(self, calendar_id, event):
+        created = super()._insert(calendar_id, event)
+        if not self.lost:
+            self.lost = True
+            raise HttpError(_Response(503), b'{"error": {"message": "backend error"}}')
+        return created
+
+
+def test_retried_insert_does_not_duplicate_the_event():
+    service = LostResponseService()
+
+    event = insert_event(service, body())
+
+    assert len(service.calendars["primary"]) == 1
+    assert service.calendars["primary"][event["id"]]["summary"] == "Dentist"
+
+
+class LostBatchResponseService(FakeCalendarService):
+    """Applies the first batch, then fails it as if its response never arrived"""
+
+    def __init__(self):
+        super().__init__()
+        self.lost = False
+
+    def new_batch_http_request(self, callback=None):
+        batch = super().new_batch_http_request(callback)
+        execute = batch.execute
+
+        def lose_first_response():
+            execute()
+            if not self.lost:
+                self.lost = True
+                raise HttpError(_Response(503), b'{"error": {"message": "backend error"}}')
+        batch.execute = lose_first_response
+        return batch
+
+
+def test_retried_batch_returns_the_events_its_first_attempt_created():
+    service = LostBatchResponseService()
+    items = [{"summary": f"Event {i}", "start_datetime": "2027-01-04T10:00:00", "end_datetime": "2027-01-04T11:00:00"}
+             for i in range(3)]
+
+    results = create_events(service, items)
+
+    assert all(result["ok"] for result in results)
+    assert len(service.calendars["primary"]) == 3
+    assert [r["event"]["summary"] for r in results] == ["Event 0", "Event 1", "Event 2"]
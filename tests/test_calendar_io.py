@@ -0,0 +1,158 @@
+import csv
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from benchmarks.fakes import FakeCalendarService
+from kim.calendar_io import CSV_FIELDS, ImportCheckpoint, export_events, import_events
+from kim.event_store import EventStore
+from kim.recurrence import expand_events
+
+TIMEZONE = "Europe/Berlin"
+
+
+class Crash(Exception):
+    pass
+
+
+def write_source(path, count, uids=True):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({
+                "uid": f"event-{i}@example.com" if uids else "",
+                "summary": f"Meeting {i}",
+                "start": f"2027-01-{1 + i % 28:02d}T{8 + i % 10:02d}:00:00",
+                "end": f"2027-01-{1 + i % 28:02d}T{9 + i % 10:02d}:00:00",
+                "timezone": TIMEZONE,
+            })
+    return str(path)
+
+
+def summaries(service):
+    return sorted(e["summary"] for e in service.calendars.get("primary", {}).values())
+
+
+@pytest.mark.parametrize("uids", [True, False])
+def test_resumed_import_skips_batches_that_landed_before_the_crash(tmp_path, monkeypatch, uids):
+    source = write_source(tmp_path / "events.csv", 12, uids)
+    service = FakeCalendarService()
+    checkpoint_path = str(tmp_path / "checkpoint.db")
+
+    # The first batch reaches the calendar, then the process dies before checkpointing it
+    def crash(self, entries):
+        raise Crash()
+    monkeypatch.setattr(ImportCheckpoint, "record", crash)
+    checkpoint = ImportCheckpoint(checkpoint_path)
+    with pytest.raises(Crash):
+        import_events(service, source, checkpoint=checkpoint, batch_size=5)
+    checkpoint.close()
+    assert len(summaries(service)) == 5
+    monkeypatch.undo()
+
+    checkpoint = ImportCheckpoint(checkpoint_path)
+    report = import_events(service, source, checkpoint=checkpoint, batch_size=5)
+    checkpoint.close()
+
+    assert summaries(service) == sorted(f"Meeting {i}" for i in range(12))
+    assert report["imported"] == 7
+    assert report["duplicates"] == 5
+    assert report["failed"] == 0
+
+
+def test_reimporting_into_a_fresh_checkpoint_creates_no_copies(tmp_path):
+    source = write_source(tmp_path / "events.csv", 8)
+    service = FakeCalendarService()
+
+    for run in range(2):
+        checkpoint = ImportCheckpoint(str(tmp_path / f"checkpoint-{run}.db"))
+        import_events(service, source, checkpoint=checkpoint, batch_size=3)
+        checkpoint.close()
+
+    assert len(summaries(service)) == 8
+
+
+def test_seeding_from_the_store_pages_through_every_row(tmp_path):
+    service = FakeCalendarService()
+    import_events(service, write_source(tmp_path / "old.csv", 7),
+                  checkpoint=ImportCheckpoint(":memory:"))
+    store = EventStore(":memory:", default_timezone=TIMEZONE)
+    store.ensure_fresh(service)
+
+    assert sorted(e["summary"] for e in store.iter_all(page_size=3)) == summaries(service)
+
+    checkpoint = ImportCheckpoint(str(tmp_path / "checkpoint.db"))
+    report = import_events(service, write_source(tmp_path / "again.csv", 7), store=store, checkpoint=checkpoint)
+    checkpoint.close()
+    store.close()
+
+    assert report["duplicates"] == 7
+    assert report["imported"] == 0
+
+
+def series_with_exceptions(service):
+    """Weekly on Mondays across the March DST switch; the 8th moved to Tuesday, the 15th cancelled"""
+    master = service._insert("primary", {
+        "iCalUID": "u1@g",
+        "summary": "Standup",
+        "start": {"dateTime": "2027-03-01T09:00:00", "timeZone": TIMEZONE},
+        "end": {"dateTime": "2027-03-01T09:30:00", "timeZone": TIMEZONE},
+        "recurrence": ["RRULE:FREQ=WEEKLY;COUNT=6"],
+    })
+    service._insert("primary", {
+        "iCalUID": "u1@g",
+        "recurringEventId": master["id"],
+        "originalStartTime": {"dateTime": "2027-03-08T09:00:00+01:00", "timeZone": TIMEZONE},
+        "summary": "Standup",
+        "start": {"dateTime": "2027-03-09T14:00:00", "timeZone": TIMEZONE},
+        "end": {"dateTime": "2027-03-09T14:30:00", "timeZone": TIMEZONE},
+    })
+    service._insert("primary", {
+        "iCalUID": "u1@g",
+        "recurringEventId": master["id"],
+        "originalStartTime": {"dateTime": "2027-03-15T09:00:00+01:00", "timeZone": TIMEZONE},
+        "status": "cancelled",
+    })
+
+
+def occurrences(service):
+    zone = ZoneInfo(TIMEZONE)
+    events = service.calendars.get("primary", {}).values()
+    return [
+        datetime.fromisoformat(e["start"]["dateTime"]).replace(tzinfo=None).isoformat()
+        for e in expand_events(events, datetime(2027, 2, 1, tzinfo=zone).timestamp(), datetime(2027, 5, 1, tzinfo=zone).timestamp(), TIMEZONE)
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["ics", "csv"])
+def test_series_exceptions_survive_an_export_round_trip(tmp_path, fmt):
+    source = FakeCalendarService()
+    series_with_exceptions(source)
+    path = str(tmp_path / f"calendar.{fmt}")
+
+    export_events(source, path, default_tz=TIMEZONE)
+    target = FakeCalendarService()
+    report = import_events(target, path, checkpoint=ImportCheckpoint(":memory:"), default_tz=TIMEZONE)
+
+    assert report["invalid"] == 0 and report["duplicates"] == 0
+    assert occurrences(target) == [
+        "2027-03-01T09:00:00", "2027-03-09T14:00:00", "2027-03-22T09:00:00",
+        "2027-03-29T09:00:00", "2027-04-05T09:00:00",
+    ]
+    assert occurrences(target) == occurrences(source)
+
+
+def test_exported_ics_has_one_vevent_per_uid_and_no_orphan_exceptions(tmp_path):
+    service = FakeCalendarService()
+    series_with_exceptions(service)
+    path = str(tmp_path / "calendar.ics")
+
+    assert export_events(service, path, default_tz=TIMEZONE) == 2
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert text.count("UID:u1@g") == 1
+    assert "RECURRENCE-ID" not in text
+    assert "EXDATE;TZID=Europe/Berlin:20270308T090000" in text
+    assert "EXDATE;TZID=Europe/Berlin:20270315T090000" in text
@@ -0,0 +1,112 @@
+import pytest
+
+from benchmarks.fakes import FakeCalendarService
+from kim.calendar_api import create_event, delete_event
+from kim.event_store import EventStore
+
+TIMEZONE = "Europe/Berlin"
+
+
+class RecordingListener:
+    def __init__(self):
+        self.put, self.removed, self.resets = [], [], 0
+
+    def on_event_put(self, event):
+        self.put.append(event["id"])
+
+    def on_event_removed(self, event_id):
+        self.removed.append(event_id)
+
+    def on_reset(self):
+        self.resets += 1
+
+
+def add(service, summary, day, calendar_id="primary"):
+    return service._insert(calendar_id, {
+        "summary": summary,
+        "start": {"dateTime": f"2027-01-{day:02d}T10:00:00+01:00", "timeZone": TIMEZONE},
+        "end": {"dateTime": f"2027-01-{day:02d}T11:00:00+01:00", "timeZone": TIMEZONE},
+    })
+
+
+@pytest.fixture
+def service():
+    return FakeCalendarService(page_size=2)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    yield store
+    store.close()
+
+
+def summaries(store):
+    return sorted(e["summary"] for e in store.all_events())
+
+
+def test_first_sync_is_full_and_follows_pages(service, store):
+    for day in range(4, 9):
+        add(service, f"event {day}", day)
+
+    store.sync(service)
+
+    assert summaries(store) == [f"event {day}" for day in range(4, 9)]
+    assert service.calls["list"] == 3
+    assert store.sync_token is not None
+
+
+def test_incremental_sync_applies_only_changes(service, store):
+    keep = add(service, "keep", 4)
+    gone = add(service, "gone", 5)
+    store.sync(service)
+    full_token = store.sync_token
+
+    service._patch("primary", keep["id"], {"summary": "kept"})
+    service._delete("primary", gone["id"])
+    add(service, "new", 6)
+    listener = RecordingListener()
+    store.subscribe(listener)
+    store.sync(service)
+
+    assert summaries(store) == ["kept", "new"]
+    assert store.sync_token != full_token
+    assert listener.resets == 0
+    assert gone["id"] in listener.removed
+
+
+def test_expired_sync_token_falls_back_to_full_sync(service, store):
+    add(service, "old", 4)
+    store.sync(service)
+    service.expire_token(store.sync_token)
+    add(service, "after expiry", 5)
+    listener = RecordingListener()
+    store.subscribe(listener)
+
+    store.sync(service)
+
+    assert summaries(store) == ["after expiry", "old"]
+    assert listener.resets == 1
+    assert store.sync_token is not None
+
+
+def test_ensure_fresh_skips_sync_within_max_staleness(service, store):
+    add(service, "event", 4)
+    store.ensure_fresh(service)
+    calls = service.calls["list"]
+
+    store.ensure_fresh(service)
+
+    assert service.calls["list"] == calls
+
+
+def test_writes_go_through_to_the_store(service, store):
+    store.sync(service)
+    event = create_event(service, "Dentist", "2027-01-04T15:00:00", "2027-01-04T16:00:00", store=store)
+
+    assert store.get(event["id"])["summary"] == "Dentist"
+    assert [e["summary"] for e in store.between(0, float("inf"))] == ["Dentist"]
+
+    delete_event(service, event["id"], store=store)
+
+    assert store.get(event["id"]) is None
@@ -0,0 +1,75 @@
+import json
+import os
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.fast_path import FastPathParser
+from kim.response_cache import ResponseCache
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fast_path_corpus.jsonl')
+# The corpus' relative dates are written for Saturday 26 April 2025
+REFERENCE_NOW = datetime(2025, 4, 26, 12, 0, tzinfo=ZoneInfo("Europe/Berlin"))
+
+
+def load_corpus():
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return FastPathParser()
+
+
+@pytest.mark.parametrize("case", load_corpus(), ids=lambda case: case["text"])
+def test_corpus(parser, case):
+    parsed, confidence = parser.parse(case["text"], case["context"], REFERENCE_NOW)
+    accepted = parsed is not None and confidence >= parser.confidence_threshold
+
+    expected = case["expected"]
+    if expected is None:
+        # Left to the LLM
+        assert not accepted
+        return
+    assert accepted
+    assert parsed["intent"] == expected["intent"]
+    for field, value in expected.get("data", {}).items():
+        assert parsed["data"].get(field) == value
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("today", date(2025, 4, 26)),
+    ("tomorrow", date(2025, 4, 27)),
+    ("monday", date(2025, 4, 28)),
+    ("next friday", date(2025, 5, 2)),
+    ("3rd of may", date(2025, 5, 3)),
+])
+def test_resolve_date(parser, phrase, expected):
+    assert parser.resolve_date(phrase, REFERENCE_NOW.date()) == expected
+
+
+def test_missing_times_are_reported(parser):
+    parsed, _ = parser.parse("schedule lunch with anna tomorrow", {}, REFERENCE_NOW)
+
+    assert parsed["intent"] == "create"
+    assert parsed["data"] == {"date": "2025-04-27", "title": "Lunch With Anna"}
+    assert set(parsed["missing_fields"]) == {"start", "end"}
+
+
+def test_confident_parse_skips_the_llm(tmp_path):
+    llm = FakeOpenAI(['{"intent": "general", "message": "from the LLM", "missing_fields": [], "data": {}}'])
+    brain = CalendarBrain(
+        client=llm,
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(str(tmp_path / "events.db")),
+        response_cache=ResponseCache(':memory:')
+    )
+
+    assert brain.process_conversation("hello")["intent"] == "general"
+    assert brain.process_conversation("remind me about the report")["message"] == "from the LLM"
+    assert llm.calls == 1
@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from kim.memory import MemoryManager
+from kim.memory_store import SQLiteMemoryStore
+
+
+def turn(i):
+    return {"role": "user", "content": f"turn {i}", "timestamp": "2027-01-04T10:00:00+01:00"}
+
+
+def write_log(memory, lines):
+    with open(memory.conversation_log_path, 'wb') as f:
+        f.write(b"".join(lines))
+
+
+def line(i):
+    return json.dumps(turn(i)).encode('utf-8') + b'\n'
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    memory = MemoryManager(memory_dir=str(tmp_path))
+    write_log(memory, [line(0), line(1), b'{"role": "user", "cont'])
+
+    assert [t["content"] for t in memory.load_conversation()] == ["turn 0", "turn 1"]
+    with open(memory.conversation_log_path, 'rb') as f:
+        assert f.read() == line(0) + line(1)
+    memory.close()
+
+
+def test_bad_line_in_the_middle_is_skipped_not_truncated(tmp_path):
+    memory = MemoryManager(memory_dir=str(tmp_path))
+    original = [line(0), b'\xff\xfe not json\n', line(1), b'{"half": \n', line(2)]
+    write_log(memory, original)
+
+    assert [t["content"] for t in memory.load_conversation()] == ["turn 0", "turn 1", "turn 2"]
+    with open(memory.conversation_log_path, 'rb') as f:
+        assert f.read() == b"".join(original)
+    memory.close()
+
+
+def test_appends_after_recovery_are_kept(tmp_path):
+    memory = MemoryManager(memory_dir=str(tmp_path))
+    write_log(memory, [line(0), b'garbage\n', line(1), b'{"torn'])
+    memory.load_conversation()
+
+    memory.append_conversation(turn(2))
+    memory.close()
+
+    reopened = MemoryManager(memory_dir=str(tmp_path))
+    assert [t["content"] for t in reopened.load_conversation()] == ["turn 0", "turn 1", "turn 2"]
+    reopened.close()
+
+
+def test_failed_replace_keeps_the_old_conversation(tmp_path):
+    store = SQLiteMemoryStore(str(tmp_path / "memory.db"))
+    store.append_turns([turn(0), turn(1)])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.replace_conversation([turn(2), {"role": "user", "content": None}])
+
+    assert [t["content"] for t in store.load_conversation()] == ["turn 0", "turn 1"]
+    store.replace_conversation([turn(2)])
+    assert [t["content"] for t in store.load_conversation()] == ["turn 2"]
+    store.close()
+
+
+def test_search_sees_queued_turns_without_flushing(tmp_path, monkeypatch):
+    memory = MemoryManager(memory_dir=str(tmp_path), backend="sqlite", write_delay=60, max_write_delay=60)
+    memory.append_conversation({"role": "user", "content": "dentist on friday", "timestamp": "t0"})
+    memory.flush()
+    memory.append_conversation({"role": "user", "content": "move the dentist to monday", "timestamp": "t1"})
+    monkeypatch.setattr(memory, "flush", lambda: pytest.fail("search must not flush"))
+
+    found = memory.search_history("dentist", limit=5)
+
+    assert [t["content"] for t in found] == ["move the dentist to monday", "dentist on friday"]
+    assert memory._writer.pending
+    monkeypatch.undo()
+    memory.close()
+
+
+def test_search_waits_for_a_batch_being_written(tmp_path):
+    memory = MemoryManager(memory_dir=str(tmp_path), backend="sqlite", write_delay=60, max_write_delay=60)
+    memory.append_conversation({"role": "user", "content": "dentist on friday", "timestamp": "t0"})
+    results = []
+    with memory._io_lock:
+        # What the writer does: take the queued turns, then commit them while holding the lock
+        with memory._pending_lock:
+            turns, memory._pending_turns = memory._pending_turns, []
+        searcher = threading.Thread(target=lambda: results.extend(memory.search_history("dentist")))
+        searcher.start()
+        searcher.join(0.2)
+        assert searcher.is_alive()
+        memory.store.append_turns(turns)
+    searcher.join()
+
+    assert [t["content"] for t in results] == ["dentist on friday"]
+    memory.close()
@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+
+from kim.pipeline import VoicePipeline
+
+
+class ScriptedListener:
+    """Listener double: utterances are already text, pushed by the test or by the assistant mid-reply"""
+
+    def __init__(self, *utterances):
+        self.utterances = queue.Queue()
+        self.finished = threading.Event()
+        for text in utterances:
+            self.utterances.put(text)
+
+    def say(self, text, last=False):
+        self.utterances.put(text)
+        if last:
+            self.finished.set()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.finished.set()
+
+    def get_utterance(self, timeout=None):
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def recognize(self, text):
+        return text
+
+
+class StreamingAssistant:
+    """Streams its reply a word at a time; `during` runs after the first word"""
+
+    def __init__(self, reply="one two three four five", during=None, delay=0.02):
+        self.reply = reply
+        self.during = during
+        self.delay = delay
+        self.heard = []
+
+    def process_input(self, text, on_partial=None):
+        self.heard.append(text)
+        words = self.reply.split()
+        for i, word in enumerate(words):
+            if on_partial is not None:
+                on_partial(word if i == 0 else " " + word)
+            if i == 0 and self.during is not None:
+                during, self.during = self.during, None
+                during()
+            time.sleep(self.delay)
+        return self.reply
+
+
+def run(assistant, listener):
+    output = []
+    assistant.pipeline = VoicePipeline(assistant, listener, on_output=output.append,
+                                       on_partial=lambda chunk, first: None)
+    thread = threading.Thread(target=assistant.pipeline.run, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    return output
+
+
+def test_noise_during_a_reply_neither_cancels_nor_answers():
+    listener = ScriptedListener("hello")
+    assistant = StreamingAssistant(during=lambda: listener.say("   ", last=True))
+
+    output = run(assistant, listener)
+
+    assert "Kim: (interrupted)" not in output
+    assert not any("didn't catch" in line for line in output)
+    assert assistant.heard == ["hello"]
+
+
+def test_speech_start_stops_the_reply_before_the_utterance_ends():
+    listener = ScriptedListener("hello")
+
+    def user_starts_talking():
+        assistant.pipeline.on_speech("wait")
+        listener.finished.set()
+    assistant = StreamingAssistant(during=user_starts_talking, delay=0.5)
+
+    started = time.perf_counter()
+    output = run(assistant, listener)
+
+    assert output == ["You: hello", "Kim: (interrupted)"]
+    # Cancelled at the next word, not after the whole reply
+    assert time.perf_counter() - started < 1.5
+
+
+def test_recognized_barge_in_cancels_and_is_answered_next():
+    listener = ScriptedListener("hello")
+    assistant = StreamingAssistant(during=lambda: listener.say("stop that", last=True), delay=0.1)
+
+    output = run(assistant, listener)
+
+    assert output[:3] == ["You: hello", "Kim: (interrupted)", "You: stop that"]
+    assert assistant.heard == ["hello", "stop that"]
+
+
+def test_empty_transcript_outside_a_reply_asks_again():
+    listener = ScriptedListener("")
+    listener.finished.set()
+
+    output = run(StreamingAssistant(), listener)
+
+    assert output == ["Kim: I didn't catch that. Could you repeat?"]
@@ -0,0 +1,82 @@
+import pytest
+
+from benchmarks.bench_profile_extraction import UTTERANCES, legacy_scan
+from kim.profile_extractor import ProfileUpdater, extract_facts, rebuild_profile
+
+
+@pytest.mark.parametrize("text", UTTERANCES)
+def test_agrees_with_the_old_substring_scans(text):
+    name, hours, duty = legacy_scan(text)
+    facts = extract_facts(text)
+
+    # The old scans kept everything after "my name is" and cut tasks at a fixed word count
+    assert (facts["name"] is None) == (name is None or "call me back" in text.lower())
+    if facts["name"]:
+        assert name.startswith("My name is " + facts["name"])
+    if hours:
+        assert facts["work_hours"] == {"start": f"{int(hours[0]):02d}:00", "end": f"{int(hours[1]) + 12}:00"}
+    if duty:
+        [found] = facts["responsibilities"]
+        assert found.startswith(duty)
+    else:
+        assert facts["responsibilities"] == []
+
+
+@pytest.mark.parametrize("text, hours", [
+    ("I work 9 to 5", ("09:00", "17:00")),
+    ("I'm available from 1 to 5pm", ("13:00", "17:00")),
+    ("My hours are 8:30am-4:30pm", ("08:30", "16:30")),
+    ("my working hours are between 7.15 and 15.45", ("07:15", "15:45")),
+    ("I work 10pm to 6am", None),
+    ("I work 13pm to 5pm", None),
+])
+def test_work_hours_are_normalized(text, hours):
+    found = extract_facts(text)["work_hours"]
+    assert (found["start"], found["end"]) == hours if hours else found is None
+
+
+@pytest.mark.parametrize("text, name", [
+    ("my name is anna maria and I work late", "Anna Maria"),
+    ("I'm called McKenzie", "McKenzie"),
+    ("call me back when you can", None),
+    ("call me tomorrow", None),
+    ("My name’s Zoë, my name is Kim, call me Jo", "Jo"),
+])
+def test_names(text, name):
+    assert extract_facts(text)["name"] == name
+
+
+def test_duties_stop_at_clauses_and_skip_figures_of_speech():
+    text = ("It must be great. Should I move it? I need to call the bank and "
+            "then I have to pick up the kids, I'll  review\tthe budget numbers for the whole team today")
+
+    assert extract_facts(text)["responsibilities"] == [
+        "Call the bank", "Pick up the kids", "Review the budget numbers for the"
+    ]
+
+
+def test_updater_dedupes_responsibilities_and_reports_only_changes():
+    profile = {"responsibilities": ["Call the bank"]}
+    updater = ProfileUpdater(profile)
+
+    changes = updater.apply(extract_facts("My name is Eduardo, I need to call  the Bank and I need to renew my passport"))
+    assert changes == {"name": "Eduardo", "new_responsibilities": ["Renew my passport"]}
+    assert updater.apply(extract_facts("my name is eduardo")) == {}
+    assert updater.apply(extract_facts("I need to renew my passport")) == {}
+    assert profile["responsibilities"] == ["Call the bank", "Renew my passport"]
+
+
+def test_rebuild_replays_only_user_turns_and_later_statements_win():
+    turns = [
+        {"role": "user", "content": "I work 9 to 5"},
+        {"role": "assistant", "content": "My name is Kim and I need to check your calendar"},
+        {"role": "user", "content": "Actually I work 8 to 4, I have to file the taxes"},
+    ]
+    base = {"personal": {"name": None}, "schedule": {"work_hours": {}}, "responsibilities": []}
+
+    profile, changes = rebuild_profile(turns, base)
+
+    assert profile["schedule"]["work_hours"] == {"start": "08:00", "end": "16:00"}
+    assert profile["personal"]["name"] is None
+    assert changes["new_responsibilities"] == ["File the taxes"]
+    assert base["responsibilities"] == []
@@ -0,0 +1,47 @@
+import pytest
+
+from kim import prompt_builder
+from kim.async_llm import CHARS_PER_TOKEN
+from kim.prompt_builder import PromptBuilder, TokenCounter
+
+
+class FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    """tiktoken as if its BPE file had to be fetched: records every load"""
+    tiktoken = pytest.importorskip("tiktoken")
+    loads = []
+
+    def load(name):
+        loads.append(name)
+        return FakeEncoding()
+    monkeypatch.setattr(prompt_builder, "_encodings", {})
+    monkeypatch.setattr(tiktoken, "encoding_for_model", load)
+    return loads
+
+
+def test_counter_estimates_until_loaded(tokenizer):
+    counter = TokenCounter("gpt-4o")
+    text = "schedule a dentist appointment tomorrow"
+
+    assert not counter.exact
+    assert counter.count(text) == len(text) // CHARS_PER_TOKEN + 1
+    assert tokenizer == []
+
+    counter.load()
+
+    assert counter.exact
+    assert counter.count(text) == 5
+    assert tokenizer == ["gpt-4o"]
+
+
+def test_building_a_prompt_never_loads_the_encoding(tokenizer):
+    builder = PromptBuilder("You are Kim, an AI calendar assistant.")
+
+    builder.build("what is on my calendar tomorrow", ["Current title: Dentist"], {}, [], None)
+
+    assert tokenizer == []
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from kim.recurrence import (
+    UNBOUNDED, _fast_forward, _naive_rule, expand_events, normalize_recurrence, series_bounds
+)
+
+TIMEZONE = "Europe/Berlin"
+BERLIN = ZoneInfo(TIMEZONE)
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=BERLIN).timestamp()
+
+
+def series(start, end, *recurrence, event_id="s1"):
+    return {
+        "id": event_id,
+        "summary": "Series",
+        "start": {"dateTime": start, "timeZone": TIMEZONE},
+        "end": {"dateTime": end, "timeZone": TIMEZONE},
+        "recurrence": list(recurrence),
+    }
+
+
+def starts(events, time_min, time_max=UNBOUNDED):
+    return [e["start"]["dateTime"] for e in expand_events(events, time_min, time_max, TIMEZONE)]
+
+
+def test_weekly_series_keeps_its_wall_clock_time_across_dst():
+    # Clocks go forward on 2027-03-28
+    master = series("2027-03-15T09:00:00", "2027-03-15T10:00:00", "RRULE:FREQ=WEEKLY")
+
+    assert starts([master], ts(2027, 3, 14), ts(2027, 4, 6)) == [
+        "2027-03-15T09:00:00+01:00",
+        "2027-03-22T09:00:00+01:00",
+        "2027-03-29T09:00:00+02:00",
+        "2027-04-05T09:00:00+02:00",
+    ]
+
+
+def test_weekly_series_fast_forwarded_past_dst_keeps_its_time():
+    master = series("2020-01-06T09:00:00", "2020-01-06T10:00:00", "RRULE:FREQ=WEEKLY;INTERVAL=2")
+
+    # Every other Monday since 2020-01-06: 2027-07-12 is 392 weeks later, 2027-07-05 is off-phase
+    assert starts([master], ts(2027, 7, 1), ts(2027, 7, 20)) == [
+        "2027-07-12T09:00:00+02:00",
+    ]
+
+
+def test_utc_until_is_compared_in_local_time():
+    # 23:30 in Berlin is 22:30 UTC in winter: the last occurrence ends exactly at UNTIL
+    inclusive = series("2027-01-01T23:30:00", "2027-01-01T23:45:00", "RRULE:FREQ=DAILY;UNTIL=20270103T223000Z")
+    exclusive = series("2027-01-01T23:30:00", "2027-01-01T23:45:00", "RRULE:FREQ=DAILY;UNTIL=20270103T222959Z",
+                       event_id="s2")
+
+    assert len(starts([inclusive], ts(2027, 1, 1))) == 3
+    assert len(starts([exclusive], ts(2027, 1, 1))) == 2
+    assert _naive_rule("FREQ=DAILY;UNTIL=20270103T223000Z", BERLIN) == "FREQ=DAILY;UNTIL=20270103T233000"
+
+
+def test_utc_until_follows_the_local_offset_in_summer():
+    master = series("2027-07-01T00:30:00", "2027-07-01T01:00:00", "RRULE:FREQ=DAILY;UNTIL=20270702T223000Z")
+
+    # 22:30 UTC is 00:30 on the 3rd in Berlin (UTC+2)
+    assert starts([master], ts(2027, 6, 30)) == [
+        "2027-07-01T00:30:00+02:00",
+        "2027-07-02T00:30:00+02:00",
+        "2027-07-03T00:30:00+02:00",
+    ]
+
+
+def test_count_is_not_fast_forwarded():
+    rule = "FREQ=DAILY;COUNT=10"
+    dtstart = datetime(2027, 1, 1, 9, 0)
+
+    assert _fast_forward(rule, dtstart, datetime(2027, 1, 8)) == dtstart
+    master = series("2027-01-01T09:00:00", "2027-01-01T10:00:00", "RRULE:" + rule)
+    assert starts([master], ts(2027, 1, 8), ts(2027, 1, 20)) == [
+        "2027-01-08T09:00:00+01:00",
+        "2027-01-09T09:00:00+01:00",
+        "2027-01-10T09:00:00+01:00",
+    ]
+
+
+def test_fast_forward_keeps_the_phase():
+    dtstart = datetime(2027, 1, 4, 9, 0)
+    moved = _fast_forward("FREQ=WEEKLY;INTERVAL=3", dtstart, datetime(2027, 6, 1))
+
+    assert moved <= datetime(2027, 6, 1)
+    assert (moved - dtstart) % timedelta(weeks=3) == timedelta(0)
+    assert moved.time() == dtstart.time()
+
+
+def test_exdate_removes_one_occurrence():
+    master = series("2027-01-04T09:00:00", "2027-01-04T10:00:00",
+                    "RRULE:FREQ=WEEKLY;COUNT=3", "EXDATE;TZID=Europe/Berlin:20270111T090000")
+
+    assert starts([master], ts(2027, 1, 1)) == ["2027-01-04T09:00:00+01:00", "2027-01-18T09:00:00+01:00"]
+
+
+def test_exception_moved_out_of_the_window():
+    master = series("2027-01-04T09:00:00", "2027-01-04T10:00:00", "RRULE:FREQ=WEEKLY;COUNT=4")
+    moved = {
+        "id": "s1_20270111T080000Z",
+        "recurringEventId": "s1",
+        "originalStartTime": {"dateTime": "2027-01-11T08:00:00Z"},
+        "summary": "Series",
+        "start": {"dateTime": "2027-02-15T14:00:00+01:00", "timeZone": TIMEZONE},
+        "end": {"dateTime": "2027-02-15T15:00:00+01:00", "timeZone": TIMEZONE},
+    }
+    cancelled = {
+        "id": "s1_20270118T080000Z",
+        "recurringEventId": "s1",
+        "originalStartTime": {"dateTime": "2027-01-18T08:00:00Z"},
+        "status": "cancelled",
+    }
+
+    assert starts([master, moved, cancelled], ts(2027, 1, 1), ts(2027, 2, 1)) == [
+        "2027-01-04T09:00:00+01:00",
+        "2027-01-25T09:00:00+01:00",
+    ]
+    assert starts([moved, master, cancelled], ts(2027, 2, 1), ts(2027, 3, 1)) == ["2027-02-15T14:00:00+01:00"]
+
+
+def test_series_bounds():
+    open_ended = series("2027-01-04T09:00:00", "2027-01-04T10:00:00", "RRULE:FREQ=WEEKLY")
+    counted = series("2027-03-15T09:00:00", "2027-03-15T10:00:00", "RRULE:FREQ=WEEKLY;COUNT=3")
+
+    assert series_bounds(open_ended, TIMEZONE) == (ts(2027, 1, 4, 9), UNBOUNDED)
+    # The last occurrence is after the DST switch: 10:00 CEST
+    assert series_bounds(counted, TIMEZONE) == (ts(2027, 3, 15, 9), ts(2027, 3, 29, 10))
+
+
+def test_invalid_rules_are_rejected():
+    assert normalize_recurrence("FREQ=WEEKLY;BYDAY=MO") == ["RRULE:FREQ=WEEKLY;BYDAY=MO"]
+    with pytest.raises(ValueError):
+        normalize_recurrence("FREQ=SOMETIMES")
@@ -0,0 +1,104 @@
+import json
+import os
+import re
+from datetime import date, timedelta
+
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.memory import MemoryManager
+from kim.response_cache import ResponseCache
+from main import KimAssistant
+
+NAME_RE = re.compile(r"- Name: (\w+)")
+
+
+def name_from_prompt(messages):
+    """Answers "what is my name" from the profile facts the prompt carries"""
+    prompt = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    match = NAME_RE.search(prompt)
+    return json.dumps({
+        "intent": "general",
+        "message": f"Your name is {match.group(1) if match else 'unknown'}",
+        "missing_fields": [],
+        "data": {}
+    })
+
+
+def session(tmp_path, name, llm, cache):
+    brain = CalendarBrain(
+        client=llm,
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(os.path.join(tmp_path, f"{name}-events.db")),
+        response_cache=cache
+    )
+    memory = MemoryManager(memory_dir=os.path.join(tmp_path, name))
+    assistant = KimAssistant(memory=memory, brain=brain)
+    assistant.profile["personal"]["name"] = name
+    return assistant
+
+
+def test_cached_reply_is_not_shared_between_users(tmp_path):
+    llm = FakeOpenAI(name_from_prompt)
+    cache = ResponseCache(':memory:')
+    alice = session(tmp_path, "Alice", llm, cache)
+    bob = session(tmp_path, "Bob", llm, cache)
+
+    assert alice.process_input("what is my name") == "Your name is Alice"
+    assert bob.process_input("what is my name") == "Your name is Bob"
+    assert llm.calls == 2
+    alice.save_state()
+    bob.save_state()
+
+
+def test_profile_change_invalidates_cached_reply(tmp_path):
+    llm = FakeOpenAI(name_from_prompt)
+    assistant = session(tmp_path, "Alice", llm, ResponseCache(':memory:'))
+    brain = assistant.brain
+
+    assert brain.process_conversation("what is my name")["message"] == "Your name is Alice"
+    assistant.profile["personal"]["name"] = "Alicia"
+    assert brain.process_conversation("what is my name")["message"] == "Your name is Alicia"
+    assert llm.calls == 2
+    assistant.save_state()
+
+
+def test_identical_prompt_is_answered_from_cache(tmp_path):
+    llm = FakeOpenAI(name_from_prompt)
+    assistant = session(tmp_path, "Alice", llm, ResponseCache(':memory:'))
+
+    for _ in range(2):
+        assert assistant.brain.process_conversation("what is my name")["message"] == "Your name is Alice"
+    assert llm.calls == 1
+    assistant.save_state()
+
+
+def test_relative_dates_miss_the_cache_the_next_day():
+    cache = ResponseCache(':memory:')
+    today = date(2027, 1, 4)
+    reply = {"intent": "general", "message": "Three meetings next week", "missing_fields": [], "data": {}}
+    for text in ("what's on next week", "anything in 3 days", "am I free this weekend"):
+        cache.put(cache.make_key(text, {}, "v1", today), reply)
+
+        assert cache.get(cache.make_key(text, {}, "v1", today)) == reply
+        assert cache.get(cache.make_key(text, {}, "v1", today + timedelta(days=1))) is None
+
+
+def test_fixed_phrases_keep_their_key_across_days():
+    cache = ResponseCache(':memory:')
+    today = date(2027, 1, 4)
+
+    assert cache.make_key("what is my name", {}, "v1", today) == cache.make_key("what is my name", {}, "v1", today + timedelta(days=1))
+    # Resolved to the same absolute date from two different days
+    assert cache.make_key("lunch on 2027-01-08", {}, "v1", today) == cache.make_key("lunch on friday", {}, "v1", today)
+
+
+def test_repeated_question_hits_the_cache_as_history_grows(tmp_path):
+    llm = FakeOpenAI(name_from_prompt)
+    assistant = session(tmp_path, "Alice", llm, ResponseCache(':memory:'))
+
+    for _ in range(3):
+        assert assistant.process_input("what is my name") == "Your name is Alice"
+    assert len(assistant.conversation_history) >= 4
+    assert llm.calls == 1
+    assistant.save_state()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import threading
+
+import server
+from benchmarks.fakes import FakeAsyncOpenAI, FakeCalendarService, FakeOpenAI
+from kim.async_llm import AsyncLLMGateway
+from kim.event_store import EventStore
+from server import SessionManager, SharedBackends
+
+
+def backends(tmp_path, **kwargs):
+    return SharedBackends(
+        event_store=EventStore(os.path.join(tmp_path, "events.db")),
+        llm_gateway=AsyncLLMGateway(FakeAsyncOpenAI([])),
+        **kwargs
+    )
+
+
+def test_clients_are_created_on_first_use_and_shared(tmp_path, monkeypatch):
+    created = []
+
+    def openai_client():
+        created.append(FakeOpenAI([]))
+        return created[-1]
+    monkeypatch.setattr(server, "_openai_client", openai_client)
+    monkeypatch.setattr(server, "authenticate_google_calendar", lambda: created.append("login") or FakeCalendarService())
+
+    manager = SessionManager(backends(tmp_path), sessions_dir=str(tmp_path / "sessions"))
+    alice, bob = manager._create("alice"), manager._create("bob")
+    assert created == []
+
+    assert alice.assistant.brain.client is bob.assistant.brain.client
+    assert alice.assistant.brain.calendar_service is bob.assistant.brain.calendar_service
+    assert created.count("login") == 1
+    assert len(created) == 2
+    manager.executor.shutdown()
+
+
+def test_sessions_do_not_share_cached_replies(tmp_path):
+    manager = SessionManager(backends(tmp_path, client=FakeOpenAI([]), calendar_service=FakeCalendarService()),
+                             sessions_dir=str(tmp_path / "sessions"))
+
+    async def open_and_close():
+        alice, bob = await manager.get("alice"), await manager.get("bob")
+        alice_cache, bob_cache = alice.assistant.brain.response_cache, bob.assistant.brain.response_cache
+        alice_cache.put("key", {"intent": "general", "message": "Your name is Alice"})
+        assert alice_cache is not bob_cache
+        assert bob_cache.get("key") is None
+        await manager.close_all()
+
+    asyncio.run(open_and_close())
+    assert os.path.exists(tmp_path / "sessions" / "alice" / "llm_cache.db")
+
+
+def test_async_turn_keeps_disk_work_off_the_event_loop(tmp_path):
+    reply = '{"intent": "general", "message": "Hello", "missing_fields": [], "data": {}}'
+    shared = SharedBackends(
+        client=FakeOpenAI([]),
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(os.path.join(tmp_path, "events.db")),
+        llm_gateway=AsyncLLMGateway(FakeAsyncOpenAI([reply]))
+    )
+    manager = SessionManager(shared, sessions_dir=str(tmp_path / "sessions"))
+    session = manager._create("alice")
+    brain = session.assistant.brain
+    on_loop = []
+
+    def spy(obj, name):
+        original = getattr(obj, name)
+
+        def call(*args, **kwargs):
+            on_loop.append((name, threading.current_thread() is threading.main_thread()))
+            return original(*args, **kwargs)
+        setattr(obj, name, call)
+    spy(brain.response_cache, "get")
+    spy(brain.response_cache, "put")
+    spy(brain.memory, "search_history")
+
+    assert asyncio.run(session.assistant.process_input_async("tell me a joke")) == "Hello"
+
+    assert {name for name, _ in on_loop} == {"get", "put", "search_history"}
+    assert not any(loop for _, loop in on_loop)
+    session.assistant.save_state()
+    manager.executor.shutdown()
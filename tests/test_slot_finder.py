@@ -0,0 +1,119 @@
+import copy
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from benchmarks.bench_slot_finder import naive_feasible_starts, synthetic_busy
+from kim.memory import MemoryManager
+from kim.slot_finder import SlotFinder
+
+TIMEZONE = "Europe/Berlin"
+BERLIN = ZoneInfo(TIMEZONE)
+MONDAY = date(2030, 1, 7)
+EVERY_DAY = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@pytest.fixture
+def profile():
+    return copy.deepcopy(MemoryManager().default_profile)
+
+
+def at(day, hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return datetime.combine(day, datetime.min.time(), BERLIN) + timedelta(hours=hour, minutes=minute)
+
+
+def block(day, start, end):
+    return at(day, start).timestamp(), at(day, end).timestamp()
+
+
+def midnight(day):
+    return datetime.combine(day, datetime.min.time(), BERLIN)
+
+
+def both(profile, busy, first, last, duration, not_before=None):
+    not_before = not_before or midnight(first)
+    finder = SlotFinder(profile, TIMEZONE)
+    free = finder.availability(busy, first, last, not_before=not_before)
+    fast = finder.feasible_starts(free, duration).tolist()
+    return fast, naive_feasible_starts(profile, busy, first, last, duration, not_before, finder.step)
+
+
+def slot_times(slots):
+    return [(s.strftime("%a %H:%M"), e.strftime("%H:%M")) for s, e in slots]
+
+
+@pytest.mark.parametrize("duration", [30, 60, 90])
+def test_matches_the_naive_finder_on_a_busy_week(profile, duration):
+    busy = synthetic_busy(MONDAY, 7, 6)
+
+    fast, slow = both(profile, busy, MONDAY, MONDAY + timedelta(days=6), duration)
+
+    assert fast == slow
+    assert fast
+
+
+def test_slots_may_touch_both_ends_of_the_working_day(profile):
+    profile["schedule"]["break_preferences"] = {"lunch_time": "00:00-00:00", "short_breaks": []}
+    profile["preferences"]["buffer_time"] = 0
+    profile["preferences"]["preferred_meeting_times"] = []
+    busy = [block(MONDAY, "10:00", "17:00")]
+
+    fast, slow = both(profile, busy, MONDAY, MONDAY, 60)
+    slots = SlotFinder(profile, TIMEZONE).find_slots(busy, MONDAY, MONDAY, 60, now=midnight(MONDAY))
+
+    assert fast == slow == [9 * 60, 17 * 60]
+    assert slot_times(slots) == [("Mon 09:00", "10:00"), ("Mon 17:00", "18:00")]
+    assert both(profile, busy, MONDAY, MONDAY, 61) == ([], [])
+
+
+def test_busy_times_after_the_dst_switch_block_their_wall_clock_minutes(profile):
+    # Clocks go forward on Sunday 2030-03-31
+    profile["schedule"]["work_hours"]["days"] = EVERY_DAY
+    first, last = date(2030, 3, 30), date(2030, 4, 1)
+    busy = [block(last, "09:00", "11:00"), block(last, "13:00", "17:45")]
+
+    fast, slow = both(profile, busy, first, last, 60)
+    slots = SlotFinder(profile, TIMEZONE).find_slots(busy, last, last, 60, now=midnight(last))
+
+    assert fast == slow
+    assert slots == []
+    profile["preferences"]["buffer_time"] = 0
+    slots = SlotFinder(profile, TIMEZONE).find_slots(busy, last, last, 45, now=midnight(last), limit=5)
+    assert [s.strftime("%H:%M%z") for s, _ in slots] == ["11:15+0200"]
+
+
+def test_all_day_blocker_leaves_no_slot_that_day(profile):
+    holiday = (midnight(MONDAY).timestamp(), midnight(MONDAY + timedelta(days=1)).timestamp())
+
+    fast, slow = both(profile, [holiday], MONDAY, MONDAY + timedelta(days=1), 60)
+    slots = SlotFinder(profile, TIMEZONE).find_slots([holiday], MONDAY, MONDAY + timedelta(days=1), 60,
+                                                     now=midnight(MONDAY))
+
+    assert fast == slow
+    assert slots and all(s.date() == MONDAY + timedelta(days=1) for s, _ in slots)
+    # Its buffer ends at 00:15, long before work starts
+    assert min(fast) == 24 * 60 + 9 * 60
+
+
+def test_no_slot_fits(profile):
+    finder = SlotFinder(profile, TIMEZONE)
+    busy = [block(MONDAY, "08:00", "19:00")]
+
+    assert finder.find_slots(busy, MONDAY, MONDAY, 30, now=midnight(MONDAY)) == []
+    assert finder.find_slots([], MONDAY, MONDAY, 10 * 60, now=midnight(MONDAY)) == []
+    # Saturday is not a work day
+    saturday = MONDAY + timedelta(days=5)
+    assert finder.find_slots([], saturday, saturday, 30, now=midnight(saturday)) == []
+    assert both(profile, busy, MONDAY, MONDAY, 30) == ([], [])
+
+
+def test_slots_before_now_are_skipped(profile):
+    now = at(MONDAY, "16:20")
+
+    fast, slow = both(profile, [], MONDAY, MONDAY, 30, not_before=now)
+    slots = SlotFinder(profile, TIMEZONE).find_slots([], MONDAY, MONDAY, 30, now=now)
+
+    assert fast == slow == [16 * 60 + 30, 16 * 60 + 45, 17 * 60, 17 * 60 + 15, 17 * 60 + 30]
+    assert all(s >= now for s, _ in slots)
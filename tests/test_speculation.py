@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.response_cache import ResponseCache
+
+SLOT = {"date": "2027-01-04", "start": "15:00", "end": "16:00"}
+
+
+@pytest.fixture
+def brain():
+    brain = CalendarBrain(
+        client=FakeOpenAI([]),
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(":memory:"),
+        response_cache=ResponseCache(":memory:")
+    )
+    yield brain
+    brain.event_store.close()
+
+
+def test_payload_guessed_before_the_title_is_reused(brain):
+    brain.speculation.speculate(dict(SLOT))
+    brain.conversation_context = {**SLOT, "title": "Dentist"}
+
+    assert brain.check_schedule(brain.conversation_context) == []
+    assert brain.create_event_from_context().startswith("✅ Scheduled: Dentist")
+    [event] = brain.calendar_service.calendars["primary"].values()
+    assert event["summary"] == "Dentist"
+    assert brain.speculation.stats["hits"] == 1
+    assert brain.speculation.stats["payload_hits"] == 1
+
+
+def test_payload_for_another_slot_is_not_reused(brain):
+    brain.speculation.speculate(dict(SLOT))
+    brain.check_schedule(SLOT)
+
+    assert brain.speculation.take_payload({**SLOT, "start": "15:30", "title": "Dentist"}) is None
+    assert brain.speculation.stats["payload_hits"] == 0
+
+
+def test_stuck_prefetch_falls_back_to_the_direct_check(brain):
+    release = threading.Event()
+
+    def stuck(prediction):
+        release.wait(5)
+        return {"version": brain.busy_index.version, "problems": ["stale guess"], "body": None}
+    brain.speculation._prefetch = stuck
+    brain.speculation.wait_timeout = 0.05
+    brain.speculation.speculate(dict(SLOT))
+
+    started = time.perf_counter()
+    problems = brain.check_schedule(SLOT)
+    elapsed = time.perf_counter() - started
+    release.set()
+
+    assert problems == []
+    assert elapsed < 1
+    assert brain.speculation.stats["misses"] == 1
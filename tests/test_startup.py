@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from benchmarks.bench_startup import DEFERRED_MODULES
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.memory import MemoryManager
+from kim.response_cache import ResponseCache
+from main import KimAssistant, warm_up_in_background
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Counting:
+    def __init__(self, make):
+        self.make = make
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.make()
+
+
+def lazy_brain(client_factory, calendar_factory):
+    return CalendarBrain(
+        event_store=EventStore(":memory:"),
+        response_cache=ResponseCache(":memory:"),
+        client_factory=client_factory,
+        calendar_factory=calendar_factory
+    )
+
+
+def test_clients_are_created_once_on_first_use():
+    client, calendar = Counting(lambda: FakeOpenAI([])), Counting(FakeCalendarService)
+    brain = lazy_brain(client, calendar)
+    assert (client.calls, calendar.calls) == (0, 0)
+
+    threads = [threading.Thread(target=lambda: (brain.client, brain.calendar_service)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (client.calls, calendar.calls) == (1, 1)
+    assert brain.client is brain.client
+
+
+def test_warm_up_leaves_the_calendar_login_for_later_unless_asked():
+    client, calendar = Counting(lambda: FakeOpenAI([])), Counting(FakeCalendarService)
+    brain = lazy_brain(client, calendar)
+
+    brain.warm_up()
+    assert (client.calls, calendar.calls) == (1, 0)
+
+    brain.warm_up(calendar=True)
+    assert (client.calls, calendar.calls) == (1, 1)
+
+
+def test_failed_background_warm_up_is_reported_and_retried_on_use(tmp_path, capsys):
+    def no_key():
+        raise RuntimeError("OPENAI_API_KEY is not set")
+    client = Counting(no_key)
+    assistant = KimAssistant(memory=MemoryManager(memory_dir=str(tmp_path)),
+                             brain=lazy_brain(client, FakeCalendarService))
+
+    warm_up_in_background(assistant).join(5)
+
+    assert "Warm-up error: OPENAI_API_KEY is not set" in capsys.readouterr().out
+    client.make = lambda: FakeOpenAI([])
+    assert assistant.brain.client is not None
+    assert client.calls == 2
+
+
+def test_building_the_assistant_imports_no_heavy_module(tmp_path):
+    snippet = f"""
+import json, sys
+from main import KimAssistant
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.memory import MemoryManager
+KimAssistant(memory=MemoryManager(memory_dir={str(tmp_path)!r}), brain=CalendarBrain(event_store=EventStore(":memory:")))
+print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))
+"""
+    result = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from benchmarks.fakes import FakeCalendarService, FakeOpenAI
+from kim.brain import CalendarBrain
+from kim.event_store import EventStore
+from kim.response_cache import ResponseCache
+from kim.streaming import StreamingJSONParser
+
+REPLY = {
+    "intent": "clarify",
+    "data": {"message": "nested, not watched", "title": "Café"},
+    "message": "Which day? \"Tomorrow\" or Friday\\Saturday — or 🎉?\nTell me.",
+    "missing_fields": ["date"],
+}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def feed_all(parser, chunks):
+    return "".join(parser.feed(chunk) for chunk in chunks)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_message_survives_any_chunking(size, ensure_ascii):
+    # ensure_ascii splits \uXXXX escapes and surrogate pairs across chunks
+    text = json.dumps(REPLY, ensure_ascii=ensure_ascii)
+    parser = StreamingJSONParser("message")
+
+    streamed = feed_all(parser, chunked(text, size))
+
+    assert streamed == REPLY["message"]
+    assert parser.field_done
+    assert parser.finish() == REPLY
+
+
+def test_message_streams_before_the_object_is_complete():
+    parser = StreamingJSONParser("message")
+
+    assert parser.feed('{"intent": "general", "message": "Hel') == "Hel"
+    assert parser.feed('lo') == "lo"
+    assert not parser.field_done
+    assert parser.feed('", "data": {}}') == ""
+    assert parser.field_done
+
+
+def test_keys_and_nested_fields_with_the_same_name_are_not_streamed():
+    parser = StreamingJSONParser("message")
+
+    streamed = feed_all(parser, chunked('{"data": {"message": "no"}, "note": "message", "message": "yes"}', 4))
+
+    assert streamed == "yes"
+
+
+def test_brain_streams_the_reply_from_a_mocked_completion(tmp_path):
+    llm = FakeOpenAI([json.dumps(REPLY)], chunk_size=3)
+    brain = CalendarBrain(
+        client=llm,
+        calendar_service=FakeCalendarService(),
+        event_store=EventStore(str(tmp_path / "events.db")),
+        response_cache=ResponseCache(':memory:')
+    )
+    deltas = []
+
+    parsed = brain.process_conversation("set something up", on_message_delta=deltas.append)
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == REPLY["message"]
+    assert parsed["missing_fields"] == ["date"]
+    assert llm.requests[0]["stream"] is True
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from kim.tracing import JSONLExporter, Tracer
+
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_nested_spans_form_one_tree_with_a_breakdown(tmp_path):
+    tracer = Tracer()
+    tracer.configure(jsonl_path=str(tmp_path / "trace.jsonl"))
+
+    with tracer.span("process_input", text="hi") as root:
+        with tracer.span("llm") as llm:
+            with tracer.span("llm.request"):
+                pass
+        with tracer.span("calendar"):
+            pass
+        with tracer.span("calendar"):
+            pass
+    tracer.close()
+
+    records = read_spans(tmp_path / "trace.jsonl")
+    spans = {s["name"]: s for s in records}
+    assert len(records) == 5
+    assert {s["trace_id"] for s in spans.values()} == {root.trace_id}
+    assert spans["process_input"]["parent_id"] is None
+    assert spans["llm"]["parent_id"] == root.span_id
+    assert spans["llm.request"]["parent_id"] == llm.span_id
+    assert spans["process_input"]["attributes"] == {"text": "hi"}
+    # Only the root carries the per-stage totals, and repeated stages add up
+    assert set(spans["process_input"]["breakdown_ms"]) == {"llm", "llm.request", "calendar"}
+    assert "breakdown_ms" not in spans["llm"]
+    assert root.breakdown["calendar"] >= 0
+    assert tracer.metrics.summary()["calendar"]["count"] == 2
+    assert tracer.last_breakdown().startswith("process_input ")
+
+
+def test_failed_span_records_the_error_and_reraises():
+    tracer = Tracer()
+
+    with pytest.raises(KeyError):
+        with tracer.span("process_input"):
+            with tracer.span("calendar"):
+                raise KeyError("missing")
+
+    [turn] = tracer.recent_turns
+    assert turn["name"] == "process_input"
+    assert turn["attributes"] == {"error": "KeyError"}
+
+
+def test_concurrent_tasks_get_separate_trees():
+    tracer = Tracer()
+
+    async def turn(name):
+        with tracer.span("process_input", user=name) as root:
+            await asyncio.sleep(0.01)
+            with tracer.span("llm") as child:
+                await asyncio.sleep(0.01)
+            return root, child
+
+    async def both():
+        return await asyncio.gather(turn("alice"), turn("bob"))
+
+    (alice, alice_llm), (bob, bob_llm) = asyncio.run(both())
+
+    assert alice.trace_id != bob.trace_id
+    assert alice_llm.parent is alice and bob_llm.parent is bob
+
+
+def test_exporter_flushes_root_spans_at_once_and_children_in_batches(tmp_path):
+    path = tmp_path / "nested" / "trace.jsonl"
+    exporter = JSONLExporter(str(path), flush_every=3)
+
+    exporter.export({"name": "llm", "parent_id": "abc"})
+    exporter.export({"name": "calendar", "parent_id": "abc"})
+    assert path.read_text(encoding="utf-8") == ""
+
+    exporter.export({"name": "process_input", "parent_id": None, "attributes": {"at": object()}})
+    assert [s["name"] for s in read_spans(path)] == ["llm", "calendar", "process_input"]
+
+    exporter.export({"name": "late", "parent_id": "abc"})
+    exporter.close()
+    assert len(read_spans(path)) == 4
+
+
+def test_traced_decorator_wraps_calls_in_a_span():
+    tracer = Tracer()
+
+    @tracer.traced("warm_up")
+    def warm_up(x):
+        return x * 2
+
+    assert warm_up(21) == 42
+    assert warm_up.__name__ == "warm_up"
+    assert tracer.recent_turns[-1]["name"] == "warm_up"
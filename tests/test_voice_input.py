@@ -0,0 +1,143 @@
+import math
+import struct
+import wave
+
+import pytest
+import speech_recognition as sr
+
+from kim import voice_input
+from kim.speech_backends import SpeechBackend, SpeechStream, StreamingSpeechBackend
+from kim.voice_input import MicrophoneListener, StreamingTranscriber
+
+RATE = 16000
+
+
+def write_wav(path, segments):
+    """16-bit mono WAV of ("tone" | "silence", seconds) segments"""
+    frames = bytearray()
+    for kind, seconds in segments:
+        for i in range(int(RATE * seconds)):
+            value = int(8000 * math.sin(2 * math.pi * 440 * i / RATE)) if kind == "tone" else 0
+            frames += struct.pack('<h', value)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(bytes(frames))
+    return str(path)
+
+
+class SecondsBackend(SpeechBackend):
+    """Transcribes an utterance as its length in seconds"""
+
+    name = "seconds"
+
+    def transcribe(self, audio):
+        return f"{len(audio.frame_data) / (audio.sample_rate * audio.sample_width):.1f}"
+
+
+class _LoudChunkStream(SpeechStream):
+    """One word per loud chunk; a quiet chunk after speech ends the utterance"""
+
+    def __init__(self):
+        self.words = []
+
+    def accept(self, chunk):
+        samples = struct.unpack(f'<{len(chunk) // 2}h', chunk)
+        if max(map(abs, samples), default=0) > 1000:
+            self.words.append(f"w{len(self.words)}")
+            return None
+        return self.finish()
+
+    def partial(self):
+        return " ".join(self.words)
+
+    def finish(self):
+        text, self.words = " ".join(self.words), []
+        return text or None
+
+
+class LoudChunkBackend(SecondsBackend, StreamingSpeechBackend):
+    name = "loud-chunks"
+
+    def open_stream(self, sample_rate):
+        return _LoudChunkStream()
+
+
+def drain(listener):
+    results = []
+    while True:
+        utterance = listener.get_utterance()
+        if utterance is None:
+            return results
+        results.append(listener.recognize(utterance))
+
+
+@pytest.fixture(autouse=True)
+def no_cached_calibration(monkeypatch):
+    monkeypatch.setattr(voice_input, "_calibrated_energy_threshold", None)
+
+
+def test_listener_splits_a_wav_file_into_utterances(tmp_path):
+    path = write_wav(tmp_path / "two.wav", [
+        ("silence", 0.5), ("tone", 1.0), ("silence", 2.0), ("tone", 0.8), ("silence", 2.0)
+    ])
+    listener = MicrophoneListener(
+        source_factory=lambda: sr.AudioFile(path),
+        calibration_duration=0.3,
+        backend=SecondsBackend()
+    ).start()
+
+    durations = [float(text) for text in drain(listener)]
+
+    assert len(durations) == 2
+    assert durations[0] >= 1.0 and durations[1] >= 0.8
+    # Only live microphones feed the calibration cache
+    assert voice_input._calibrated_energy_threshold is None
+
+
+def test_silent_file_yields_nothing(tmp_path):
+    path = write_wav(tmp_path / "silence.wav", [("silence", 2.0)])
+    listener = MicrophoneListener(
+        source_factory=lambda: sr.AudioFile(path),
+        calibration_duration=0.3,
+        backend=SecondsBackend()
+    ).start()
+
+    assert drain(listener) == []
+    assert listener.finished.is_set()
+
+
+def test_streaming_transcriber_reports_partials_from_a_wav_file(tmp_path):
+    path = write_wav(tmp_path / "stream.wav", [
+        ("tone", 0.75), ("silence", 0.25), ("tone", 0.5)
+    ])
+    partials = []
+    transcriber = StreamingTranscriber(
+        LoudChunkBackend(),
+        source_factory=lambda: sr.AudioFile(path),
+        on_partial=partials.append,
+        chunk_size=4000
+    ).start()
+
+    assert drain(transcriber) == ["w0 w1 w2", "w0 w1"]
+    assert partials == ["w0", "w0 w1", "w0 w1 w2", "w0", "w0 w1"]
+
+
+def test_streaming_transcriber_needs_a_streaming_backend():
+    with pytest.raises(ValueError):
+        StreamingTranscriber(SecondsBackend())
+
+
+def test_backends_must_implement_what_they_advertise():
+    class Silent(SpeechBackend):
+        name = "silent"
+
+    class NoStream(StreamingSpeechBackend):
+        def transcribe(self, audio):
+            return None
+
+    with pytest.raises(TypeError):
+        Silent()
+    with pytest.raises(TypeError):
+        NoStream()